@@ -0,0 +1,88 @@
+##  @file   bench_search.py
+#   @brief  Benchmarks the nearest-color and similar-palette searches of a large palette index.
+#   @details    Generates the records of a collection of images (100,000 by
+#               default), builds a palette index over them, and prints how long
+#               building the index and each kind of query took.
+#
+#               Usage:  python benchmarks/bench_search.py [images]
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import os
+import sys
+import time
+
+import numpy
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from pypalex import search_utils as search
+from pypalex import store_utils as store
+
+# ---- GLOBAL VARIABLES ----
+## Default number of images in the index.
+DEFAULT_IMAGES = 100000
+## Number of times each query is run (the mean time is printed).
+QUERY_RUNS = 20
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Main function that runs the benchmark.
+def main():
+    images = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_IMAGES
+    records, names = generate_records(images)
+
+    start_time = time.perf_counter()
+    palette_index = search.PaletteIndex(records, names)
+    print(images, "images, index built in", f"{time.perf_counter() - start_time:.3f} s")
+
+    queries = {'nearest dominant color': lambda: palette_index.nearest_colors('#3b4252'),
+               "nearest 'dark background'": lambda: palette_index.nearest_colors('#3b4252', color_name='dark background'),
+               'similar palettes': lambda: palette_index.similar_palettes(0)}
+    for name, query in queries.items():
+        print(f"{name:<28} {time_query(query) * 1000:8.2f} ms per query")
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Generates the records of a collection of images with random colors and ratios.
+#
+#   @param  images  An integer that represents the number of images.
+#
+#   @return A (records, names) tuple, like store_utils.read_store() returns.
+def generate_records(images):
+    random_generator = numpy.random.default_rng(0)
+    records = numpy.zeros(images, dtype=store.STORE_DTYPE)
+    records['colors'] = random_generator.integers(0, 256, size=records['colors'].shape, dtype=numpy.uint8)
+    records['ratios'] = random_generator.random(records['ratios'].shape, dtype=numpy.float32) * 100
+    names = [{'image-name': 'image' + str(index), 'source': None} for index in range(images)]
+
+    return records, names
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Times a query.
+#
+#   @param  query   A function that runs the query.
+#
+#   @return The mean time of a query, in seconds.
+def time_query(query):
+    start_time = time.perf_counter()
+    for _ in range(QUERY_RUNS):
+        query()
+
+    return (time.perf_counter() - start_time) / QUERY_RUNS
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+##  @file   bench_serializers.py
+#   @brief  Benchmarks the export file formats of a batch of extracted images.
+#   @details    Extracts the palettes of a generated image once, then exports
+#               them as if they came from a batch of images (1,000 by default)
+#               with each serializer, and prints how long serializing alone and
+#               serializing plus writing the files took. The pure-Python YAML
+#               dumper is included to show what libyaml's CSafeDumper saves.
+#
+#               Usage:  python benchmarks/bench_serializers.py [images]
+#
+#   @note   Files are written to a temporary directory, which is removed once
+#           the benchmark is done.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import functools
+import os
+import sys
+import tempfile
+import time
+
+import numpy
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from pypalex import file_utils as futils
+from pypalex import pipeline
+
+# ---- GLOBAL VARIABLES ----
+## Default number of images in the exported batch.
+DEFAULT_IMAGES = 1000
+## Side length, in pixels, of the generated image that the palettes are extracted from.
+IMAGE_SIZE = 256
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Main function that runs the benchmark.
+def main():
+    images = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_IMAGES
+    results = extract_sample_results()
+    files = [results['raw-colors']] + list(results['palettes'].values())
+
+    print("PyYAML", yaml.__version__, "- libyaml", "available" if hasattr(yaml, 'CSafeDumper') else "NOT available")
+    print(images, "images,", len(files), "files per image")
+    for name, serializer in get_serializers().items():
+        serialize_time, write_time = time_export(serializer, files, images)
+        print(f"{name:<28} serialize {serialize_time:7.3f} s   serialize + write {write_time:7.3f} s")
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Extracts the palettes (including adaptive and mood palettes) and raw colors of a generated image.
+#
+#   @return A dictionary of results (see pipeline.generate_results()).
+def extract_sample_results():
+    random_generator = numpy.random.default_rng(0)
+    pixels = random_generator.integers(0, 256, size=(IMAGE_SIZE, IMAGE_SIZE, 3), dtype=numpy.uint8)
+    options = {'color-format': 'hex', 'adaptive-palettes': True, 'mood-palettes': True}
+
+    return pipeline.extract_palettes(pixels, image_name='sample', options=options, backend='serial')
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the serializers to compare.
+#
+#   @return Dictionary of serializer names and functions that take the data and return a string.
+def get_serializers():
+    serializers = {'json (indent=4)': futils.get_serializer('json', 'hex'),
+                   'json (--compact-json)': futils.get_serializer('json', 'hex', compact_json=True),
+                   'yaml (' + futils.YAML_DUMPER.__name__ + ')': futils.get_serializer('yaml', 'hex')}
+    if futils.YAML_DUMPER is not yaml.SafeDumper:
+        serializers['yaml (SafeDumper)'] = functools.partial(yaml.dump, Dumper=yaml.SafeDumper, indent=4,
+                                                             sort_keys=False, default_flow_style=False)
+
+    return serializers
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Times the export of a batch of images with a serializer.
+#
+#   @param  serializer  A function that takes the data and returns a string.
+#   @param  files       A list of the data of each file of an image.
+#   @param  images      An integer that represents the number of images in the batch.
+#
+#   @return A (serialize time, serialize and write time) tuple, in seconds.
+def time_export(serializer, files, images):
+    start_time = time.perf_counter()
+    for _ in range(images):
+        for data in files:
+            serializer(data)
+    serialize_time = time.perf_counter() - start_time
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start_time = time.perf_counter()
+        for image_index in range(images):
+            for file_index, data in enumerate(files):
+                output_filepath = os.path.join(output_dir, 'image' + str(image_index), str(file_index) + '.out')
+                futils.write_file_atomically(output_filepath, serializer(data))
+        write_time = time.perf_counter() - start_time
+
+    return serialize_time, write_time
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+##  @file   bench_startup.py
+#   @brief  Benchmarks the start-up time of the palex command line interface.
+#   @details    Runs the quick commands (--version, --where and --gen-config)
+#               in fresh Python processes and prints the minimum and median
+#               wall-clock time of each, so regressions in import time show up.
+#
+#               Usage:  python benchmarks/bench_startup.py [runs]
+#
+#   @note   The commands run with --no-daemon, so a running daemon doesn't
+#           answer them, and with a temporary configuration directory, so
+#           --gen-config doesn't touch the user's configuration.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ---- GLOBAL VARIABLES ----
+## Default number of times each command is run.
+DEFAULT_RUNS = 20
+## Command line arguments of the benchmarked commands.
+COMMANDS = [['--version'], ['--where'], ['--gen-config']]
+## Directory that contains the pypalex package.
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Main function that runs the benchmark.
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RUNS
+
+    print("Python", sys.version.split()[0], "-", runs, "runs per command")
+    print(f"{'baseline (python -c pass)':<28}", format_times(time_command([sys.executable, '-c', 'pass'], runs)))
+    for arguments in COMMANDS:
+        command = [sys.executable, '-m', 'pypalex'] + arguments + ['--no-daemon']
+        print(f"{'palex ' + ' '.join(arguments):<28}", format_times(time_command(command, runs)))
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Times a command, running it in a new process each time.
+#
+#   @param  command A list of the command and its arguments.
+#   @param  runs    An integer that represents the number of times to run the command.
+#
+#   @return List of the wall-clock times, in seconds.
+def time_command(command, runs):
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_DIR, environment.get('PYTHONPATH')]))
+
+    times = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as config_dir:
+            environment['PYPALEX_CONFIG_DIR'] = config_dir
+            start_time = time.perf_counter()
+            subprocess.run(command, env=environment, stdout=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - start_time)
+
+    return times
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Formats the minimum and median of a list of times.
+#
+#   @param  times   A list of times, in seconds.
+#
+#   @return A string of the minimum and median times, in milliseconds.
+def format_times(times):
+    return f"min {min(times) * 1000:7.1f} ms   median {statistics.median(times) * 1000:7.1f} ms"
+
+
+if __name__ == '__main__':
+    main()
@@ -11,17 +11,20 @@
 #   - Modified by Al Timofeyev on July 8, 2024.
 #   - Modified by Al Timofeyev on October 12, 2024.
 #   - Modified by Al Timofeyev on August 3, 2025.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 # ---- IMPORTS ----
+import asyncio
+import functools
 import math
 import statistics as stats
-from PIL import Image
 
 from . import image_utils as imutils
 from . import extraction_utils as exutil
 from . import conversion_utils as convert
 from . import constants as const
+from . import parallel_utils as parallel
 
 
 ##  Extracts colors given a matrix of HSV values extracted from an image.
@@ -29,34 +32,45 @@ class Extractor:
 
     ##  Extractor Constructor.
     #
-    #   @param  self    The object pointer.
-    def __init__(self):
+    #   @param  self                The object pointer.
+    #   @param  backend             A string that represents the execution backend used for processing (e.g. 'auto', 'process', 'thread', or 'serial' inside worker processes).
+    #   @param  parallel_threshold  An integer that represents the number of pixels from which the 'auto' backend runs in parallel (defaults to parallel_utils.PARALLEL_THRESHOLD).
+    def __init__(self, backend='auto', parallel_threshold=None):
+        self.backend = backend
+        self.parallel_threshold = parallel_threshold
+        self.backends_used = {}
         self.hsv_img_matrix_2d = []
         self.image_name = None
         self.color_format = None
         self.ratio_dict = {}
         self.base_color_dict = {}
         self.extracted_colors_dict = {}
+        self.color_statistics = {}
 
     # --------------------------------------------------------------------------
     # --------------------------------------------------------------------------
 
     ##  Loads the Extrator class with the provided image.
+    #   @details    The image can be provided as a path to an image, a bytes-like
+    #               object (bytes, bytearray, memoryview) or file object with the
+    #               encoded image, a PIL Image object, or a numpy array of [r,g,b]
+    #               pixels shaped (H,W,3) with a uint8 data type.
     #
-    #   @param  self                The object pointer.
-    #   @param  absolute_image_path A string that represents the absolute path to an image.
-    #   @param  image_name          A string that represents the name of the image or any name you want to provide with the current image being used.
-    def load(self, absolute_image_path, image_name=None):
-        # Reset all global variables.
-        self.image_name = image_name
-        self.color_format = 'hsv'
-        self.ratio_dict = {}
-        self.base_color_dict = {}
-        self.extracted_colors_dict = {}
+    #   @note   PIL Image objects and numpy arrays are handed over to the image
+    #           processing without being re-decoded or copied where possible.
+    #
+    #   @param  self            The object pointer.
+    #   @param  image_source    The image source (e.g. a string that represents the absolute path to an image).
+    #   @param  image_name      A string that represents the name of the image or any name you want to provide with the current image being used.
+    #   @param  memory_budget   An integer that represents the maximum number of bytes to use for decoding the image (optional, decodes very large images in horizontal strips).
+    def load(self, image_source, image_name=None, memory_budget=None):
+        self.reset(image_name=image_name)
 
         # Load the image data.
-        image = Image.open(absolute_image_path)
-        self.hsv_img_matrix_2d = imutils.process_image(image)
+        image = imutils.load_image(image_source, memory_budget=memory_budget)
+        img_matrix_3d = imutils.rescale_pixels(image)
+        backend = self.choose_backend('process-image', img_matrix_3d.shape[0] * img_matrix_3d.shape[1])
+        self.hsv_img_matrix_2d = imutils.process_image(img_matrix_3d, backend=backend)
 
     # --------------------------------------------------------------------------
     # --------------------------------------------------------------------------
@@ -75,7 +89,8 @@ class Extractor:
         self.base_color_dict = exutil.construct_base_color_dictionary(self.hsv_img_matrix_2d)
 
         # Extract colors.
-        self.extracted_colors_dict = exutil.extract_colors(self.base_color_dict, ratios=self.ratio_dict)
+        backend = self.choose_backend('extract-colors', len(self.hsv_img_matrix_2d))
+        self.extracted_colors_dict = exutil.extract_colors(self.base_color_dict, ratios=self.ratio_dict, backend=backend)
         exutil.check_missing_colors(self.base_color_dict, self.extracted_colors_dict)
         exutil.generate_remaining_colors(self.extracted_colors_dict, self.ratio_dict)
 
@@ -85,6 +100,111 @@ class Extractor:
     # --------------------------------------------------------------------------
     # --------------------------------------------------------------------------
 
+    ##  Loads the Extractor class with the provided image, without blocking the event loop.
+    #   @details    Same as load(), but runs in an executor. Cancelling it stops
+    #               waiting for the image, but an image that is already being
+    #               loaded still finishes loading in the executor.
+    #
+    #   @note   The executor must be thread-based, since load() updates the Extractor itself.
+    #
+    #   @param  self            The object pointer.
+    #   @param  image_source    The image source (see load()).
+    #   @param  image_name      A string that represents the name of the image or any name you want to provide with the current image being used.
+    #   @param  memory_budget   An integer that represents the maximum number of bytes to use for decoding the image (optional).
+    #   @param  executor        A thread-based concurrent.futures executor (None uses the event loop's default executor).
+    async def load_async(self, image_source, image_name=None, memory_budget=None, executor=None):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, functools.partial(self.load, image_source, image_name=image_name,
+                                                               memory_budget=memory_budget))
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Performs extraction of colors, without blocking the event loop.
+    #   @details    Same as run(), but runs in an executor.
+    #
+    #   @note   The executor must be thread-based, since run() updates the Extractor itself.
+    #
+    #   @param  self        The object pointer.
+    #   @param  executor    A thread-based concurrent.futures executor (None uses the event loop's default executor).
+    async def run_async(self, executor=None):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self.run)
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Resets the Extractor class so a new image can be loaded or streamed.
+    #
+    #   @param  self        The object pointer.
+    #   @param  image_name  A string that represents the name of the image or any name you want to provide with the current image being used.
+    def reset(self, image_name=None):
+        # Reset all global variables.
+        self.hsv_img_matrix_2d = []
+        self.image_name = image_name
+        self.color_format = 'hsv'
+        self.ratio_dict = {}
+        self.base_color_dict = {}
+        self.extracted_colors_dict = {}
+        self.color_statistics = {}
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Streams a chunk of an image (e.g. a scanline, strip or tile) into the Extractor class.
+    #   @details    Use this instead of load() and run() for very large images
+    #               or for images that arrive in chunks. Only the statistics
+    #               needed for extraction are kept between chunks, so memory
+    #               is bounded by the chunk size and not the image size. Call
+    #               finalize() once all chunks have been streamed.
+    #
+    #   @note   Chunks are not rescaled, every pixel of a chunk is used. If no
+    #           image is currently being streamed, the Extractor is reset first.
+    #
+    #   @param  self    The object pointer.
+    #   @param  chunk   PIL Image object or numpy array of [r,g,b] pixels, shaped (H,W,3) or (N,3).
+    def update(self, chunk):
+        if not self.color_statistics:
+            self.reset(image_name=self.image_name)
+            self.color_statistics = exutil.create_color_statistics()
+
+        hsv_chunk = imutils.process_chunk(chunk)
+        exutil.accumulate_color_statistics(self.color_statistics, hsv_chunk)
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Performs extraction of colors from all the chunks streamed with update().
+    #   @details    After finalizing, the Extractor class can be used the same
+    #               way as after run() (e.g. to generate palettes).
+    #
+    #   @note   The color ratios are exact, but the dominant color of each color
+    #           type is selected from a bounded random sample of its pixels
+    #           rather than from all of them, so it's an approximation of the
+    #           color run() would select. See extract_colors_from_statistics()
+    #           in extraction_utils.py for more details.
+    #
+    #   @param  self    The object pointer.
+    def finalize(self):
+        # If no chunks have been streamed into the extractor.
+        if not self.color_statistics or self.color_statistics['pixels'] == 0:
+            self.color_statistics = {}
+            return
+
+        # Extract colors.
+        self.ratio_dict, self.extracted_colors_dict = exutil.extract_colors_from_statistics(self.color_statistics)
+        for color_name, base_color_statistics in self.color_statistics['base-colors'].items():
+            if base_color_statistics['pixels'] == 0:
+                exutil.set_missing_color(self.extracted_colors_dict, color_name)
+        exutil.generate_remaining_colors(self.extracted_colors_dict, self.ratio_dict)
+
+        # Organize the extracted colors in an order that is suitable for raw file-saving.
+        self.organize_extracted_dictionary()
+        self.color_statistics = {}
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
     ##  Converts the selected color types from the extracted colors to pastel.
     #   @details    There are only 3 color types to choose
     #               from: light, normal, dark.
@@ -465,6 +585,24 @@ class Extractor:
     # **************************************************************************
     # **************************************************************************
 
+    ##  Chooses the execution backend for a processing step and records it.
+    #   @details    The chosen backends are recorded in backends_used, so the
+    #               parallel threshold can be tuned per machine.
+    #
+    #   @param  self        The object pointer.
+    #   @param  step_name   A string that represents the processing step (e.g. 'process-image', 'extract-colors').
+    #   @param  workload    An integer that represents the number of pixels to process.
+    #
+    #   @return A string that represents the chosen backend.
+    def choose_backend(self, step_name, workload):
+        backend = parallel.choose_backend(self.backend, workload, threshold=self.parallel_threshold)
+        self.backends_used[step_name] = backend
+
+        return backend
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
     ##  Organizes the extracted colors dictionary.
     #   @details    The reorganization of the extracted colors' dictionary
     #               is done so that the (key, value) pairs appear in a
@@ -897,3 +1035,6 @@ class Extractor:
     #   A dictionary of 2D numpy arrays for each of the 6 base colors.
     ##  @var    extracted_colors_dict
     #   A dictionary of extracted colors in [h,s,v] format.
+    ##  @var    color_statistics
+    #   A dictionary of color statistics accumulated from the chunks
+    #   streamed with update(), which is emptied by finalize().
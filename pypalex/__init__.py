@@ -1,29 +1,57 @@
 ##  @file   __main__.py
 #   @brief  Initialization file for PyPalEx.
+#   @details    The submodules are imported the first time they are used
+#               (e.g. pypalex.Extractor), so importing pypalex itself doesn't
+#               load numpy, Pillow or yaml.
 #
 #   @section authors Author(s)
 #   - Created by Al Timofeyev on March 3, 2022.
 #   - Created by Al Timofeyev on April 7, 2023.
+#   - Modified by Al Timofeyev on October 19, 2026.
+
+import importlib
 
 from .settings import __version__, __cache_version__
-from . import Extractor
-from . import arg_messages
-from . import constants
-from . import conversion_utils
-from . import extraction_utils
-from . import file_utils
-from . import image_utils
-from . import print_utils
 
 __all__ = [
     "__version__",
     "__cache_version__",
     "Extractor",
     "arg_messages",
+    "async_utils",
+    "catalog_utils",
     "constants",
     "conversion_utils",
+    "daemon",
     "extraction_utils",
     "file_utils",
     "image_utils",
+    "manifest_utils",
+    "parallel_utils",
+    "pipeline",
     "print_utils",
+    "search_utils",
+    "server",
+    "source_utils",
+    "store_utils",
+    "watch_utils",
 ]
+
+
+##  Imports a submodule the first time it's used (PEP 562).
+#
+#   @param  name    A string that represents the name of the submodule.
+#
+#   @return The submodule.
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+##  Lists the attributes of the package, including the submodules that haven't been imported yet.
+#
+#   @return List of attribute names.
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
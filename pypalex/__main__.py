@@ -31,37 +31,62 @@
 #   - Modified by Al Timofeyev on July 8, 2024.
 #   - Modified by Al Timofeyev on December 15, 2024.
 #   - Modified by Al Timofeyev on August 3, 2025.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 # ---- IMPORTS ----
+# Heavy dependencies (numpy, Pillow, yaml, filetype) are imported in the
+# functions that need them, so calls like --version start up quickly.
 import sys
 import os
-import yaml
 import argparse
-import filetype
-from PIL import Image
+import contextlib
+import threading
+import time
 
 from .settings import __version__, CONF_DIR, DEFAULT_EXTRACTED_DIR, PASTEL_EXTRACTED_DIR, RAW_EXTRACTED_DIR, CACHE_DIR
-from .Extractor import Extractor
+from . import daemon
 from . import arg_messages as argmsg
-from . import file_utils as futils
-from . import print_utils as prn
 
 # ---- GLOBAL VARIABLES ----
 ## Filename of the configuration file.
 CONFIG_FILENAME = 'palex-config.yaml'
-## List of real/existing image file path(s).
-PROPER_IMAGES = []
-## List of image filenames (contain file extensions).
-FILENAMES = []
-## List of image names.
-IMAGE_NAMES = []
+## List of image file path(s) given with -f --files (relative to SOURCE_PATH, if it's set).
+SOURCE_FILES = []
+## The path to the directory from where to use images (None if it wasn't provided).
+SOURCE_PATH = None
+## Flag to also read image file paths from the standard input, as they come (after SOURCE_FILES).
+READ_STDIN = False
+## Flag for image file paths on the standard input that are separated by NUL characters instead of newlines.
+NULL_SEPARATED = False
+## Flag to keep watching SOURCE_PATH, and extract the images that are new or modified since the last rescan.
+WATCH = False
+## The number of seconds between 2 rescans of the watched directory.
+WATCH_INTERVAL = 2.0
+## List of the (image path, relative path) tuples of the images that changed since the last rescan (None when not watching).
+CHANGED_SOURCES = None
+## The pool of compute workers that's kept warm between the batches of the watched directory (None creates one per batch).
+COMPUTE_POOL = None
+## Flag to also use the images in the subdirectories of SOURCE_PATH.
+RECURSIVE = False
+## List of glob patterns, where image files must match at least one of them (an empty list includes all files).
+INCLUDE_PATTERNS = []
+## List of glob patterns of image files and directories to skip.
+EXCLUDE_PATTERNS = []
+## The number of threads that check the image sources, ahead of extraction.
+VALIDATE_WORKERS = 4
+## Flag to accept image files by their extension alone, leaving all checks to decoding.
+TRUST_EXTENSIONS = False
+## Flag to exit with an error status if any image fails to be decoded or extracted.
+FAIL_ON_ERROR = False
 ## The path to the output directory where all exported files will be saved.
 OUTPUT_PATH = ''
 ## The format of the files to be exported (e.g. 'json', 'yaml').
 EXPORT_FILE_FORMAT = 'json'
 ## The format in which the extracted colors will be exported (e.g. 'hsv', 'rgb', 'hex', 'ansi').
 EXPORT_COLOR_FORMAT = 'hex'
+## Flag to export JSON files without indentation and whitespace.
+COMPACT_JSON = False
 ## Dictionary of palette templates that can be used to organize extracted colors into palettes to export.
 EXPORT_PALETTE_TEMPLATES = {}
 ## Dictionary of the color types that are contained within each palette template.
@@ -70,6 +95,31 @@ PALETTE_COLOR_TYPES_CONTAINED = {}
 SAVE_CHECK = False
 ## Flag to show a preview of extracted palettes.
 SHOW_PREVIEW = False
+## The policy for output files that already exist ('ask' the user, overwrite them with 'yes', or keep them with 'no').
+#  Any policy other than 'ask' also answers the save check prompts with yes, so batch jobs never wait for input.
+OVERWRITE_POLICY = 'ask'
+## Flag to skip images whose output files all exist already, before decoding them.
+SKIP_EXISTING = False
+## The path to a JSON Lines file where the results of all the images are written ('-' writes to stdout, None saves separate files).
+NDJSON_OUTPUT = None
+## The path to a palette store (a .npy file) where the colors and ratios of all the images are appended (None if it's not used).
+STORE_PATH = None
+## The path to a palette catalog (a SQLite database) where the results of all the images are kept (None if it's not used).
+CATALOG_PATH = None
+## The path to the manifest where the completed images of the batch are recorded (None if it's not used).
+MANIFEST_PATH = None
+## Flag to skip the images that the manifest lists as completed, and keep adding to it.
+RESUME = False
+## The manifest of the running batch (see manifest_utils.BatchManifest), or None.
+BATCH_MANIFEST = None
+## The palette store that the running batch appends to (see store_utils.PaletteStore), or None.
+BATCH_STORE = None
+## Flag to flush all the written files to the storage device once the whole batch is done.
+FSYNC = False
+## List of the paths of the files written so far, which are synced at the end of the batch when FSYNC is set.
+WRITTEN_FILEPATHS = []
+## List of the paths of the output files that weren't written again, since they already had the same contents.
+UNCHANGED_FILEPATHS = []
 ## Flag to generate 2 adaptive color palettes.
 ADAPTIVE_PALETTE = False
 ## Flag to generate 2 mood color palettes.
@@ -82,6 +132,22 @@ PASTEL_L = False
 PASTEL_N = False
 ## Flag to convert dark color type to pastel.
 PASTEL_D = False
+## The maximum number of bytes to use for decoding an image (None decodes images as a whole).
+MEMORY_BUDGET = None
+## The execution backend used for image processing (e.g. 'auto', 'serial', 'thread', 'process').
+BACKEND = 'auto'
+## The number of pixels from which image processing runs in parallel (None uses the default threshold).
+PARALLEL_THRESHOLD = None
+## Flag to run the decode, compute and write stages of a batch of images as a pipeline.
+PIPELINE = False
+## The number of threads that decode images in the pipeline.
+DECODE_WORKERS = 2
+## The number of processes that extract colors in the pipeline (None uses the number of CPUs).
+COMPUTE_WORKERS = None
+## The number of threads that save results in the pipeline.
+WRITE_WORKERS = 1
+## Flag to hand the results of the pipeline over in the same order as the images (instead of as soon as they finish).
+KEEP_ORDER = False
 ## The palette name of the light-themed mood palette.
 LIGHT_MOOD_PALETTE_NAME = 'light-mood'
 ## The palette name of the dark-themed mood palette.
@@ -105,8 +171,26 @@ VALID_COLOR_SET = {'red', 'light red', 'dark red', 'orange', 'light orange', 'da
 
 ##  Main script function.
 def main():
+    # Run the local HTTP server instead, if requested (e.g. "palex serve --port 8765").
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        from . import server
+        server.main(sys.argv[2:])
+        return
+
+    # Run as a daemon, or forward the call to a running daemon (unless told not to).
+    if '--daemon' in sys.argv[1:]:
+        daemon.serve(sys.modules[__name__])
+        return
+    if '--no-daemon' not in sys.argv[1:]:
+        exit_code = daemon.forward(sys.argv[1:])
+        if exit_code is not None:
+            sys.exit(exit_code)
+
     handle_args()
-    extract_color_palettes()
+    if WATCH:
+        watch_color_palettes()
+    else:
+        extract_color_palettes()
 
 
 # **************************************************************************
@@ -153,8 +237,10 @@ def handle_args():
     if args['gen_config']:
         config_filepath = os.path.join(CONF_DIR, CONFIG_FILENAME)
 
-        if os.path.exists(config_filepath) and os.path.isfile(config_filepath):
+        if os.path.exists(config_filepath) and os.path.isfile(config_filepath) and not args['yes']:
             print("A config file already exists : ", config_filepath, sep='')
+            if args['no_clobber'] or args['skip_existing']:
+                sys.exit()
             overwrite_message = "Would you like to overwrite the existing config file? [y/n]: "
             while True:
                 user_choice = input(overwrite_message)
@@ -165,69 +251,332 @@ def handle_args():
                 elif user_choice in ('n', 'no'):
                     sys.exit()
 
+        from . import file_utils as futils
         futils.generate_config_file(CONFIG_FILENAME)
         sys.exit()
 
+    if args['watch'] is not None:
+        if args['files'] or args['path'] is not None or args['stdin']:
+            argument_parser.error("--watch can't be used with -f --files, -p --path or --stdin")
+        if args['ndjson'] not in (None, '-'):
+            argument_parser.error("--watch can't write to a --ndjson file, only to stdout (--ndjson -)")
+        if args['manifest'] is not None:
+            argument_parser.error("--watch can't be used with --manifest, it keeps its own index")
+        if not check_path(args['watch']):
+            sys.exit(argmsg.bad_path_message())
+
+    if args['resume'] and args['manifest'] is None:
+        argument_parser.error("--resume needs the --manifest of the batch to resume")
+
     # Exit if no files/paths were provided.
-    if (args['files'] is None or args['files'] == []) and args['path'] is None:
+    if (args['files'] is None or args['files'] == []) and args['path'] is None and not args['stdin'] and args['watch'] is None:
         sys.exit(argmsg.no_args_help_message())
 
-    # Check either the file(s) or the files in the path
-    # to make sure there are valid images to work with.
-    if args['files']:
-        if not check_sources(args['files'], args['path']):
-            sys.exit(argmsg.bad_source_message())
-    elif args['path'] is not None:
-        if not check_path(args['path']):
-            sys.exit(argmsg.bad_path_message())
-        args['files'] = os.listdir(args['path'])
-        if not check_sources(args['files'], args['path']):
-            sys.exit(argmsg.bad_source_message())
+    # The images themselves are checked while they're being extracted (see get_work_items()).
+    if not args['files'] and not args['stdin'] and args['watch'] is None and not check_path(args['path']):
+        sys.exit(argmsg.bad_path_message())
 
     handle_config()     # Handle the configuration file before processing any CLI options.
     set_global_args(args)
 
 
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Keeps watching a directory, and extracts the color palettes of the images that are new or modified.
+#   @details    The directory is rescanned every WATCH_INTERVAL seconds and
+#               compared to an index of the images that were already extracted,
+#               which is kept in the cache directory, so a watch that's started
+#               again only extracts the images that changed while it was
+#               stopped. Each batch of changed images is extracted like a
+#               regular run, and with --pipeline, every batch uses the same pool
+#               of compute workers, so it doesn't have to start up again.
+def watch_color_palettes():
+    global CHANGED_SOURCES
+    global COMPUTE_POOL
+    from . import watch_utils as watch
+
+    message_file = sys.stderr if NDJSON_OUTPUT == '-' else sys.stdout   # Keeps the records on stdout readable.
+    index_filepath = watch.get_index_filepath(SOURCE_PATH, get_watch_settings())
+    known_sources = watch.read_index(index_filepath)
+    previous_sources = None     # The first rescan picks up every image that changed while it wasn't watched.
+
+    if PIPELINE:
+        from . import pipeline
+        COMPUTE_POOL = pipeline.create_pool(COMPUTE_WORKERS, 'thread' if BACKEND == 'thread' else 'process', ignore_interrupts=True)
+
+    print("Watching ", SOURCE_PATH, " every ", WATCH_INTERVAL, " second(s), press Ctrl+C to stop.", sep='', file=message_file)
+    try:
+        while True:
+            current_sources = watch.scan_sources(SOURCE_PATH, RECURSIVE, INCLUDE_PATTERNS, EXCLUDE_PATTERNS)
+            changed_sources, removed_paths = watch.diff_sources(known_sources, current_sources, previous_sources)
+            if changed_sources:
+                print(file=message_file)
+                print("Found ", len(changed_sources), " new or modified file(s) at ", time.strftime('%H:%M:%S'),
+                      sep='', file=message_file)
+                CHANGED_SOURCES = changed_sources
+                try:
+                    extract_color_palettes()
+                finally:
+                    CHANGED_SOURCES = None
+                    WRITTEN_FILEPATHS.clear()
+                    UNCHANGED_FILEPATHS.clear()
+
+            # Images that failed are kept in the index too, so they're only tried again once they change.
+            if changed_sources or removed_paths:
+                for filepath, _ in changed_sources:
+                    known_sources[filepath] = current_sources[filepath]
+                for filepath in removed_paths:
+                    del known_sources[filepath]
+                watch.write_index(index_filepath, known_sources)
+
+            previous_sources = current_sources
+            time.sleep(WATCH_INTERVAL)
+    except KeyboardInterrupt:
+        print(file=message_file)
+        print("Stopped watching ", SOURCE_PATH, sep='', file=message_file)
+    finally:
+        if COMPUTE_POOL is not None:
+            COMPUTE_POOL.terminate()
+            COMPUTE_POOL = None
+
+
 # --------------------------------------------------------------------------
 # --------------------------------------------------------------------------
 
 ##  Handles color extraction from image(s).
+#   @details    The results of each image are either saved to separate files,
+#               or written as records to a single JSON Lines file (or to the
+#               standard output, in which case everything else that's
+#               printed goes to the standard error instead), or appended to a
+#               palette store, or kept in a palette catalog. With --fsync,
+#               the written files are synced once the batch is done, even if
+#               some images failed. With --manifest, each image is recorded as
+#               soon as it's done, so the batch can be resumed.
 def extract_color_palettes():
-    extractor = Extractor()
-    for index, image_dir in enumerate(PROPER_IMAGES):
-        print("Processing ", FILENAMES[index], " : ", sep='', end='')
-        extractor.load(image_dir, image_name=IMAGE_NAMES[index])  # ADDED THIS HERE FOR THE DAY!!!
+    global BATCH_MANIFEST
+
+    if MANIFEST_PATH is not None:
+        from . import manifest_utils as manifest
+        BATCH_MANIFEST = manifest.BatchManifest(MANIFEST_PATH, resume=RESUME)
+
+    try:
+        write_color_palettes()
+    finally:
+        if BATCH_MANIFEST is not None:
+            BATCH_MANIFEST.close()
+            print("MANIFEST : ", MANIFEST_PATH, " (", BATCH_MANIFEST.added_images, " image(s) completed, ",
+                  BATCH_MANIFEST.skipped_images, " already completed)", sep='', file=sys.stderr if NDJSON_OUTPUT == '-' else sys.stdout)
+            BATCH_MANIFEST = None
+        if saves_separate_files() and (WRITTEN_FILEPATHS or UNCHANGED_FILEPATHS):
+            print()
+            print("Saved ", len(WRITTEN_FILEPATHS), " file(s), skipped ", len(UNCHANGED_FILEPATHS),
+                  " unchanged file(s).", sep='')
+        if FSYNC and WRITTEN_FILEPATHS:
+            from . import file_utils as futils
+            futils.sync_files(WRITTEN_FILEPATHS)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Extracts the color palettes from the image(s) and writes them to the selected output.
+def write_color_palettes():
+    if STORE_PATH is not None:
+        write_palette_store()
+        return
+
+    if CATALOG_PATH is not None:
+        write_palette_catalog()
+        return
+
+    if NDJSON_OUTPUT is None:
+        extract_images(save_results)
+        return
+
+    if NDJSON_OUTPUT == '-':
+        handle_results = create_ndjson_writer(sys.stdout)
+        with contextlib.redirect_stdout(sys.stderr):
+            extract_images(handle_results)
+        return
+
+    from . import file_utils as futils
+    if not RESUME and not futils.get_files_to_write([NDJSON_OUTPUT], OVERWRITE_POLICY):
+        return
+
+    # The records are streamed as they're done, so this file is written in place instead of atomically.
+    output_dir = os.path.dirname(NDJSON_OUTPUT)
+    if output_dir != '':
+        os.makedirs(output_dir, exist_ok=True)
+    with open(NDJSON_OUTPUT, 'a' if RESUME else 'w') as ndjson_file:    # A resumed batch adds to the records it has.
+        WRITTEN_FILEPATHS.append(NDJSON_OUTPUT)
+        try:
+            extract_images(create_ndjson_writer(ndjson_file))
+        finally:    # The records of the images that were done are saved, even if other images failed.
+            print("SAVED : ", NDJSON_OUTPUT, sep='')
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Extracts the colors from the image(s) and appends them to a palette store.
+#   @details    The store keeps growing across runs, so it's never overwritten.
+#               Images that are already in the store are skipped before
+#               they're decoded, so each image is stored once.
+def write_palette_store():
+    global BATCH_STORE
+    from . import store_utils as store
+
+    try:
+        palette_store = store.PaletteStore(STORE_PATH)
+    except ValueError as error:
+        sys.exit(str(error))
+    WRITTEN_FILEPATHS.extend([palette_store.store_filepath, palette_store.index_filepath])
+    BATCH_STORE = palette_store     # Lets get_work_items() skip the images that are already stored.
+
+    def append_results(results, work_item):
+        palette_store.append(results, source_path=work_item['path'])
+
+    stored_images = len(palette_store)
+    try:
+        extract_images(append_results)
+    finally:    # The images that were done are stored, even if other images failed.
+        palette_store.close()
+        BATCH_STORE = None
+        print("SAVED : ", STORE_PATH, " (", len(palette_store) - stored_images, " image(s) added, ",
+              palette_store.skipped_images, " already stored, ", len(palette_store), " in total)", sep='')
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Extracts the colors and palettes from the image(s) and keeps them in a palette catalog.
+#   @details    Images that are unchanged since they were added to the catalog
+#               (with the same extraction options) are skipped before they're
+#               decoded, so running again over a large collection only
+#               extracts the new and changed images.
+def write_palette_catalog():
+    from . import catalog_utils as catalog
+
+    try:
+        palette_catalog = catalog.PaletteCatalog(CATALOG_PATH, options=get_extraction_options())
+    except ValueError as error:
+        sys.exit(str(error))
+
+    def add_results(results, work_item):
+        palette_catalog.add(results, work_item['path'], source_state=work_item.get('source-state'))
+
+    try:
+        extract_images(add_results, catalog=palette_catalog)
+    finally:    # The images that were done are kept, even if other images failed.
+        catalog_images = palette_catalog.count_images()
+        palette_catalog.close()
+        print("SAVED : ", CATALOG_PATH, " (", palette_catalog.added_images, " image(s) added or updated, ",
+              palette_catalog.unchanged_images, " unchanged, ", catalog_images, " in total)", sep='')
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Extracts the colors and palettes from the image(s), one image at a time or as a pipeline.
+#
+#   @param  handle_results  A function that takes the results (see pipeline.generate_results()) and the work item of an image.
+#   @param  catalog         A palette catalog whose unchanged images are skipped (see catalog_utils.PaletteCatalog), or None.
+def extract_images(handle_results, catalog=None):
+    if BATCH_MANIFEST is not None:
+        handle_results = create_manifest_recorder(handle_results)
+
+    if PIPELINE:
+        extract_color_palettes_pipelined(handle_results, catalog=catalog)
+    else:
+        extract_color_palettes_serially(handle_results, catalog=catalog)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Handles color extraction from image(s), one image at a time.
+#
+#   @param  handle_results  A function that takes the results (see pipeline.generate_results()) and the work item of an image.
+#   @param  catalog         A palette catalog whose unchanged images are skipped (see catalog_utils.PaletteCatalog), or None.
+def extract_color_palettes_serially(handle_results, catalog=None):
+    from .Extractor import Extractor
+    from . import pipeline
+
+    options = get_extraction_options()
+    extractor = Extractor(backend=BACKEND, parallel_threshold=PARALLEL_THRESHOLD)
+    source_stats = {'images-found': 0, 'invalid-sources': [], 'failed-images': []}
+    for index, work_item in enumerate(get_work_items(source_stats, catalog=catalog)):
+        if index > 0:   # Print blank line separator between images.
+            print()
+
+        print("Processing ", work_item['filename'], " : ", sep='', end='')
+        image_source = work_item.pop('image', work_item['path'])    # Reuse the already opened image.
+        try:
+            extractor.load(image_source, image_name=work_item['image-name'], memory_budget=MEMORY_BUDGET)
+        except Exception as error:  # A single image that can't be decoded doesn't stop the batch.
+            print("FAILED (", error, ")", sep='')
+            source_stats['failed-images'].append(work_item['filename'])
+            continue
         print("COMPLETED")
         print("Extracting Colors : ", sep='', end='')
         extractor.run()
         print("COMPLETED")
 
+        if PARALLEL_THRESHOLD is not None:  # Show which execution path was taken, to help tune the threshold.
+            backends_used = [step + "=" + backend for step, backend in extractor.backends_used.items()]
+            print("Execution Backends : ", ", ".join(backends_used), sep='')
+
         if PASTEL_L or PASTEL_N or PASTEL_D:
             print("Converting Selected Pastel Options : ", sep='', end='')
             extractor.convert_to_pastel(pastel_light=PASTEL_L, pastel_normal=PASTEL_N, pastel_dark=PASTEL_D)
             print("COMPLETED")
 
-        # If the user selected adaptive or mood palette creation.
-        if ADAPTIVE_PALETTE or MOOD_PALETTE or SAVE_RAW:
-            if ADAPTIVE_PALETTE:
-                preview_and_save(extractor, 'a', index)
+        handle_results(pipeline.generate_results(extractor, options), work_item)
 
-            if MOOD_PALETTE:
-                if ADAPTIVE_PALETTE:
-                    print()
-                preview_and_save(extractor, 'm', index)
+    report_sources(source_stats)
 
-            if SAVE_RAW:  # Raw save needs to always be done LAST!
-                if ADAPTIVE_PALETTE or MOOD_PALETTE:
-                    print()
-                preview_and_save(extractor, 'r', index)
 
-        # Else save the specified extracted palettes.
-        else:
-            preview_and_save(extractor, 't', index)
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Handles color extraction from image(s), running decoding, extraction and saving as a pipeline.
+#   @details    While one image is being saved, the next images are already
+#               being extracted and decoded. Previews and prompts need the
+#               terminal, so results are saved one at a time unless previews
+#               are off and a batch overwrite policy (e.g. --yes) is used.
+#
+#   @param  handle_results  A function that takes the results (see pipeline.generate_results()) and the work item of an image.
+#   @param  catalog         A palette catalog whose unchanged images are skipped (see catalog_utils.PaletteCatalog), or None.
+def extract_color_palettes_pipelined(handle_results, catalog=None):
+    from . import pipeline
 
-        if index < len(PROPER_IMAGES) - 1:  # Print blank line separator if there are more images.
+    write_workers = WRITE_WORKERS
+    if saves_separate_files() and (SHOW_PREVIEW or OVERWRITE_POLICY == 'ask'):
+        write_workers = 1
+
+    source_stats = {'images-found': 0, 'invalid-sources': [], 'failed-images': []}
+    first_result = [True]
+
+    def handle_result(work_item, results):
+        if not first_result[0]:     # Print blank line separator between images.
             print()
+        first_result[0] = False
+
+        print("Processing ", work_item['filename'], " : COMPLETED", sep='')
+        handle_results(results, work_item)
+
+    failures = pipeline.run_pipeline(get_work_items(source_stats, catalog=catalog), handle_result, options=get_extraction_options(),
+                                     decode_workers=DECODE_WORKERS, compute_workers=COMPUTE_WORKERS,
+                                     write_workers=write_workers,
+                                     compute_backend='thread' if BACKEND == 'thread' else 'process',
+                                     keep_order=KEEP_ORDER, pool=COMPUTE_POOL)
+
+    for work_item, error in failures:
+        print("Processing ", work_item['filename'], " : FAILED (", error, ")", sep='', file=sys.stderr)
+        source_stats['failed-images'].append(work_item['filename'])
+
+    report_sources(source_stats)
 
 
 # **************************************************************************
@@ -247,14 +596,67 @@ def setup_argument_parser():
     argument_parser.add_argument("-p", "--path", metavar="", type=str,
                                  help="Specify the path from where to use images. "
                                       "Absolute path is preferred, but relative path can also be used.")
+    argument_parser.add_argument("--stdin", action="store_true",
+                                 help="Reads image file paths from the standard input, one per line, and writes the results to stdout "
+                                      "as JSON Lines records as each image finishes (unless --ndjson is used). "
+                                      "Existing files are never overwritten without -y --yes.")
+    argument_parser.add_argument("-0", "--null", action="store_true",
+                                 help="The image file paths read with --stdin are separated by NUL characters (e.g. from 'find -print0').")
+    argument_parser.add_argument("--watch", metavar="DIR", type=str,
+                                 help="Keeps watching the directory, and extracts the images that are new or modified since they were "
+                                      "last extracted, until stopped with Ctrl+C. Their existing output files are overwritten without asking.")
+    argument_parser.add_argument("--watch-interval", metavar="SECONDS", type=float,
+                                 help="Number of seconds between 2 rescans of the --watch directory (default: 2).")
+    argument_parser.add_argument("--recursive", action="store_true",
+                                 help="Also uses the images in the subdirectories of the -p --path directory.")
+    argument_parser.add_argument("--include", metavar="GLOB", action="append",
+                                 help="Only uses image files that match the glob pattern (e.g. '*.png'). Can be used more than once.")
+    argument_parser.add_argument("--exclude", metavar="GLOB", action="append",
+                                 help="Skips image files and directories that match the glob pattern (e.g. 'drafts'). Can be used more than once.")
+    argument_parser.add_argument("--validate-workers", metavar="N", type=int,
+                                 help="Number of threads that check the image files ahead of extraction (default: 4).")
+    argument_parser.add_argument("--trust-extensions", action="store_true",
+                                 help="Accepts image files by their extension alone, without opening them first. "
+                                      "Files that turn out not to be valid images fail when they're decoded, without stopping the other images.")
+    argument_parser.add_argument("--fail-on-error", action="store_true",
+                                 help="Exits with an error status if any image fails to be decoded or extracted, "
+                                      "once the other images are done (by default failed images are only listed).")
     argument_parser.add_argument("-o", "--output", metavar="", type=str,
                                  help="Specify the output path where to store the JSON color palette.")
+    output_group = argument_parser.add_mutually_exclusive_group()
+    output_group.add_argument("--ndjson", metavar="FILE", type=str,
+                              help="Writes the results of all the images to a single JSON Lines file, one record per image, "
+                                   "instead of separate files ('-' writes to stdout).")
+    output_group.add_argument("--store", metavar="FILE", type=str,
+                              help="Appends the extracted colors and ratios of all the images to a palette store "
+                                   "(a NumPy .npy file that can be memory-mapped), instead of separate files.")
+    output_group.add_argument("--catalog", metavar="FILE", type=str,
+                              help="Keeps the results of all the images in a SQLite database, instead of separate files. "
+                                   "Images that haven't changed since they were added are skipped.")
+    argument_parser.add_argument("--manifest", metavar="FILE", type=str,
+                                 help="Records each completed image (its path, content hash and output files) in an append-only "
+                                      "JSON Lines manifest, so the batch can be resumed with --resume if it's interrupted.")
+    argument_parser.add_argument("--resume", action="store_true",
+                                 help="Skips the images that the --manifest lists as completed (and that haven't changed since), "
+                                      "without decoding them, and adds the other images to it.")
+    argument_parser.add_argument("--compact-json", action="store_true",
+                                 help="Exports JSON files on a single line, without indentation and whitespace, which is faster to write and read.")
+    argument_parser.add_argument("--fsync", action="store_true",
+                                 help="Flushes all the saved files to disk once the whole batch is done, so they survive a power loss.")
     argument_parser.add_argument("--save-check", action="store_true",
                                  help="Asks if the user wants to save the extracted color palettes.")
     argument_parser.add_argument("--preview", action="store_true",
                                  help="Shows a preview of the extracted color palettes before saving.")
     argument_parser.add_argument("--preview-check", action="store_true",
                                  help="Shows a preview of, and asks if the user wants to save, the extracted color palettes.")
+    overwrite_group = argument_parser.add_mutually_exclusive_group()
+    overwrite_group.add_argument("-y", "--yes", action="store_true",
+                                 help="Answers yes to every prompt: saves without a save check and overwrites existing files.")
+    overwrite_group.add_argument("--no-clobber", action="store_true",
+                                 help="Never overwrites existing files and saves without a save check, without prompting.")
+    overwrite_group.add_argument("--skip-existing", action="store_true",
+                                 help="Skips images whose output files all exist already, before decoding them. "
+                                      "Otherwise works like --no-clobber.")
     argument_parser.add_argument("--pastel", action="store_true",
                                  help="Converts all color types into pastel.")
     argument_parser.add_argument("--pastel-light", action="store_true",
@@ -269,6 +671,31 @@ def setup_argument_parser():
                                  help="Generates 2 adaptive color palettes from the extracted colors.")
     argument_parser.add_argument("-r", "--raw-dump", action="store_true",
                                  help="Saves the raw extracted colors without organizing them into color palettes.")
+    argument_parser.add_argument("--memory-budget", metavar="MB", type=int,
+                                 help="Decodes very large images in strips, using at most about this many megabytes of memory per image.")
+    argument_parser.add_argument("--backend", choices=['auto', 'serial', 'thread', 'process'], default='auto',
+                                 help="Selects how images are processed in parallel: with processes, threads, serially, "
+                                      "or automatically based on the image size (default: auto).")
+    argument_parser.add_argument("--parallel-threshold", metavar="PIXELS", type=int,
+                                 help="Processes images with fewer pixels than this in a single process, and larger images in parallel. "
+                                      "Also prints which execution path was taken for each image.")
+    argument_parser.add_argument("--pipeline", action="store_true",
+                                 help="Decodes, extracts and saves several images at the same time, in a pipeline of separate stages.")
+    argument_parser.add_argument("--decode-workers", metavar="N", type=int,
+                                 help="Number of threads that decode images when using --pipeline (default: 2).")
+    argument_parser.add_argument("--compute-workers", metavar="N", type=int,
+                                 help="Number of processes that extract colors when using --pipeline (default: number of CPUs).")
+    argument_parser.add_argument("--write-workers", metavar="N", type=int,
+                                 help="Number of threads that save palettes when using --pipeline (default: 1).")
+    argument_parser.add_argument("-j", "--jobs", metavar="N", type=int,
+                                 help="Extracts N images at the same time. Same as --pipeline --compute-workers N.")
+    argument_parser.add_argument("--keep-order", action="store_true",
+                                 help="Hands the results of --pipeline over in the same order as the images, instead of as soon as "
+                                      "each image finishes. Only a bounded number of images get ahead of the slowest one.")
+    argument_parser.add_argument("--daemon", action="store_true",
+                                 help="Keeps PyPalEx loaded in the background and answers later palex calls through a Unix socket.")
+    argument_parser.add_argument("--no-daemon", action="store_true",
+                                 help="Runs this call in its own process, even if a daemon is running.")
     argument_parser.add_argument("-g", "--gen-config", action="store_true",
                                  help="Generates a default configuration file.")
     argument_parser.add_argument("-w", "--where", action="store_true",
@@ -279,56 +706,6 @@ def setup_argument_parser():
     return argument_parser
 
 
-# --------------------------------------------------------------------------
-# --------------------------------------------------------------------------
-
-##  Checks each of the sources provided and removes any bad sources.
-#   @details    Any filepaths or source files that are not images or
-#               do not exist get removed.
-#
-#   @param  filepaths   List of file paths.
-#   @param  path        A path to the images, if it is provided.
-#
-#   @return True if all/some sources are good, False if all sources are bad.
-def check_sources(filepaths, path=None):
-    bad_source_paths = []
-    for filepath in filepaths:
-        source_filepath = filepath
-        if path is not None:
-            source_filepath = os.path.join(path, filepath)
-        if not check_source(source_filepath):
-            bad_source_paths.append(filepath)
-
-    # Remove all the bad source paths from filepaths.
-    for bad_source in bad_source_paths:
-        filepaths.remove(bad_source)
-
-    if len(filepaths) == 0:
-        return False
-
-    bad_source_paths.clear()
-
-    # Check to make sure the remaining files are images.
-    for filepath in filepaths:
-        image_filepath = filepath
-        if path is not None:
-            image_filepath = os.path.join(path, filepath)
-        if not filetype.is_image(image_filepath):
-            bad_source_paths.append(filepath)
-        else:
-            try:
-                Image.open(image_filepath)
-            except IOError:
-                bad_source_paths.append(filepath)
-
-    # Remove all the bad images from filepaths.
-    for bad_source in bad_source_paths:
-        filepaths.remove(bad_source)
-
-    # Return true if there are proper images that can be used.
-    return len(filepaths) != 0
-
-
 # --------------------------------------------------------------------------
 # --------------------------------------------------------------------------
 
@@ -358,6 +735,7 @@ def handle_config():
     global EXPORT_COLOR_FORMAT
     global EXPORT_PALETTE_TEMPLATES
 
+    import yaml
     with open(config_filepath, 'r') as config_file:
         config_data = yaml.load(config_file, Loader=yaml.SafeLoader)
 
@@ -385,42 +763,105 @@ def set_global_args(args):
     global PALETTE_COLOR_TYPES_CONTAINED
     global SAVE_CHECK
     global SHOW_PREVIEW
+    global OVERWRITE_POLICY
+    global SKIP_EXISTING
+    global NDJSON_OUTPUT
+    global STORE_PATH
+    global CATALOG_PATH
+    global MANIFEST_PATH
+    global RESUME
+    global FSYNC
+    global COMPACT_JSON
     global ADAPTIVE_PALETTE
     global MOOD_PALETTE
     global SAVE_RAW
     global PASTEL_L
     global PASTEL_N
     global PASTEL_D
+    global MEMORY_BUDGET
+    global BACKEND
+    global PARALLEL_THRESHOLD
+    global PIPELINE
+    global DECODE_WORKERS
+    global COMPUTE_WORKERS
+    global WRITE_WORKERS
+    global KEEP_ORDER
     global OUTPUT_PATH
-    global PROPER_IMAGES
-    global FILENAMES
-    global IMAGE_NAMES
+    global SOURCE_FILES
+    global SOURCE_PATH
+    global READ_STDIN
+    global NULL_SEPARATED
+    global WATCH
+    global WATCH_INTERVAL
+    global RECURSIVE
+    global INCLUDE_PATTERNS
+    global EXCLUDE_PATTERNS
+    global VALIDATE_WORKERS
+    global TRUST_EXTENSIONS
+    global FAIL_ON_ERROR
 
     if args['save_check'] or args['preview_check']:
         SAVE_CHECK = True
     if args['preview'] or args['preview_check']:
         SHOW_PREVIEW = True
+    if args['yes']:
+        OVERWRITE_POLICY = 'yes'
+    elif args['no_clobber'] or args['skip_existing']:
+        OVERWRITE_POLICY = 'no'
+    SKIP_EXISTING = args['skip_existing']
+    NDJSON_OUTPUT = args['ndjson']
+    STORE_PATH = args['store']
+    CATALOG_PATH = args['catalog']
+    MANIFEST_PATH = args['manifest']
+    RESUME = args['resume']
+    if args['stdin']:
+        # The standard input carries the image paths, so it can't answer prompts, and the results go to stdout by default.
+        if OVERWRITE_POLICY == 'ask':
+            OVERWRITE_POLICY = 'no'
+        if saves_separate_files():
+            NDJSON_OUTPUT = '-'
+    if args['watch'] is not None and OVERWRITE_POLICY == 'ask':
+        # Modified images are extracted again to keep their outputs current, and the prompts would stop the watch.
+        OVERWRITE_POLICY = 'yes'
+    FSYNC = args['fsync']
+    COMPACT_JSON = args['compact_json']
     ADAPTIVE_PALETTE = args['adaptive']
     MOOD_PALETTE = args['mood']
     SAVE_RAW = args['raw_dump']
     PASTEL_L = args['pastel_light'] or args['pastel']
     PASTEL_N = args['pastel_normal'] or args['pastel']
     PASTEL_D = args['pastel_dark'] or args['pastel']
+    if args['memory_budget'] is not None:
+        MEMORY_BUDGET = args['memory_budget'] * 1024 * 1024
+    BACKEND = args['backend']
+    PARALLEL_THRESHOLD = args['parallel_threshold']
+    PIPELINE = args['pipeline']
+    if args['decode_workers'] is not None:
+        DECODE_WORKERS = max(1, args['decode_workers'])
+    if args['compute_workers'] is not None:
+        COMPUTE_WORKERS = max(1, args['compute_workers'])
+    if args['write_workers'] is not None:
+        WRITE_WORKERS = max(1, args['write_workers'])
+    if args['jobs'] is not None:
+        PIPELINE = True
+        COMPUTE_WORKERS = max(1, args['jobs'])
+    KEEP_ORDER = args['keep_order']
 
     OUTPUT_PATH = args['output'] if args['output'] is not None else ''
-    args_path = args['path']
-
-    for image_path in args['files']:
-        filepath, filename = os.path.split(image_path)
-        image_name, extension = filename.split('.')
-        if args_path is not None:
-            if filepath == '':
-                filepath = args_path
-            else:
-                filepath = os.path.join(args_path, filepath)
-        FILENAMES.append(filename)
-        IMAGE_NAMES.append(image_name)
-        PROPER_IMAGES.append(os.path.join(filepath, filename))
+    SOURCE_FILES = args['files'] if args['files'] is not None else []
+    SOURCE_PATH = args['path'] if args['watch'] is None else args['watch']
+    READ_STDIN = args['stdin']
+    NULL_SEPARATED = args['null']
+    WATCH = args['watch'] is not None
+    if args['watch_interval'] is not None:
+        WATCH_INTERVAL = max(0.1, args['watch_interval'])
+    RECURSIVE = args['recursive']
+    INCLUDE_PATTERNS = args['include'] if args['include'] is not None else []
+    EXCLUDE_PATTERNS = args['exclude'] if args['exclude'] is not None else []
+    if args['validate_workers'] is not None:
+        VALIDATE_WORKERS = max(1, args['validate_workers'])
+    TRUST_EXTENSIONS = args['trust_extensions']
+    FAIL_ON_ERROR = args['fail_on_error']
 
     # Check to make sure there are at least some default themes to export.
     if (EXPORT_PALETTE_TEMPLATES is None or not EXPORT_PALETTE_TEMPLATES) or ADAPTIVE_PALETTE or MOOD_PALETTE:
@@ -466,40 +907,424 @@ def set_global_args(args):
             PALETTE_COLOR_TYPES_CONTAINED[palette_name] = palette_types
 
 
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Resets the global variables to their default values.
+#   @details    Needed when the command line interface runs more than once
+#               in the same process (e.g. in the daemon).
+def reset_global_args():
+    global SOURCE_FILES
+    global SOURCE_PATH
+    global READ_STDIN
+    global NULL_SEPARATED
+    global WATCH
+    global WATCH_INTERVAL
+    global RECURSIVE
+    global INCLUDE_PATTERNS
+    global EXCLUDE_PATTERNS
+    global VALIDATE_WORKERS
+    global TRUST_EXTENSIONS
+    global FAIL_ON_ERROR
+    global OUTPUT_PATH
+    global EXPORT_FILE_FORMAT
+    global EXPORT_COLOR_FORMAT
+    global EXPORT_PALETTE_TEMPLATES
+    global PALETTE_COLOR_TYPES_CONTAINED
+    global SAVE_CHECK
+    global SHOW_PREVIEW
+    global OVERWRITE_POLICY
+    global SKIP_EXISTING
+    global NDJSON_OUTPUT
+    global STORE_PATH
+    global CATALOG_PATH
+    global MANIFEST_PATH
+    global RESUME
+    global FSYNC
+    global COMPACT_JSON
+    global ADAPTIVE_PALETTE
+    global MOOD_PALETTE
+    global SAVE_RAW
+    global PASTEL_L
+    global PASTEL_N
+    global PASTEL_D
+    global MEMORY_BUDGET
+    global BACKEND
+    global PARALLEL_THRESHOLD
+    global PIPELINE
+    global DECODE_WORKERS
+    global COMPUTE_WORKERS
+    global WRITE_WORKERS
+    global KEEP_ORDER
+
+    SOURCE_FILES = []
+    SOURCE_PATH = None
+    READ_STDIN = False
+    NULL_SEPARATED = False
+    WATCH = False
+    WATCH_INTERVAL = 2.0
+    RECURSIVE = False
+    INCLUDE_PATTERNS = []
+    EXCLUDE_PATTERNS = []
+    VALIDATE_WORKERS = 4
+    TRUST_EXTENSIONS = False
+    FAIL_ON_ERROR = False
+    OUTPUT_PATH = ''
+    EXPORT_FILE_FORMAT = 'json'
+    EXPORT_COLOR_FORMAT = 'hex'
+    EXPORT_PALETTE_TEMPLATES = {}
+    PALETTE_COLOR_TYPES_CONTAINED = {}
+    SAVE_CHECK = False
+    SHOW_PREVIEW = False
+    OVERWRITE_POLICY = 'ask'
+    SKIP_EXISTING = False
+    NDJSON_OUTPUT = None
+    STORE_PATH = None
+    CATALOG_PATH = None
+    MANIFEST_PATH = None
+    RESUME = False
+    FSYNC = False
+    COMPACT_JSON = False
+    WRITTEN_FILEPATHS.clear()
+    UNCHANGED_FILEPATHS.clear()
+    ADAPTIVE_PALETTE = False
+    MOOD_PALETTE = False
+    SAVE_RAW = False
+    PASTEL_L = False
+    PASTEL_N = False
+    PASTEL_D = False
+    MEMORY_BUDGET = None
+    BACKEND = 'auto'
+    PARALLEL_THRESHOLD = None
+    PIPELINE = False
+    DECODE_WORKERS = 2
+    COMPUTE_WORKERS = None
+    WRITE_WORKERS = 1
+    KEEP_ORDER = False
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Finds the images to extract and yields a work item for each one, as soon as it's found.
+#   @details    Images are found and checked lazily (on VALIDATE_WORKERS
+#               threads), so the first images are extracted while the rest of
+#               the sources are still being scanned and checked. With
+#               --skip-existing, images whose output files all exist already
+#               are skipped before they're decoded, and so are the images that
+#               are unchanged in the palette catalog, if there's one, the
+#               images that are already in the palette store, and the images
+#               that the manifest lists as completed, with --resume.
+#
+#               Paths read from the standard input are checked one at a time,
+#               as soon as each one is read, so a program that writes them
+#               slowly gets every result without waiting for the next paths.
+#
+#   @param  source_stats    A dictionary where the number of 'images-found' (including skipped ones) is counted,
+#                           and the paths of the files that aren't valid images are added to 'invalid-sources'
+#                           (the images that fail later on are added to 'failed-images' by the caller).
+#   @param  catalog         A palette catalog (see catalog_utils.PaletteCatalog), or None. The 'source-state' of the images
+#                           that are extracted is added to their work items, to be kept in the catalog.
+#
+#   @return Generator of work item dictionaries (see source_utils.create_work_item()).
+def get_work_items(source_stats, catalog=None):
+    from . import source_utils as srcutils
+
+    filepaths = SOURCE_FILES
+    validate_workers = VALIDATE_WORKERS
+    if READ_STDIN:
+        import itertools
+        filepaths = itertools.chain(SOURCE_FILES, srcutils.read_filepaths(sys.stdin.buffer, null_separated=NULL_SEPARATED))
+        validate_workers = 1
+
+    work_items = srcutils.find_image_sources(filepaths, SOURCE_PATH, recursive=RECURSIVE,
+                                             include_patterns=INCLUDE_PATTERNS, exclude_patterns=EXCLUDE_PATTERNS,
+                                             allow_large_images=MEMORY_BUDGET is not None, workers=validate_workers,
+                                             invalid_sources=source_stats['invalid-sources'],
+                                             trust_extensions=TRUST_EXTENSIONS, sources=CHANGED_SOURCES)
+    for work_item in work_items:
+        source_stats['images-found'] += 1
+
+        if SKIP_EXISTING and saves_separate_files():
+            output_filepaths = get_output_filepaths(work_item['image-name'])
+            if output_filepaths and all(os.path.isfile(output_filepath) for output_filepath in output_filepaths):
+                print("Skipping ", work_item['filename'], " : ALREADY EXTRACTED", sep='')
+                if 'image' in work_item:
+                    work_item['image'].close()
+                continue
+
+        if catalog is not None:
+            is_unchanged, work_item['source-state'] = catalog.check_source(work_item['path'])
+            if is_unchanged:
+                print("Skipping ", work_item['filename'], " : UNCHANGED", sep='')
+                if 'image' in work_item:
+                    work_item['image'].close()
+                continue
+
+        if BATCH_STORE is not None and BATCH_STORE.check_source(work_item['path']):
+            print("Skipping ", work_item['filename'], " : ALREADY STORED", sep='')
+            if 'image' in work_item:
+                work_item['image'].close()
+            continue
+
+        if BATCH_MANIFEST is not None:
+            is_completed, work_item['manifest-state'] = BATCH_MANIFEST.check_source(work_item['path'])
+            if is_completed:
+                print("Skipping ", work_item['filename'], " : ALREADY COMPLETED", sep='')
+                if 'image' in work_item:
+                    work_item['image'].close()
+                continue
+
+        yield work_item
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Reports the files that weren't valid images and the images that failed, once all the images are done.
+#
+#   @param  source_stats    A dictionary of the 'images-found', 'invalid-sources' and 'failed-images' (see get_work_items()).
+#
+#   @exception  SystemExit  If there were no valid images at all, or if any image failed with FAIL_ON_ERROR (unless a
+#                           directory is watched, where the images are tried again once they change).
+def report_sources(source_stats):
+    invalid_sources = source_stats['invalid-sources']
+    if invalid_sources:
+        print(file=sys.stderr)
+        print("Skipped ", len(invalid_sources), " file(s) that aren't valid images : ", sep='', file=sys.stderr)
+        for invalid_source in invalid_sources:
+            print("   - ", invalid_source, sep='', file=sys.stderr)
+
+    failed_images = source_stats['failed-images']
+    failed_message = "Failed to extract " + str(len(failed_images)) + " of " + str(source_stats['images-found']) + " image(s)."
+    if failed_images and (WATCH or not FAIL_ON_ERROR):
+        print(failed_message, file=sys.stderr)
+    if WATCH:
+        return
+
+    if source_stats['images-found'] == 0:
+        sys.exit(argmsg.bad_source_message())
+
+    if failed_images and FAIL_ON_ERROR:
+        sys.exit(failed_message)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the paths of all the output files of an image, without extracting anything.
+#
+#   @param  image_name  A string that represents the name of the image.
+#
+#   @return List of strings that represent the paths of the output files.
+def get_output_filepaths(image_name):
+    from . import file_utils as futils
+
+    output_filepaths = []
+    for save_type in get_save_types():
+        if save_type == 'r':
+            output_filepaths.append(futils.get_raw_dump_filepath(image_name, OUTPUT_PATH, EXPORT_FILE_FORMAT))
+        else:
+            output_filepaths += futils.get_palette_filepaths(get_palette_names(save_type), image_name, OUTPUT_PATH,
+                                                             EXPORT_FILE_FORMAT, palette_color_types=PALETTE_COLOR_TYPES_CONTAINED)
+
+    return output_filepaths
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Checks if the results of each image are saved to their own separate files.
+#
+#   @return True if separate files are saved, False if the results go to a JSON Lines file, a palette store or a palette catalog.
+def saves_separate_files():
+    return NDJSON_OUTPUT is None and STORE_PATH is None and CATALOG_PATH is None
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the types of palettes to save for each image.
+#
+#   @return List of string characters that specify the types of palettes to save (i.e. a = adaptive, m = mood, r = raw, t = templates).
+def get_save_types():
+    # If the user selected adaptive or mood palette creation.
+    if ADAPTIVE_PALETTE or MOOD_PALETTE or SAVE_RAW:
+        save_types = []
+        if ADAPTIVE_PALETTE:
+            save_types.append('a')
+        if MOOD_PALETTE:
+            save_types.append('m')
+        if SAVE_RAW:
+            save_types.append('r')
+        return save_types
+
+    # Else save the specified extracted palettes.
+    return ['t']
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the names of the palettes of a save type.
+#
+#   @param  save_type   A string character that specifies what type of palette to save (i.e. a = adaptive, m = mood, t = templates).
+#
+#   @return List of palette names.
+def get_palette_names(save_type):
+    if save_type == 'a':
+        return [LIGHT_ADAPTIVE_PALETTE_NAME, DARK_ADAPTIVE_PALETTE_NAME]
+    if save_type == 'm':
+        return [LIGHT_MOOD_PALETTE_NAME, DARK_MOOD_PALETTE_NAME]
+    if EXPORT_PALETTE_TEMPLATES is None or not EXPORT_PALETTE_TEMPLATES:
+        return ['light-theme', 'dark-theme']
+
+    return list(EXPORT_PALETTE_TEMPLATES.keys())
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the options used to extract colors and generate palettes from them.
+#   @details    A palette store always gets RGB colors, so the stored colors
+#               aren't quantized by the export color format (e.g. 'ansi').
+#
+#   @return Dictionary of options (see pipeline.DEFAULT_OPTIONS).
+def get_extraction_options():
+    color_format = 'rgb' if STORE_PATH is not None else EXPORT_COLOR_FORMAT
+
+    return {'pastel-light': PASTEL_L, 'pastel-normal': PASTEL_N, 'pastel-dark': PASTEL_D,
+            'template-palettes': not (ADAPTIVE_PALETTE or MOOD_PALETTE or SAVE_RAW),
+            'adaptive-palettes': ADAPTIVE_PALETTE, 'mood-palettes': MOOD_PALETTE,
+            'palette-templates': EXPORT_PALETTE_TEMPLATES, 'color-format': color_format,
+            'memory-budget': MEMORY_BUDGET, 'parallel-threshold': PARALLEL_THRESHOLD,
+            'light-adaptive-name': LIGHT_ADAPTIVE_PALETTE_NAME, 'dark-adaptive-name': DARK_ADAPTIVE_PALETTE_NAME,
+            'light-mood-name': LIGHT_MOOD_PALETTE_NAME, 'dark-mood-name': DARK_MOOD_PALETTE_NAME}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the settings that change the outputs of a watched directory, so each set of settings has its own index.
+#
+#   @return Dictionary of settings.
+def get_watch_settings():
+    def get_abspath(path):
+        return os.path.abspath(path) if path not in (None, '', '-') else path
+
+    return {'options': get_extraction_options(), 'output': get_abspath(OUTPUT_PATH), 'file-format': EXPORT_FILE_FORMAT,
+            'save-types': get_save_types(), 'ndjson': NDJSON_OUTPUT, 'store': get_abspath(STORE_PATH),
+            'catalog': get_abspath(CATALOG_PATH), 'recursive': RECURSIVE, 'include': INCLUDE_PATTERNS,
+            'exclude': EXCLUDE_PATTERNS}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Shows a preview of and saves the results of an image.
+#
+#   @param  results     A dictionary of results (see pipeline.generate_results()).
+#   @param  work_item   A work item dictionary of the image (see source_utils.create_work_item()).
+def save_results(results, work_item):
+    for index, save_type in enumerate(get_save_types()):
+        if index > 0:   # Print blank line separator between palette types.
+            print()
+        preview_and_save(results, save_type, work_item['image-name'])
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates a function that writes the results of each image as a record of a JSON Lines file.
+#   @details    The records are written in the order the images finish, and
+#               the writes are guarded by a lock, so several pipeline write
+#               workers can share the file.
+#
+#   @param  ndjson_file A writable text file object (e.g. an open file or sys.stdout).
+#
+#   @return A function that takes the results (see pipeline.generate_results()) and the work item of an image.
+def create_ndjson_writer(ndjson_file):
+    from . import file_utils as futils
+
+    lock = threading.Lock()
+
+    def write_record(results, work_item):
+        futils.write_ndjson_record(ndjson_file, results, source_path=work_item['path'], lock=lock)
+
+    return write_record
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates a function that hands the results of each image over, and then records the image in the manifest.
+#   @details    An image is only recorded once its results were handed over
+#               without errors, so images that fail are extracted again when
+#               the batch is resumed.
+#
+#   @param  handle_results  A function that takes the results (see pipeline.generate_results()) and the work item of an image.
+#
+#   @return A function that takes the results and the work item of an image.
+def create_manifest_recorder(handle_results):
+    batch_manifest = BATCH_MANIFEST
+
+    def record_results(results, work_item):
+        handle_results(results, work_item)
+        batch_manifest.add(work_item['path'], get_manifest_outputs(work_item['image-name']),
+                           source_state=work_item.get('manifest-state'))
+
+    return record_results
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the paths of the outputs that an image is written to, to be recorded in the manifest.
+#
+#   @param  image_name  A string that represents the name of the image.
+#
+#   @return List of strings that represent the paths of the output files ('-' for the standard output).
+def get_manifest_outputs(image_name):
+    if STORE_PATH is not None:
+        return [STORE_PATH]
+    if CATALOG_PATH is not None:
+        return [CATALOG_PATH]
+    if NDJSON_OUTPUT is not None:
+        return [NDJSON_OUTPUT]
+
+    return get_output_filepaths(image_name)
+
+
 # --------------------------------------------------------------------------
 # --------------------------------------------------------------------------
 
 ##  Shows a preview of and saves the extracted color palette(s).
 #
-#   @param  extractor   An Extractor object.
-#   @param  save_type   A string character that specifies what type of palette to extract and save (i.e. a = adaptive, m = mood, r = raw, t = templates).
-#   @param  img_index   The integer index used to identify the image name.
-def preview_and_save(extractor, save_type, img_index):
+#   @param  results     A dictionary of results (see pipeline.generate_results()).
+#   @param  save_type   A string character that specifies what type of palette to save (i.e. a = adaptive, m = mood, r = raw, t = templates).
+#   @param  image_name  A string that represents the name of the image.
+def preview_and_save(results, save_type, image_name):
+    from . import file_utils as futils
+    from . import print_utils as prn
+
     if save_type not in {'a', 'm', 'r', 't'}:
         return
 
     palettes = None
-    if save_type == 'a':
-        palettes = extractor.generate_adaptive_palettes(light_palette_name=LIGHT_ADAPTIVE_PALETTE_NAME, dark_palette_name=DARK_ADAPTIVE_PALETTE_NAME)
-    elif save_type == 'm':
-        palettes = extractor.generate_mood_palettes(light_palette_name=LIGHT_MOOD_PALETTE_NAME, dark_palette_name=DARK_MOOD_PALETTE_NAME)
+    if save_type in {'a', 'm'}:
+        palette_names = get_palette_names(save_type)
+        palettes = {name: palette for name, palette in results['palettes'].items() if name in palette_names}
     elif save_type == 't':
-        palettes = extractor.generate_palettes(EXPORT_PALETTE_TEMPLATES)
-
-    if save_type == 'r':
-        extractor.set_color_format(EXPORT_COLOR_FORMAT)
-    else:
-        for palette_name, palette in palettes.items():
-            extractor.set_color_format(EXPORT_COLOR_FORMAT, colors_dict=palette)
+        palettes = results['palettes']
 
     if SHOW_PREVIEW:
         if save_type == 'r':
-            prn.print_raw_colors(extractor.extracted_colors_dict, EXPORT_COLOR_FORMAT, pair_colors=False)
+            prn.print_raw_colors(results['raw-colors'], EXPORT_COLOR_FORMAT, pair_colors=False)
         else:
             prn.print_palette_preview(palettes, EXPORT_COLOR_FORMAT)
 
     save_file = True
-    if SAVE_CHECK:
+    if SAVE_CHECK and OVERWRITE_POLICY == 'ask':
         type_name = 'palettes'
         if save_type == 'a':
             type_name = 'adaptive palettes'
@@ -521,21 +1346,14 @@ def preview_and_save(extractor, save_type, img_index):
 
     if save_file:
         if save_type == 'r':
-            futils.raw_dump(extractor.extracted_colors_dict, IMAGE_NAMES[img_index], OUTPUT_PATH, EXPORT_FILE_FORMAT, EXPORT_COLOR_FORMAT)
+            futils.raw_dump(results['raw-colors'], image_name, OUTPUT_PATH, EXPORT_FILE_FORMAT, EXPORT_COLOR_FORMAT,
+                            overwrite_policy=OVERWRITE_POLICY, written_filepaths=WRITTEN_FILEPATHS,
+                            unchanged_filepaths=UNCHANGED_FILEPATHS, compact_json=COMPACT_JSON)
         else:
-            futils.save_palettes(palettes, IMAGE_NAMES[img_index], OUTPUT_PATH, EXPORT_FILE_FORMAT, EXPORT_COLOR_FORMAT, palette_color_types=PALETTE_COLOR_TYPES_CONTAINED)
-
-
-# **************************************************************************
-# **************************************************************************
-
-##  Checks to make sure the path leads to a file.
-#
-#   @param  filepath    Path to file with filename and file extension.
-#
-#   @return True if file exists, False otherwise.
-def check_source(filepath):
-    return os.path.exists(filepath) and os.path.isfile(filepath)
+            futils.save_palettes(palettes, image_name, OUTPUT_PATH, EXPORT_FILE_FORMAT, EXPORT_COLOR_FORMAT,
+                                 palette_color_types=PALETTE_COLOR_TYPES_CONTAINED, overwrite_policy=OVERWRITE_POLICY,
+                                 written_filepaths=WRITTEN_FILEPATHS, unchanged_filepaths=UNCHANGED_FILEPATHS,
+                                 compact_json=COMPACT_JSON)
 
 
 # **************************************************************************
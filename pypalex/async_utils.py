@@ -0,0 +1,69 @@
+##  @file   async_utils.py
+#   @brief  Utilities for extracting color palettes from asyncio code.
+#   @details    Decoding and extraction block for hundreds of milliseconds,
+#               so they are offloaded to executors and the event loop stays
+#               free while they run.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import asyncio
+import functools
+
+from . import pipeline
+
+
+##  Extracts the colors and palettes from a single image without blocking the event loop.
+#   @details    The image is decoded in the decode executor and then
+#               extracted in the executor, as 2 separate steps, so a
+#               cancelled extraction stops as soon as the current step is
+#               done (and a step that hasn't started yet never runs).
+#               A shared semaphore limits how many images are extracted
+#               at the same time, the extractions waiting on it can be
+#               cancelled as well.
+#
+#   @note   The executor can be a thread or a process pool executor, but the
+#           decode executor must be thread-based (the default one is), since
+#           image sources like file objects can't be sent to other processes.
+#
+#   @param  image_source    The image source (see Extractor.load()).
+#   @param  image_name      A string that represents the name of the image.
+#   @param  options         A dictionary of options (see pipeline.DEFAULT_OPTIONS).
+#   @param  executor        A concurrent.futures executor used for extraction (None uses the event loop's default executor).
+#   @param  semaphore       An asyncio.Semaphore that limits the number of concurrent extractions (optional).
+#   @param  decode_executor A thread-based concurrent.futures executor used for decoding (None uses the event loop's default executor).
+#
+#   @return Dictionary of results, the same as pipeline.extract_palettes().
+async def extract_async(image_source, image_name=None, options=None, executor=None, semaphore=None,
+                        decode_executor=None):
+    if semaphore is None:
+        return await extract_in_executors(image_source, image_name, options, executor, decode_executor)
+
+    async with semaphore:
+        return await extract_in_executors(image_source, image_name, options, executor, decode_executor)
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Decodes and extracts an image, one step per executor.
+#
+#   @param  image_source    The image source (see Extractor.load()).
+#   @param  image_name      A string that represents the name of the image.
+#   @param  options         A dictionary of options (see pipeline.DEFAULT_OPTIONS).
+#   @param  executor        A concurrent.futures executor used for extraction (or None).
+#   @param  decode_executor A thread-based concurrent.futures executor used for decoding (or None).
+#
+#   @return Dictionary of results, the same as pipeline.extract_palettes().
+async def extract_in_executors(image_source, image_name, options, executor, decode_executor):
+    options = pipeline.get_options(options)
+    loop = asyncio.get_running_loop()
+
+    pixels = await loop.run_in_executor(decode_executor, functools.partial(pipeline.decode_image, image_source,
+                                                                           memory_budget=options['memory-budget']))
+
+    return await loop.run_in_executor(executor, functools.partial(pipeline.compute_results, pixels,
+                                                                  image_name, options))
+
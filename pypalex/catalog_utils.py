@@ -0,0 +1,245 @@
+##  @file   catalog_utils.py
+#   @brief  Utilities for keeping a catalog of extracted palettes in a SQLite database.
+#   @details    The catalog keeps the path, content hash, modification time,
+#               extracted colors, ratios and generated palettes of every image
+#               that was processed, so running PyPalEx again over the same
+#               images only extracts the ones that changed since.
+#
+#               The colors, ratios and palettes are stored as JSON text, so
+#               they can be queried with SQLite's JSON functions, e.g.:
+#                   SELECT path, json_extract(raw_colors, '$.red') FROM images;
+#
+#   @note   The database is opened in WAL mode, so it can be read while
+#           images are being added, and rows are written in batches, one
+#           transaction per batch.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from . import file_utils as futils
+
+# ---- GLOBAL VARIABLES ----
+## The version of the catalog's database schema (stored as the database's user_version).
+CATALOG_SCHEMA_VERSION = 1
+## The SQL statement that creates the table of the catalog.
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,
+    image_name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    options_hash TEXT NOT NULL,
+    color_format TEXT NOT NULL,
+    raw_colors TEXT NOT NULL,
+    ratios TEXT NOT NULL,
+    palettes TEXT NOT NULL,
+    extracted_at REAL NOT NULL
+)
+"""
+## The number of rows that are buffered before they're written in a single transaction.
+CATALOG_BATCH_SIZE = 100
+## Set of the extraction options that only change how images are processed, not their results.
+EXECUTION_OPTIONS = {'memory-budget', 'parallel-threshold'}
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  A catalog of the palettes extracted from images, kept in a SQLite database.
+class PaletteCatalog:
+
+    ##  PaletteCatalog Constructor.
+    #   @details    Opens the catalog, or creates it if it doesn't exist yet.
+    #
+    #   @param  self                The object pointer.
+    #   @param  catalog_filepath    A string that represents the path of the database file.
+    #   @param  options             A dictionary of the extraction options (see pipeline.DEFAULT_OPTIONS), which images must
+    #                               have been extracted with to be unchanged.
+    #   @param  batch_size          An integer that represents the number of rows that are written in a single transaction.
+    #
+    #   @exception  ValueError  If the file isn't a palette catalog, or it was made by a newer PyPalEx version.
+    def __init__(self, catalog_filepath, options=None, batch_size=CATALOG_BATCH_SIZE):
+        self.catalog_filepath = catalog_filepath
+        self.options_hash = get_options_hash(options or {})
+        self.batch_size = max(1, batch_size)
+        self.lock = threading.Lock()
+        self.pending_rows = []
+        self.pending_updates = []
+        self.added_images = 0
+        self.unchanged_images = 0
+
+        self.connection = open_catalog(catalog_filepath)
+
+    ##  Checks if an image is unchanged since it was added to the catalog.
+    #   @details    An image whose size and modification time are the same is
+    #               unchanged without reading it. Otherwise its contents are
+    #               hashed, and an image with the same hash is still unchanged
+    #               (e.g. a file that was only touched or copied), in which case
+    #               its new modification time is recorded.
+    #
+    #   @param  self        The object pointer.
+    #   @param  image_path  A string that represents the path to the image.
+    #
+    #   @return A (is unchanged, source state) tuple, where the source state is a dictionary of the image's 'content-hash',
+    #           'mtime-ns' and 'size' (or None if the image can't be read).
+    def check_source(self, image_path):
+        try:
+            image_stat = os.stat(image_path)
+        except OSError:
+            return False, None
+
+        with self.lock:
+            row = self.connection.execute("SELECT content_hash, mtime_ns, size, options_hash FROM images WHERE path = ?",
+                                          (get_catalog_path(image_path),)).fetchone()
+            if row is not None and row[3] == self.options_hash and (row[1], row[2]) == (image_stat.st_mtime_ns, image_stat.st_size):
+                self.unchanged_images += 1
+                return True, {'content-hash': row[0], 'mtime-ns': row[1], 'size': row[2]}
+
+        try:
+            source_state = {'content-hash': futils.hash_file(image_path), 'mtime-ns': image_stat.st_mtime_ns,
+                            'size': image_stat.st_size}
+        except OSError:
+            return False, None
+
+        if row is None or row[3] != self.options_hash or row[0] != source_state['content-hash']:
+            return False, source_state
+
+        with self.lock:
+            self.unchanged_images += 1
+            self.pending_updates.append((source_state['mtime-ns'], source_state['size'], get_catalog_path(image_path)))
+
+        return True, source_state
+
+    ##  Adds (or replaces) the results of an image in the catalog.
+    #   @details    Thread-safe, so several pipeline write workers can share the catalog.
+    #
+    #   @param  self            The object pointer.
+    #   @param  results         A dictionary of results (see pipeline.generate_results()).
+    #   @param  image_path      A string that represents the path to the image.
+    #   @param  source_state    A dictionary of the image's 'content-hash', 'mtime-ns' and 'size' (see check_source()),
+    #                           which is read from the image if it isn't given.
+    def add(self, results, image_path, source_state=None):
+        if source_state is None:
+            image_stat = os.stat(image_path)
+            source_state = {'content-hash': futils.hash_file(image_path), 'mtime-ns': image_stat.st_mtime_ns,
+                            'size': image_stat.st_size}
+
+        row = (get_catalog_path(image_path), results['image-name'], source_state['content-hash'], source_state['mtime-ns'],
+               source_state['size'], self.options_hash, results['color-format'], json.dumps(results['raw-colors']),
+               json.dumps(results['ratios']), json.dumps(results['palettes']), time.time())
+
+        with self.lock:
+            self.pending_rows.append(row)
+            self.added_images += 1
+            if len(self.pending_rows) + len(self.pending_updates) >= self.batch_size:
+                self.write_pending_rows()
+
+    ##  Gets the number of images in the catalog, including the buffered ones.
+    #
+    #   @param  self    The object pointer.
+    #
+    #   @return The number of images.
+    def count_images(self):
+        with self.lock:
+            self.write_pending_rows()
+            return self.connection.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    ##  Writes the buffered rows and closes the catalog.
+    #
+    #   @param  self    The object pointer.
+    def close(self):
+        with self.lock:
+            try:
+                self.write_pending_rows()
+            finally:
+                self.connection.close()
+
+    ##  Writes the buffered rows and updates in a single transaction.
+    #
+    #   @note   The lock must be held by the caller.
+    #
+    #   @param  self    The object pointer.
+    def write_pending_rows(self):
+        if not self.pending_rows and not self.pending_updates:
+            return
+
+        with self.connection:   # Commits the transaction, or rolls it back if it fails.
+            self.connection.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        self.pending_rows)
+            self.connection.executemany("UPDATE images SET mtime_ns = ?, size = ? WHERE path = ?", self.pending_updates)
+
+        self.pending_rows = []
+        self.pending_updates = []
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Opens the database of a catalog in WAL mode, creating its table if it doesn't exist yet.
+#
+#   @param  catalog_filepath    A string that represents the path of the database file.
+#
+#   @return A SQLite connection that can be shared by threads (guarded by the catalog's lock).
+#
+#   @exception  ValueError  If the file isn't a palette catalog, or it was made by a newer PyPalEx version.
+def open_catalog(catalog_filepath):
+    catalog_dir = os.path.dirname(catalog_filepath)
+    if catalog_dir != '':
+        os.makedirs(catalog_dir, exist_ok=True)
+
+    connection = sqlite3.connect(catalog_filepath, check_same_thread=False)
+    try:
+        schema_version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version <= CATALOG_SCHEMA_VERSION:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")   # Safe with WAL: a crash can only lose the last transactions.
+            with connection:
+                connection.execute(CATALOG_SCHEMA)
+                connection.execute("PRAGMA user_version = " + str(CATALOG_SCHEMA_VERSION))
+    except sqlite3.DatabaseError as error:
+        connection.close()
+        raise ValueError("Not a palette catalog (" + str(error) + ") : " + catalog_filepath) from error
+
+    if schema_version > CATALOG_SCHEMA_VERSION:
+        connection.close()
+        raise ValueError("The palette catalog was made by a newer PyPalEx version : " + catalog_filepath)
+
+    return connection
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the path under which an image is kept in the catalog.
+#
+#   @param  image_path  A string that represents the path to the image.
+#
+#   @return A string of the absolute, normalized path to the image.
+def get_catalog_path(image_path):
+    return os.path.abspath(image_path)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Hashes the extraction options that change the results, so images extracted with other options aren't unchanged.
+#
+#   @param  options A dictionary of the extraction options (see pipeline.DEFAULT_OPTIONS).
+#
+#   @return A hexadecimal string of the hash of the options.
+def get_options_hash(options):
+    result_options = {name: value for name, value in options.items() if name not in EXECUTION_OPTIONS}
+    options_json = json.dumps(result_options, sort_keys=True, default=str)
+
+    return hashlib.blake2b(options_json.encode('utf-8'), digest_size=16).hexdigest()
@@ -8,6 +8,7 @@
 #   - Modified by Al Timofeyev on May 31, 2024.
 #   - Modified by Al Timofeyev on June 10, 2024.
 #   - Modified by Al Timofeyev on October 12, 2024.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 # RGB values for base colors.
@@ -92,3 +93,12 @@ SATURATION_TOLERANCE_RANGE = [15.0, 20.0]
 PASTEL_SATURATION_RANGE = [20.0, 55.0]
 PASTEL_BRIGHTNESS_RANGE = [65.0, 95.0]
 # -----------------------------------------------
+
+# Names of the base colors, in the order they appear on the color wheel.
+BASE_COLOR_NAMES = ['red', 'orange', 'yellow', 'chartreuse', 'green', 'spring',
+                    'cyan', 'azure', 'blue', 'violet', 'magenta', 'rose']
+
+# Names of the color types a base color is sorted into by saturation and brightness.
+COLOR_TYPE_NAMES = ['light', 'norm', 'dark', 'black',
+                    'achromatic light', 'achromatic norm', 'achromatic dark', 'achromatic black']
+# -----------------------------------------------
@@ -8,6 +8,11 @@
 #   - Modified by Al Timofeyev on April 5, 2023.
 #   - Modified by Al Timofeyev on July 8, 2024.
 #   - Modified by Al Timofeyev on October 12, 2024.
+#   - Modified by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import numpy
 
 
 ##  Convert HSV array [h,s,v] to HEX string '#ffffff'.
@@ -145,6 +150,43 @@ def rgb_to_hsv(rgb_array):
     return [h, s, v]
 
 
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Convert a matrix of RGB arrays [r,g,b] to a matrix of HSV arrays [h,s,v].
+#   @details    The vectorized version of rgb_to_hsv(), which gives the same
+#               values for every pixel but does all the work inside numpy.
+#               RGB where [r,g,b] are in the set [0, 255].
+#               HSV where h is in the set [0, 359] and s, v are in the set [0.0, 100.0].
+#
+#   @param  rgb_matrix_2d   A 2D numpy array of RGB arrays [r,g,b].
+#
+#   @return A 2D numpy array of HSV arrays [h,s,v].
+def rgb_matrix_to_hsv(rgb_matrix_2d):
+    rgb_matrix_2d = numpy.asarray(rgb_matrix_2d, dtype=numpy.float64) / 255
+    r, g, b = rgb_matrix_2d[:, 0], rgb_matrix_2d[:, 1], rgb_matrix_2d[:, 2]
+
+    min_color, max_color = rgb_matrix_2d.min(axis=1), rgb_matrix_2d.max(axis=1)
+    change_in_color = max_color - min_color
+    chromatic = change_in_color != 0
+    divisor = numpy.where(chromatic, change_in_color, 1.0)     # Avoid dividing by 0.
+
+    # Set saturation
+    s = numpy.zeros(len(rgb_matrix_2d))
+    numpy.divide(change_in_color, max_color, out=s, where=max_color != 0)
+
+    # Set hue (the checks follow the same order as rgb_to_hsv()).
+    h = numpy.where(max_color == r, numpy.mod((g - b) / divisor, 6),
+                    numpy.where(max_color == g, ((b - r) / divisor) + 2, ((r - g) / divisor) + 4))
+    h = numpy.where(chromatic, h, 0)
+
+    h = numpy.round(h*60)   # Degrees
+    s = s*100               # Percentage [0% - 100%]
+    v = max_color*100       # Percentage [0% - 100%]
+
+    return numpy.column_stack((h, s, v))
+
+
 # --------------------------------------------------------------------------
 # --------------------------------------------------------------------------
 
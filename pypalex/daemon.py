@@ -0,0 +1,374 @@
+##  @file   daemon.py
+#   @brief  Daemon mode that runs the command line interface from a Unix socket.
+#   @details    "palex --daemon" keeps PyPalEx loaded and listens on a Unix
+#               socket. Every other "palex" call first checks for a running
+#               daemon and, if there is one, forwards its arguments as a thin
+#               client, so it skips starting Python with numpy and Pillow.
+#
+#               The client and the daemon talk in JSON lines:
+#               - client -> daemon : the request ({"argv", "cwd", "columns", "lines", "version", "config-dir", "cache-dir"}),
+#                                    and replies to input prompts ({"input": line} or {"eof": true}).
+#               - daemon -> client : output ({"stdout": text}, {"stderr": text}), input prompts ({"input": prompt}),
+#                                    the exit code ({"exit": code}), or {"fallback": reason} to run without the daemon.
+#
+#   @note   This module only uses the standard library, so the client side
+#           stays fast to import.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import builtins
+import contextlib
+import io
+import json
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+
+from .settings import __version__, CONF_DIR, CACHE_DIR, DAEMON_SOCKET
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Forwards the command line arguments to a running daemon.
+#
+#   @param  argv    List of command line arguments (without the program name).
+#
+#   @return The exit code of the forwarded command, or None if there's no daemon to forward to.
+def forward(argv):
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(DAEMON_SOCKET):
+        return None
+
+    client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client_socket.connect(DAEMON_SOCKET)
+    except OSError:     # Stale socket file, the daemon isn't running.
+        client_socket.close()
+        return None
+
+    columns, lines = shutil.get_terminal_size()
+    request = {'argv': argv, 'cwd': os.getcwd(), 'columns': columns, 'lines': lines,
+               'version': __version__, 'config-dir': CONF_DIR, 'cache-dir': CACHE_DIR}
+
+    with client_socket, client_socket.makefile('rwb') as stream:
+        send_message(stream, request)
+
+        answered = False
+        for line in stream:
+            message = json.loads(line.decode('utf-8'))
+            if 'fallback' in message:
+                return None
+            answered = True
+
+            if 'stdout' in message:
+                sys.stdout.write(message['stdout'])
+                sys.stdout.flush()
+            elif 'stderr' in message:
+                sys.stderr.write(message['stderr'])
+                sys.stderr.flush()
+            elif 'input' in message:
+                sys.stdout.write(message['input'])
+                sys.stdout.flush()
+                user_input = sys.stdin.readline()
+                if user_input == '':
+                    send_message(stream, {'eof': True})
+                else:
+                    send_message(stream, {'input': user_input.rstrip('\n')})
+            elif 'exit' in message:
+                return message['exit']
+
+    if not answered:
+        return None
+
+    print("The PyPalEx daemon stopped before finishing the command.", file=sys.stderr)
+    return 1
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Runs the daemon until it's stopped (e.g. with CTRL+C or SIGTERM).
+#   @details    The daemon keeps a pool of worker processes (see
+#               parallel_utils.SHARED_POOL) that every forwarded call uses to
+#               process images in parallel.
+#
+#   @param  cli_module  The command line interface module (__main__.py), which must have main() and reset_global_args().
+def serve(cli_module):
+    if not hasattr(socket, 'AF_UNIX'):
+        sys.exit("The PyPalEx daemon needs Unix sockets, which aren't available on this platform.")
+
+    if os.path.exists(DAEMON_SOCKET):
+        if forward_is_possible():
+            sys.exit("A PyPalEx daemon is already running : " + DAEMON_SOCKET)
+        os.remove(DAEMON_SOCKET)    # Remove the stale socket file.
+
+    os.makedirs(os.path.dirname(DAEMON_SOCKET), exist_ok=True)
+
+    DaemonRequestHandler.cli_module = cli_module
+    # Only the current user can run commands through the daemon. The socket is created with these permissions,
+    # instead of changing them afterwards, so other users can't connect in between.
+    previous_umask = os.umask(0o077)
+    try:
+        daemon_server = socketserver.UnixStreamServer(DAEMON_SOCKET, DaemonRequestHandler)
+    finally:
+        os.umask(previous_umask)
+
+    # Keep the extraction modules loaded and a pool of worker processes warm, so the forwarded calls that process
+    # images in parallel don't start a new pool every time.
+    from . import parallel_utils as parallel
+    from . import pipeline
+    parallel.SHARED_POOL = pipeline.create_pool(ignore_interrupts=True)
+
+    print("PyPalEx daemon listening on ", DAEMON_SOCKET, " (press CTRL+C to stop)", sep='')
+    sys.stdout.flush()
+    try:
+        signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+        daemon_server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        parallel.SHARED_POOL.terminate()
+        parallel.SHARED_POOL = None
+        daemon_server.server_close()
+        if os.path.exists(DAEMON_SOCKET):
+            os.remove(DAEMON_SOCKET)
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Handles a single forwarded command line call.
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    ## The command line interface module that runs the forwarded calls.
+    cli_module = None
+
+    ##  Runs the forwarded command line call.
+    #
+    #   @param  self    The object pointer.
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        request = json.loads(line.decode('utf-8'))
+
+        # The daemon only runs calls that would behave the same without it.
+        if request.get('version') != __version__:
+            send_message(self.wfile, {'fallback': "version mismatch"})
+            return
+        if request.get('config-dir') != CONF_DIR or request.get('cache-dir') != CACHE_DIR:
+            send_message(self.wfile, {'fallback': "different config or cache directory"})
+            return
+        args = parse_forwarded_args(self.cli_module, request.get('argv', []))
+        if args.get('stdin'):       # The standard input of the client isn't forwarded.
+            send_message(self.wfile, {'fallback': "reads from the standard input"})
+            return
+        if args.get('watch'):       # A watch never ends, so it would keep the daemon busy.
+            send_message(self.wfile, {'fallback': "watches a directory"})
+            return
+
+        exit_code = run_cli(self.cli_module, request, self.rfile, self.wfile)
+        try:
+            send_message(self.wfile, {'exit': exit_code})
+        except OSError:     # The client has gone away.
+            pass
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Output stream that sends everything written to it to the client.
+class ClientStream:
+
+    ##  ClientStream Constructor.
+    #
+    #   @param  self        The object pointer.
+    #   @param  stream      A writable binary file object of the client connection.
+    #   @param  stream_name A string that represents the stream name (i.e. 'stdout' or 'stderr').
+    #   @param  lock        A lock shared by all the streams of the client connection.
+    def __init__(self, stream, stream_name, lock):
+        self.stream = stream
+        self.stream_name = stream_name
+        self.lock = lock
+
+    ##  Sends text to the client.
+    #
+    #   @param  self    The object pointer.
+    #   @param  text    A string to send.
+    #
+    #   @return The number of characters written.
+    def write(self, text):
+        if text:
+            with self.lock:
+                send_message(self.stream, {self.stream_name: text})
+        return len(text)
+
+    ##  Does nothing, since text is sent as soon as it's written.
+    #
+    #   @param  self    The object pointer.
+    def flush(self):
+        pass
+
+    ##  Tells that the stream isn't a terminal.
+    #
+    #   @param  self    The object pointer.
+    #
+    #   @return False.
+    def isatty(self):
+        return False
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Runs the command line interface for a forwarded request.
+#   @details    The output and input prompts are redirected to the client,
+#               and the working directory and terminal size of the client
+#               are used while the command runs. Requests are handled one at
+#               a time, so the redirections don't affect other requests.
+#
+#   @param  cli_module  The command line interface module (__main__.py).
+#   @param  request     A dictionary of the request.
+#   @param  rfile       A readable binary file object of the client connection.
+#   @param  wfile       A writable binary file object of the client connection.
+#
+#   @return The exit code of the command.
+def run_cli(cli_module, request, rfile, wfile):
+    lock = threading.Lock()
+
+    def client_input(prompt=''):
+        with lock:
+            send_message(wfile, {'input': str(prompt)})
+        reply = rfile.readline()
+        if not reply:
+            raise EOFError
+        reply = json.loads(reply.decode('utf-8'))
+        if 'input' not in reply:
+            raise EOFError
+        return reply['input']
+
+    saved_state = (sys.argv, sys.stdout, sys.stderr, builtins.input, os.getcwd(),
+                   os.environ.get('COLUMNS'), os.environ.get('LINES'))
+
+    # Daemon flags are never forwarded, so the daemon doesn't forward to itself.
+    sys.argv = ['palex'] + [arg for arg in request['argv'] if arg not in ('--daemon', '--no-daemon')] + ['--no-daemon']
+    sys.stdout = ClientStream(wfile, 'stdout', lock)
+    sys.stderr = ClientStream(wfile, 'stderr', lock)
+    builtins.input = client_input
+    os.environ['COLUMNS'], os.environ['LINES'] = str(request['columns']), str(request['lines'])
+
+    exit_code = 0
+    try:
+        os.chdir(request['cwd'])
+        cli_module.reset_global_args()
+        cli_module.main()
+    except SystemExit as system_exit:
+        exit_code = get_exit_code(system_exit.code)
+    except Exception:
+        try:
+            traceback.print_exc()
+        except OSError:
+            pass
+        exit_code = 1
+    finally:
+        sys.argv, sys.stdout, sys.stderr, builtins.input, cwd, columns, lines = saved_state
+        os.chdir(cwd)
+        restore_environment_variable('COLUMNS', columns)
+        restore_environment_variable('LINES', lines)
+
+    return exit_code
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Parses the forwarded command line arguments the same way the command line interface does.
+#   @details    Abbreviated options (e.g. --std) and options with attached
+#               values (e.g. --watch=DIR) are recognized like they are when
+#               the command runs.
+#
+#   @param  cli_module  The command line interface module (__main__.py).
+#   @param  argv        List of the forwarded command line arguments (without the program name).
+#
+#   @return A dictionary of the parsed arguments, or an empty dictionary if they
+#           can't be parsed (the command then reports the error when it runs).
+def parse_forwarded_args(cli_module, argv):
+    argv = [arg for arg in argv if arg not in ('--daemon', '--no-daemon')]
+    argument_parser = cli_module.setup_argument_parser()
+
+    # Errors and --help are printed when the command runs, not to the output of the daemon.
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return vars(argument_parser.parse_args(argv))
+    except SystemExit:
+        return {}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Checks if a daemon is accepting connections on the socket.
+#
+#   @return True if a daemon is running, False otherwise.
+def forward_is_possible():
+    client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client_socket.connect(DAEMON_SOCKET)
+    except OSError:
+        return False
+    finally:
+        client_socket.close()
+
+    return True
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the exit code of a SystemExit, and prints its message like Python would.
+#
+#   @param  code    The code of a SystemExit (None, an integer or a message).
+#
+#   @return The integer exit code.
+def get_exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+
+    print(code, file=sys.stderr)
+    return 1
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Sends a message to the other side of the connection.
+#
+#   @param  stream  A writable binary file object of the connection.
+#   @param  message A dictionary that is sent as a JSON line.
+def send_message(stream, message):
+    stream.write(json.dumps(message).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Restores an environment variable to its previous value.
+#
+#   @param  name    A string that represents the name of the environment variable.
+#   @param  value   The previous value, or None if it wasn't set.
+def restore_environment_variable(name, value):
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
@@ -11,6 +11,7 @@
 #   - Modified by Al Timofeyev on June 10, 2024.
 #   - Modified by Al Timofeyev on July 8, 2024.
 #   - Modified by Al Timofeyev on October 12, 2024.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 # ---- IMPORTS ----
@@ -20,6 +21,7 @@ import random
 import math
 import statistics as stats
 from . import constants as const
+from . import parallel_utils as parallel
 
 
 ##  Extracts the ratios of hues per pixel.
@@ -228,11 +230,14 @@ def construct_base_color_dictionary(hsv_img_matrix_2d):
 #
 #   @param  base_color_dict A dictionary of 2D numpy arrays for each of the base colors.
 #   @param  ratios          A dictionary of color ratios (percentages) in set [0.0, 100.0] for each of the base colors.
+#   @param  backend         A string that represents the execution backend (see parallel_utils.BACKENDS).
 #
 #   @return Dictionary of light, normal and dark color types for each of the base colors.
-def extract_colors(base_color_dict, ratios=None):
-    # Create a copy of ratios dictionary for multiprocessing.
-    if ratios is None:
+def extract_colors(base_color_dict, ratios=None, backend='process'):
+    # Create a copy of ratios dictionary for multiprocessing (threads can share a regular dictionary).
+    if backend in {'serial', 'thread'}:
+        process_ratios = {} if ratios is None else dict(ratios)
+    elif ratios is None:
         process_ratios = multiprocessing.Manager().dict()
     else:
         process_ratios = multiprocessing.Manager().dict(ratios)
@@ -251,10 +256,7 @@ def extract_colors(base_color_dict, ratios=None):
                    (base_color_dict['rose'], 'rose', process_ratios)]
 
     # Multi-thread the extraction process.
-    pool = multiprocessing.Pool(6)
-    async_result = pool.map_async(extract_color_types, base_colors)
-    pool.close()
-    pool.join()
+    extracted_results = parallel.map_tasks(extract_color_types, base_colors, backend, workers=6)
 
     # Copy over the ratio types
     if ratios is not None:
@@ -263,11 +265,6 @@ def extract_colors(base_color_dict, ratios=None):
                                   'cyan', 'azure', 'blue', 'violet', 'magenta', 'rose'}:
                 ratios[color_name] = color_ratio
 
-    # Retrieve results from multiprocessing pool.
-    extracted_results = []
-    for value in async_result.get():
-        extracted_results.append(value)
-
     dominant_red_colors, dominant_orange_colors, dominant_yellow_colors, dominant_chartreuse_colors, \
         dominant_green_colors, dominant_spring_colors, dominant_cyan_colors, dominant_azure_colors, \
         dominant_blue_colors, dominant_violet_colors, dominant_magenta_colors, dominant_rose_colors = extracted_results
@@ -397,6 +394,134 @@ def generate_remaining_colors(extracted_colors_dict, ratios):
     extracted_colors_dict['dark foreground'] = dark_foreground
 
 
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates an empty dictionary of color statistics for incremental (chunked) extraction.
+#   @details    The color statistics hold everything that extract_ratios() and
+#               the centroid calculations need: the pixel count of each base
+#               color and, for each of its 8 color types (light, norm, dark,
+#               black and their achromatic versions), the pixel count, the
+#               running sums of the hue vectors, saturation and brightness,
+#               plus a bounded random sample of pixels.
+#
+#   @param  sample_size A positive integer that represents the maximum number of pixels kept per color type.
+#
+#   @return Dictionary of empty color statistics.
+def create_color_statistics(sample_size=4096):
+    color_statistics = {'pixels': 0, 'sample-size': sample_size, 'base-colors': {}}
+
+    for color_name in const.BASE_COLOR_NAMES:
+        color_types = {}
+        for color_type in const.COLOR_TYPE_NAMES:
+            color_types[color_type] = {'pixels': 0, 'cos-hue': 0.0, 'sin-hue': 0.0, 'saturation': 0.0,
+                                       'brightness': 0.0, 'samples': numpy.empty((0, 3))}
+        color_statistics['base-colors'][color_name] = {'pixels': 0, 'color-types': color_types}
+
+    return color_statistics
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Accumulates a chunk of HSV pixels into the color statistics.
+#   @details    Only the running sums and the bounded pixel samples are
+#               kept, so memory is bounded by the chunk size and the
+#               sample size, not by the number of pixels accumulated.
+#
+#   @param  color_statistics    A dictionary of color statistics made by create_color_statistics().
+#   @param  hsv_matrix_2d       A 2D numpy array of pixels in [h,s,v] format (does not need to be sorted).
+def accumulate_color_statistics(color_statistics, hsv_matrix_2d):
+    if len(hsv_matrix_2d) == 0:
+        return
+
+    hsv_matrix_2d = numpy.asarray(hsv_matrix_2d, dtype=float)
+    color_statistics['pixels'] += len(hsv_matrix_2d)
+
+    for color_name, base_color_matrix in split_by_base_color(hsv_matrix_2d).items():
+        if len(base_color_matrix) == 0:
+            continue
+
+        base_color_statistics = color_statistics['base-colors'][color_name]
+        base_color_statistics['pixels'] += len(base_color_matrix)
+
+        for color_type, color_type_matrix in split_by_color_type(base_color_matrix).items():
+            if len(color_type_matrix) == 0:
+                continue
+
+            type_statistics = base_color_statistics['color-types'][color_type]
+            hue_radians = numpy.radians(color_type_matrix[:, 0])
+            type_statistics['cos-hue'] += float(numpy.cos(hue_radians).sum())
+            type_statistics['sin-hue'] += float(numpy.sin(hue_radians).sum())
+            type_statistics['saturation'] += float(color_type_matrix[:, 1].sum())
+            type_statistics['brightness'] += float(color_type_matrix[:, 2].sum())
+
+            type_statistics['samples'] = sample_pixels(type_statistics['samples'], type_statistics['pixels'],
+                                                       color_type_matrix, color_statistics['sample-size'])
+            type_statistics['pixels'] += len(color_type_matrix)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Extracts dominant light, normal and dark colors from accumulated color statistics.
+#   @details    The base color ratios, the color type ratios and the
+#               centroids are exact, since they only depend on counts and
+#               sums. The dominant color of a color type is the sampled
+#               pixel closest to the exact centroid.
+#
+#   @note   The dominant color selection is approximate. Instead of searching
+#           every pixel of a color type for the one closest to the centroid
+#           (like extract_colors() does), only a uniform random sample of at most
+#           'sample-size' pixels per color type is searched. With the default
+#           sample size the selected color is usually within a fraction of a
+#           percent of the exact one, but it is not guaranteed to be identical.
+#
+#   @param  color_statistics    A dictionary of color statistics made by create_color_statistics().
+#
+#   @return A list with a dictionary of ratios (base and type ratios) and a dictionary of light, normal and dark color types for each of the base colors.
+def extract_colors_from_statistics(color_statistics):
+    ratio_dict = extract_ratios([])
+    extracted_colors_dict = {}
+
+    if color_statistics['pixels'] == 0:
+        return [ratio_dict, extracted_colors_dict]
+
+    pixels = float(color_statistics['pixels'])
+
+    for color_name, base_color_statistics in color_statistics['base-colors'].items():
+        ratio_dict[color_name] = (base_color_statistics['pixels'] / pixels) * 100
+
+        if base_color_statistics['pixels'] == 0:
+            extracted_colors_dict['light ' + color_name] = numpy.array([])
+            extracted_colors_dict[color_name] = numpy.array([])
+            extracted_colors_dict['dark ' + color_name] = numpy.array([])
+            continue
+
+        color_types = base_color_statistics['color-types']
+        for color_type in ['light', 'norm', 'dark']:
+            ratio_dict[color_type + ' ' + color_name] = (color_types[color_type]['pixels'] / base_color_statistics['pixels']) * 100.0
+
+        light_color = extract_dominant_color_from_statistics(color_types['light'])
+        norm_color = extract_dominant_color_from_statistics(color_types['norm'])
+        dark_color = extract_dominant_color_from_statistics(color_types['dark'])
+        black_color = extract_dominant_color_from_statistics(color_types['black'])
+
+        achromatic_light = extract_dominant_color_from_statistics(color_types['achromatic light'])
+        achromatic_norm = extract_dominant_color_from_statistics(color_types['achromatic norm'])
+        achromatic_dark = extract_dominant_color_from_statistics(color_types['achromatic dark'])
+        achromatic_black = extract_dominant_color_from_statistics(color_types['achromatic black'])
+
+        check_missing_color_types(light_color, norm_color, dark_color, black_color,
+                                  achromatic_light, achromatic_norm, achromatic_dark, achromatic_black)
+
+        extracted_colors_dict['light ' + color_name] = light_color
+        extracted_colors_dict[color_name] = norm_color
+        extracted_colors_dict['dark ' + color_name] = dark_color
+
+    return [ratio_dict, extracted_colors_dict]
+
+
 # **************************************************************************
 # **************************************************************************
 
@@ -557,36 +682,10 @@ def sort_by_sat_and_bright_value(hsv_base_color_matrix, color_name, ratios):
                 numpy.asarray([]), numpy.asarray([]), numpy.asarray([]), numpy.asarray([])]
 
     total_base_color_pixels = len(hsv_base_color_matrix)
-    light_pixels, norm_pixels, dark_pixels = 0.0, 0.0, 0.0
-
-    light_colors, norm_colors, dark_colors, black_colors = [], [], [], []
-    achromatic_light, achromatic_norm, achromatic_dark, achromatic_black = [], [], [], []
-
-    for pixel in hsv_base_color_matrix:
-        _, saturation, brightness = pixel
-        if brightness > const.LIGHT_BRIGHTNESS_RANGE[0]:    # -------- If light color.
-            if saturation < const.SATURATION_TOLERANCE_RANGE[0]:
-                achromatic_light.append(pixel)
-            else:
-                light_pixels += 1
-                light_colors.append(pixel)
-        elif brightness > const.NORM_BRIGHTNESS_RANGE[0]:   # -------- If normal color.
-            if saturation < const.SATURATION_TOLERANCE_RANGE[0]:
-                achromatic_norm.append(pixel)
-            else:
-                norm_pixels += 1
-                norm_colors.append(pixel)
-        elif brightness > const.DARK_BRIGHTNESS_RANGE[0]:   # -------- If dark color.
-            if saturation < const.SATURATION_TOLERANCE_RANGE[0]:
-                achromatic_dark.append(pixel)
-            else:
-                dark_pixels += 1
-                dark_colors.append(pixel)
-        else:                                               # -------- If black color.
-            if saturation < const.SATURATION_TOLERANCE_RANGE[0]:
-                achromatic_black.append(pixel)
-            else:
-                black_colors.append(pixel)
+    color_types = split_by_color_type(hsv_base_color_matrix)
+    light_pixels = float(len(color_types['light']))
+    norm_pixels = float(len(color_types['norm']))
+    dark_pixels = float(len(color_types['dark']))
 
     # Calculate the ratios for each color type.
     light_ratio = (light_pixels / total_base_color_pixels) * 100.0
@@ -598,8 +697,71 @@ def sort_by_sat_and_bright_value(hsv_base_color_matrix, color_name, ratios):
     ratios['norm ' + color_name] = norm_ratio
     ratios['dark ' + color_name] = dark_ratio
 
-    return [numpy.asarray(light_colors), numpy.asarray(norm_colors), numpy.asarray(dark_colors), numpy.asarray(black_colors),
-            numpy.asarray(achromatic_light), numpy.asarray(achromatic_norm), numpy.asarray(achromatic_dark), numpy.asarray(achromatic_black)]
+    return [color_types['light'], color_types['norm'], color_types['dark'], color_types['black'],
+            color_types['achromatic light'], color_types['achromatic norm'],
+            color_types['achromatic dark'], color_types['achromatic black']]
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Splits an unsorted array of HSV pixels into the 12 base colors.
+#   @details    Uses the same hue ranges as extract_ratios(), where any
+#               hue that doesn't fall into one of the other ranges is red.
+#
+#   @param  hsv_matrix_2d   A 2D numpy array of pixels in [h,s,v] format.
+#
+#   @return Dictionary of 2D numpy arrays for each of the base colors.
+def split_by_base_color(hsv_matrix_2d):
+    hues = hsv_matrix_2d[:, 0]
+    hue_ranges = {'orange': const.ORANGE_HUE_RANGE, 'yellow': const.YELLOW_HUE_RANGE,
+                  'chartreuse': const.CHARTREUSE_HUE_RANGE, 'green': const.GREEN_HUE_RANGE,
+                  'spring': const.SPRING_HUE_RANGE, 'cyan': const.CYAN_HUE_RANGE,
+                  'azure': const.AZURE_HUE_RANGE, 'blue': const.BLUE_HUE_RANGE,
+                  'violet': const.VIOLET_HUE_RANGE, 'magenta': const.MAGENTA_HUE_RANGE,
+                  'rose': const.ROSE_HUE_RANGE}
+
+    base_color_dict = {}
+    red_mask = numpy.ones(len(hues), dtype=bool)
+    for color_name, hue_range in hue_ranges.items():
+        color_mask = (hue_range[0] <= hues) & (hues < hue_range[1])
+        red_mask &= ~color_mask
+        base_color_dict[color_name] = hsv_matrix_2d[color_mask]
+
+    base_color_dict['red'] = hsv_matrix_2d[red_mask]    # Remainder of colors are part of red.
+
+    return base_color_dict
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Splits an array of HSV pixels of one base color into its 8 color types.
+#   @details    Uses the same saturation and brightness ranges
+#               as sort_by_sat_and_bright_value().
+#
+#   @param  hsv_base_color_matrix   A 2D numpy array of a base color, where each element is a list in [h,s,v] format.
+#
+#   @return Dictionary of 2D numpy arrays for each of the color types.
+def split_by_color_type(hsv_base_color_matrix):
+    saturation, brightness = hsv_base_color_matrix[:, 1], hsv_base_color_matrix[:, 2]
+
+    achromatic_mask = saturation < const.SATURATION_TOLERANCE_RANGE[0]
+    light_mask = brightness > const.LIGHT_BRIGHTNESS_RANGE[0]
+    norm_mask = ~light_mask & (brightness > const.NORM_BRIGHTNESS_RANGE[0])
+    dark_mask = ~light_mask & ~norm_mask & (brightness > const.DARK_BRIGHTNESS_RANGE[0])
+    black_mask = ~light_mask & ~norm_mask & ~dark_mask
+
+    color_types = {'light': hsv_base_color_matrix[light_mask & ~achromatic_mask],
+                   'norm': hsv_base_color_matrix[norm_mask & ~achromatic_mask],
+                   'dark': hsv_base_color_matrix[dark_mask & ~achromatic_mask],
+                   'black': hsv_base_color_matrix[black_mask & ~achromatic_mask],
+                   'achromatic light': hsv_base_color_matrix[light_mask & achromatic_mask],
+                   'achromatic norm': hsv_base_color_matrix[norm_mask & achromatic_mask],
+                   'achromatic dark': hsv_base_color_matrix[dark_mask & achromatic_mask],
+                   'achromatic black': hsv_base_color_matrix[black_mask & achromatic_mask]}
+
+    return color_types
 
 
 # --------------------------------------------------------------------------
@@ -627,6 +789,34 @@ def extract_dominant_color(hsv_color_type_matrix):
     return dom_color
 
 
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Extracts the dominant color from the accumulated statistics of a color type.
+#   @details    The centroid is calculated from the running sums, and the
+#               dominant color is the sampled pixel closest to it.
+#
+#   @param  type_statistics A dictionary of statistics for one color type (see create_color_statistics()).
+#
+#   @return A numpy array of a dominant color in [h,s,v] format.
+def extract_dominant_color_from_statistics(type_statistics):
+    dom_color = numpy.array([-1, -1.0, -1.0])
+    if type_statistics['pixels'] == 0:
+        return dom_color
+
+    average_hue = math.atan2(type_statistics['sin-hue'] / type_statistics['pixels'],
+                             type_statistics['cos-hue'] / type_statistics['pixels'])
+    average_hue = round(math.degrees(average_hue)) % 360
+    centroid = [average_hue, type_statistics['saturation'] / type_statistics['pixels'],
+                type_statistics['brightness'] / type_statistics['pixels']]
+
+    dom_colors = find_closest_to_centroid(type_statistics['samples'], centroid)
+    if len(dom_colors) > 0:
+        dom_color[:] = dom_colors[numpy.random.choice(len(dom_colors))]
+
+    return dom_color
+
+
 # --------------------------------------------------------------------------
 # --------------------------------------------------------------------------
 
@@ -1020,18 +1210,11 @@ def calculate_centroid(hsv_color_type_matrix):
     if len(hsv_color_type_matrix) == 0:
         return [-1, -1.0, -1.0]
 
-    average_saturation, average_brightness = 0.0, 0.0
-    cos_hues, sin_hues = [], []
-
-    for hsv_color in hsv_color_type_matrix:
-        cos_hues.append(math.cos(math.radians(hsv_color[0])))
-        sin_hues.append(math.sin(math.radians(hsv_color[0])))
-        average_saturation += hsv_color[1]
-        average_brightness += hsv_color[2]
+    hues = numpy.radians(hsv_color_type_matrix[:, 0])
 
-    average_saturation = average_saturation / len(hsv_color_type_matrix)
-    average_brightness = average_brightness / len(hsv_color_type_matrix)
-    average_hue = math.atan2(stats.mean(sin_hues), stats.mean(cos_hues))
+    average_saturation = float(numpy.mean(hsv_color_type_matrix[:, 1]))
+    average_brightness = float(numpy.mean(hsv_color_type_matrix[:, 2]))
+    average_hue = math.atan2(numpy.mean(numpy.sin(hues)), numpy.mean(numpy.cos(hues)))
     average_hue = round(math.degrees(average_hue)) % 360
 
     centroid_hsv_color = [average_hue, average_saturation, average_brightness]
@@ -1058,26 +1241,57 @@ def find_closest_to_centroid(hsv_color_type_matrix, centroid):
     if len(hsv_color_type_matrix) == 0:
         return []
 
-    distances_from_centroid = []
-    shortest_distance = math.inf
-
-    # Calculate the distance between each color and the centroid.
+    # Calculate the distance between each color and the centroid,
+    # using the same formula as calculate_dist_between_2_colors().
     # All values are normalized to be in the range [0.0, 1.0] for this process.
-    for hsv_color in hsv_color_type_matrix:
-        distance = calculate_dist_between_2_colors(hsv_color, centroid)
+    hue_diff = numpy.abs(hsv_color_type_matrix[:, 0] - centroid[0])
+    hue_dist = numpy.minimum(hue_diff, 360 - hue_diff) / 180.0
+    sat_dist = numpy.abs(hsv_color_type_matrix[:, 1] - centroid[1]) / 100.0
+    bright_dist = numpy.abs(hsv_color_type_matrix[:, 2] - centroid[2]) / 100.0
 
-        distances_from_centroid.append(distance)
-        shortest_distance = min(shortest_distance, distance)
+    distances_from_centroid = numpy.sqrt(hue_dist ** 2 + sat_dist ** 2 + bright_dist ** 2)
+    shortest_distance = distances_from_centroid.min()
 
-    closest = []
-    for idx, dist in enumerate(distances_from_centroid):
-        if dist != shortest_distance:
-            continue
-        closest.append(hsv_color_type_matrix[idx])
+    closest = list(hsv_color_type_matrix[distances_from_centroid == shortest_distance])
 
     return closest
 
 
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Keeps a bounded, uniform random sample of pixels (reservoir sampling).
+#   @details    Every pixel that has been seen so far has the same chance
+#               of being in the sample, no matter which chunk it came from.
+#               Reservoir sampling (Algorithm R) is explained here:
+#               https://en.wikipedia.org/wiki/Reservoir_sampling
+#
+#   @param  samples         A 2D numpy array of the currently sampled pixels.
+#   @param  pixels_seen     An integer that represents how many pixels have been seen before the new pixels.
+#   @param  new_pixels      A 2D numpy array of new pixels.
+#   @param  sample_size     A positive integer that represents the maximum number of pixels kept in the sample.
+#
+#   @return A 2D numpy array of at most sample_size sampled pixels.
+def sample_pixels(samples, pixels_seen, new_pixels, sample_size):
+    # Fill up the sample first.
+    free_slots = sample_size - len(samples)
+    if free_slots > 0:
+        samples = numpy.concatenate([samples, new_pixels[:free_slots]])
+        pixels_seen += min(free_slots, len(new_pixels))
+        new_pixels = new_pixels[free_slots:]
+
+    if len(new_pixels) == 0:
+        return samples
+
+    # The n-th pixel seen replaces a random sampled pixel with a probability of sample_size / n.
+    pixel_positions = pixels_seen + numpy.arange(1, len(new_pixels) + 1)
+    slots = (numpy.random.random(len(new_pixels)) * pixel_positions).astype(int)
+    accepted = slots < sample_size
+    samples[slots[accepted]] = new_pixels[accepted]
+
+    return samples
+
+
 # --------------------------------------------------------------------------
 # --------------------------------------------------------------------------
 
@@ -1142,3 +1356,26 @@ def calculate_dist_between_2_colors(hsv_color1, hsv_color2):
     distance = math.sqrt(hue_dist ** 2 + sat_dist ** 2 + bright_dist ** 2)
 
     return distance
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Calculates the distances between many pairs of HSV colors at once.
+#   @details    The vectorized version of calculate_dist_between_2_colors(),
+#               which gives the same distances but does all the work inside
+#               numpy. The colors are broadcast against each other, so one
+#               color can be compared to a whole array of colors.
+#
+#   @param  hsv_colors1 A numpy array of colors in HSV format, where the last axis is [h, s, v].
+#   @param  hsv_colors2 A numpy array of colors in HSV format, where the last axis is [h, s, v].
+#
+#   @return A numpy array of float values that represent the distances between the colors.
+def calculate_dists_between_colors(hsv_colors1, hsv_colors2):
+    # All values are normalized to be in the range [0.0, 1.0] for this process.
+    hsv_difference = numpy.abs(numpy.asarray(hsv_colors1) - numpy.asarray(hsv_colors2))
+    hue_dist = numpy.minimum(hsv_difference[..., 0], 360 - hsv_difference[..., 0]) / 180.0
+    sat_dist = hsv_difference[..., 1] / 100.0
+    bright_dist = hsv_difference[..., 2] / 100.0
+
+    return numpy.sqrt(hue_dist ** 2 + sat_dist ** 2 + bright_dist ** 2)
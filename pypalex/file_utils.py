@@ -8,15 +8,29 @@
 #   - Created by Al Timofeyev on April 5, 2023.
 #   - Modified by Al Timofeyev on July 8, 2024.
 #   - Modified by Al Timofeyev on October 12, 2024.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 # ---- IMPORTS ----
 import os
+import functools
+import hashlib
 import json
+import secrets
 import yaml
 
 from .settings import CONF_DIR, DEFAULT_EXTRACTED_DIR, PASTEL_EXTRACTED_DIR, RAW_EXTRACTED_DIR
 
+# ---- GLOBAL VARIABLES ----
+## Set of the policies for files that already exist ('ask' the user, overwrite them with 'yes', or keep them with 'no').
+OVERWRITE_POLICIES = {'ask', 'yes', 'no'}
+## The number of times to try to create a temporary file with a new random name, before giving up.
+TEMP_FILE_ATTEMPTS = 100
+## The number of bytes read at a time when hashing files.
+HASH_CHUNK_SIZE = 1024 * 1024
+## The YAML dumper used to export files: libyaml's fast CSafeDumper if PyYAML was built with it, otherwise the pure-Python SafeDumper.
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 
 ##  Generates a configuration file.
 #   @details    Generates a configuration file and saves
@@ -96,9 +110,7 @@ def generate_config_file(config_filename):
     config_comments += "#   to using black for that Color Code to avoid running into errors.\n"
     config_comments += "# ******************************************************************************************************\n\n"
 
-    with open(config_filepath, 'w') as config_file:
-        config_file.write(config_comments)
-        yaml.dump(config, config_file, indent=4, sort_keys=False)
+    write_file_atomically(config_filepath, config_comments + yaml.dump(config, indent=4, sort_keys=False))
 
     print("GENERATED CONFIG :", config_filepath)
 
@@ -107,52 +119,42 @@ def generate_config_file(config_filename):
 # --------------------------------------------------------------------------
 
 ##  Saves the raw extracted colors into a file.
+#   @details    A file that already has the exact same contents isn't written
+#               again, so its modification time doesn't change (e.g. to not
+#               trigger file watchers when an image is extracted again).
 #
-#   @note    If a file with the same name already exists, it can be overwritten.
+#   @note    If a file with the same name already exists, the overwrite policy decides if it's overwritten.
 #
 #   @param  extracted_colors_dict   A dictionary of colors.
 #   @param  image_name              A string that represents the name of the image from where the colors were extracted (e.g. 'forest_wallpaper', 'bubblegum', etc).
 #   @param  output_path             A string that specifies the directory where to save the file (can be a blank string).
 #   @param  export_file_format      A string that specifies the format of the file that will be exported (e.g. 'json', 'yaml').
 #   @param  export_color_format     A string that specifies the format of the colors that will be exported (e.g. 'hsv', 'rgb', 'hex', 'ansi').
-def raw_dump(extracted_colors_dict, image_name, output_path, export_file_format, export_color_format):
+#   @param  overwrite_policy        A string that specifies what to do with a file that already exists (see OVERWRITE_POLICIES).
+#   @param  written_filepaths       A list where the path of the file is added once it's written (optional, e.g. to sync it later).
+#   @param  unchanged_filepaths     A list where the path of the file is added if it already has the same contents (optional).
+#   @param  compact_json            Flag to export JSON files without indentation and whitespace.
+def raw_dump(extracted_colors_dict, image_name, output_path, export_file_format, export_color_format,
+             overwrite_policy='ask', written_filepaths=None, unchanged_filepaths=None, compact_json=False):
     # These are the only file formats currently supported.
     if export_file_format not in {'json', 'yaml', 'yml'}:
         print("CANNOT SAVE : ", export_file_format, " Not Supported", sep='')
         return
 
-    if output_path == '':
-        output_path = RAW_EXTRACTED_DIR
-        filename = image_name + '-raw_colors.' + export_file_format
-    else:
-        output_path = os.path.join(output_path, image_name)
-        filename = 'raw_colors.' + export_file_format
-
-    os.makedirs(output_path, exist_ok=True)
-    output_filepath = os.path.join(output_path, filename)
-
-    if os.path.exists(output_filepath) and os.path.isfile(output_filepath):
-        print("The following files already exist and will be overwritten if you proceed : ", sep='')
-        print("   - ", output_filepath, sep='')
-        print()  # Extra Spacing.
-        overwrite_message = "Would you like to overwrite these files? [y/n]: "
-        while True:
-            user_choice = input(overwrite_message)
-            user_choice = user_choice.lower()
-
-            if user_choice in ('y', 'yes'):
-                break
-            elif user_choice in ('n', 'no'):
-                return
-
-    with open(output_filepath, 'w') as output_file:
-        if export_file_format == 'json':
-            json.dump(extracted_colors_dict, output_file, indent=4, sort_keys=False)
-        elif export_file_format == 'yaml' or export_file_format == 'yml':
-            if export_color_format == 'hsv' or export_color_format == 'rgb':
-                yaml.dump(extracted_colors_dict, output_file, indent=4, sort_keys=False, default_flow_style=None)
-            else:
-                yaml.dump(extracted_colors_dict, output_file, indent=4, sort_keys=False)
+    output_filepath = get_raw_dump_filepath(image_name, output_path, export_file_format)
+    contents = serialize_data(extracted_colors_dict, export_file_format, export_color_format, compact_json=compact_json)
+    if file_has_contents(output_filepath, contents):
+        print("UNCHANGED : ", output_filepath, sep='')
+        if unchanged_filepaths is not None:
+            unchanged_filepaths.append(output_filepath)
+        return
+
+    if not get_files_to_write([output_filepath], overwrite_policy):
+        return
+
+    write_file_atomically(output_filepath, contents)
+    if written_filepaths is not None:
+        written_filepaths.append(output_filepath)
 
     print("SAVED : ", output_filepath, sep='')
 
@@ -161,9 +163,11 @@ def raw_dump(extracted_colors_dict, image_name, output_path, export_file_format,
 # --------------------------------------------------------------------------
 
 ##  Saves the color palettes of extracted colors.
-#   @details    Each palette is saved to its own individual file.
+#   @details    Each palette is saved to its own individual file. Files that
+#               already have the exact same contents aren't written again (and
+#               aren't asked about), so their modification times don't change.
 #
-#   @note    If files with the same name already exist, they can be overwritten.
+#   @note    If files with the same name already exist, the overwrite policy decides if they're overwritten.
 #
 #   @param  palettes            A dictionary of palettes that were organized based on the palette templates.
 #   @param  image_name          A string that represents the name of the image from where the colors were extracted (e.g. 'forest_wallpaper', 'bubblegum', etc).
@@ -171,19 +175,279 @@ def raw_dump(extracted_colors_dict, image_name, output_path, export_file_format,
 #   @param  export_file_format  A string that specifies the format of the file that will be exported (e.g. 'json', 'yaml').
 #   @param  export_color_format A string that specifies the format of the colors that will be exported (e.g. 'hsv', 'rgb', 'hex', 'ansi').
 #   @param  palette_color_types A dictionary that holds flags (True / False) for the color types contained in each palette and if those color types are pastel or not.
-def save_palettes(palettes, image_name, output_path, export_file_format, export_color_format, palette_color_types=None):
+#   @param  overwrite_policy    A string that specifies what to do with files that already exist (see OVERWRITE_POLICIES).
+#   @param  written_filepaths   A list where the paths of the files are added once they're written (optional, e.g. to sync them later).
+#   @param  unchanged_filepaths A list where the paths of the files that already have the same contents are added (optional).
+#   @param  compact_json        Flag to export JSON files without indentation and whitespace.
+def save_palettes(palettes, image_name, output_path, export_file_format, export_color_format, palette_color_types=None,
+                  overwrite_policy='ask', written_filepaths=None, unchanged_filepaths=None, compact_json=False):
     # These are the only file formats currently supported.
     if export_file_format not in {'json', 'yaml', 'yml'}:
         print("CANNOT SAVE : ", export_file_format, " Not Supported", sep='')
         return
 
-    output_filepaths = []
+    output_filepaths = get_palette_filepaths(palettes.keys(), image_name, output_path, export_file_format,
+                                             palette_color_types=palette_color_types)
+    output_contents = {}
+    for palette, output_filepath in zip(palettes.values(), output_filepaths):
+        contents = serialize_data(palette, export_file_format, export_color_format, compact_json=compact_json)
+        if not file_has_contents(output_filepath, contents):
+            output_contents[output_filepath] = contents
+            continue
+
+        print("UNCHANGED : ", output_filepath, sep='')
+        if unchanged_filepaths is not None:
+            unchanged_filepaths.append(output_filepath)
+
+    if not output_contents:
+        return
+    files_to_write = get_files_to_write(list(output_contents), overwrite_policy)
+
+    for output_filepath, contents in output_contents.items():
+        if output_filepath not in files_to_write:
+            continue
+
+        write_file_atomically(output_filepath, contents)
+        if written_filepaths is not None:
+            written_filepaths.append(output_filepath)
+
+        print("SAVED : ", output_filepath, sep='')
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Writes the results of an image as a single JSON Lines (NDJSON) record.
+#   @details    Each record is written as a single line and flushed right
+#               away, so downstream tools can read the records of a batch
+#               while it's still running.
+#
+#   @param  ndjson_file A writable text file object (e.g. an open file or sys.stdout).
+#   @param  results     A dictionary of results (see pipeline.generate_results()).
+#   @param  source_path A string that represents the path to the image (optional).
+#   @param  lock        A lock that guards the file, when several threads write to it (optional).
+def write_ndjson_record(ndjson_file, results, source_path=None, lock=None):
+    record = {'image-name': results['image-name'], 'source': source_path, 'color-format': results['color-format'],
+              'palettes': results['palettes'], 'raw-colors': results['raw-colors'], 'ratios': results['ratios']}
+    record_line = json.dumps(record, separators=(',', ':')) + '\n'
+
+    if lock is None:
+        ndjson_file.write(record_line)
+        ndjson_file.flush()
+        return
+
+    with lock:
+        ndjson_file.write(record_line)
+        ndjson_file.flush()
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Flushes files that were written to the storage device, so they survive a power loss.
+#   @details    Syncing every file as soon as it's written stalls on each one,
+#               so the files of a whole batch are synced together, once the
+#               batch is done. The directories that hold them are synced too,
+#               so the renames of the atomic writes are also durable.
+#
+#   @param  filepaths   An iterable of strings that represent the paths of the files to sync.
+def sync_files(filepaths):
+    directories = set()
+    for filepath in dict.fromkeys(filepaths):   # Sync each file once, in the order they were written.
+        file_descriptor = os.open(filepath, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        try:
+            os.fsync(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+        directories.add(os.path.dirname(os.path.abspath(filepath)))
+
+    if os.name != 'posix':  # Directories can only be opened and synced on POSIX systems.
+        return
+
+    for directory in directories:
+        file_descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Writes a file atomically, so it either has all of its new contents or it isn't changed at all.
+#   @details    The contents are written to a temporary file in the same
+#               directory, which then replaces the file with a single rename,
+#               so a crash never leaves a truncated file behind. The directory
+#               is only created when it doesn't exist yet, so writing to
+#               existing directories doesn't cost any extra system calls.
+#
+#   @param  output_filepath A string that represents the path of the file.
+#   @param  contents        A string of the contents of the file.
+def write_file_atomically(output_filepath, contents):
+    temp_file, temp_filepath = create_temp_file(output_filepath)
+    try:
+        with temp_file:
+            temp_file.write(contents)
+        os.replace(temp_filepath, output_filepath)
+    except BaseException:
+        try:
+            os.remove(temp_filepath)
+        except OSError:
+            pass
+        raise
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates a new hidden temporary file next to a file, creating the directory if it doesn't exist.
+#   @details    The temporary file gets the same permissions that a new file
+#               would get (i.e. based on the umask), unlike tempfile.mkstemp().
+#
+#   @param  output_filepath A string that represents the path of the file that the temporary file will replace.
+#
+#   @return A (writable text file object, temporary file path) tuple.
+#
+#   @exception  FileExistsError If no unused temporary file name was found.
+def create_temp_file(output_filepath):
+    directory, filename = os.path.split(output_filepath)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    for _ in range(TEMP_FILE_ATTEMPTS):
+        temp_filepath = os.path.join(directory, '.' + filename + '.' + secrets.token_hex(4) + '.tmp')
+        try:
+            file_descriptor = os.open(temp_filepath, flags, 0o666)
+        except FileExistsError:
+            continue
+        except FileNotFoundError:
+            if directory == '' or os.path.isdir(directory):
+                raise
+            os.makedirs(directory, exist_ok=True)
+            continue
+
+        return open(file_descriptor, 'w'), temp_filepath
+
+    raise FileExistsError("No unused temporary file name found for : " + output_filepath)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Checks if a file already exists with the exact same contents.
+#   @details    Files are read back in text mode, like they're written, and
+#               files that are smaller than the contents are ruled out
+#               without reading them.
+#
+#   @param  filepath    A string that represents the path of the file.
+#   @param  contents    A string of the contents to compare the file with.
+#
+#   @return True if the file has the same contents, False if it's different or can't be read.
+def file_has_contents(filepath, contents):
+    try:
+        if os.path.getsize(filepath) < len(contents):
+            return False
+        with open(filepath, 'r') as existing_file:
+            return existing_file.read(len(contents) + 1) == contents
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Hashes the contents of a file.
+#   @details    Uses BLAKE2b, which is faster than SHA-256 without hardware
+#               support, and reads the file in chunks, so large images don't
+#               have to fit into memory.
+#
+#   @param  filepath    A string that represents the path of the file.
+#
+#   @return A hexadecimal string of the hash of the file contents.
+def hash_file(filepath):
+    file_hash = hashlib.blake2b(digest_size=32)
+    with open(filepath, 'rb') as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Serializes data into the contents of a file of the export file format.
+#
+#   @param  data                A dictionary of colors or of a palette.
+#   @param  export_file_format  A string that specifies the format of the file (e.g. 'json', 'yaml').
+#   @param  export_color_format A string that specifies the format of the colors (e.g. 'hsv', 'rgb', 'hex', 'ansi').
+#   @param  compact_json        Flag to serialize JSON without indentation and whitespace.
+#
+#   @return A string of the file contents.
+def serialize_data(data, export_file_format, export_color_format, compact_json=False):
+    return get_serializer(export_file_format, export_color_format, compact_json)(data)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the function that serializes data for a combination of export formats.
+#   @details    The serializers are created once per combination and reused,
+#               so every file of a batch doesn't set up its own JSON encoder.
+#               YAML is serialized with YAML_DUMPER, which gives the same
+#               output as PyYAML's default dumper for palettes and colors.
+#
+#   @param  export_file_format  A string that specifies the format of the file (e.g. 'json', 'yaml').
+#   @param  export_color_format A string that specifies the format of the colors (e.g. 'hsv', 'rgb', 'hex', 'ansi').
+#   @param  compact_json        Flag to serialize JSON without indentation and whitespace.
+#
+#   @return A function that takes the data and returns a string of the file contents.
+@functools.lru_cache(maxsize=None)
+def get_serializer(export_file_format, export_color_format, compact_json=False):
+    if export_file_format == 'json':
+        if compact_json:
+            return json.JSONEncoder(separators=(',', ':')).encode
+        return json.JSONEncoder(indent=4).encode
+
+    # Colors that are lists of numbers (i.e. hsv and rgb) are kept on a single line each.
+    default_flow_style = None if export_color_format in {'hsv', 'rgb'} else False
+    return functools.partial(yaml.dump, Dumper=YAML_DUMPER, indent=4, sort_keys=False, default_flow_style=default_flow_style)
 
-    make_output_path = output_path != ''
-    make_default_primary_path = (palette_color_types is None or not palette_color_types) and not make_output_path
-    make_default_pastel_path = False
 
-    for palette_name, palette in palettes.items():
+# **************************************************************************
+# **************************************************************************
+
+##  Gets the path of the file where the raw extracted colors are saved.
+#
+#   @param  image_name          A string that represents the name of the image from where the colors were extracted.
+#   @param  output_path         A string that specifies the directory where to save the file (can be a blank string).
+#   @param  export_file_format  A string that specifies the format of the file that will be exported (e.g. 'json', 'yaml').
+#
+#   @return A string that represents the path of the file.
+def get_raw_dump_filepath(image_name, output_path, export_file_format):
+    if output_path == '':
+        return os.path.join(RAW_EXTRACTED_DIR, image_name + '-raw_colors.' + export_file_format)
+
+    return os.path.join(output_path, image_name, 'raw_colors.' + export_file_format)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the paths of the files where the color palettes are saved.
+#   @details    Without an output path, palettes that contain pastel colors
+#               are saved in the default Pastel Directory and the rest in the
+#               default Primary Directory.
+#
+#   @param  palette_names       An iterable of palette names.
+#   @param  image_name          A string that represents the name of the image from where the colors were extracted.
+#   @param  output_path         A string that specifies the directory where to save the files (can be a blank string).
+#   @param  export_file_format  A string that specifies the format of the files that will be exported (e.g. 'json', 'yaml').
+#   @param  palette_color_types A dictionary that holds flags (True / False) for the color types contained in each palette and if those color types are pastel or not.
+#
+#   @return List of strings that represent the paths of the files, in the same order as the palette names.
+def get_palette_filepaths(palette_names, image_name, output_path, export_file_format, palette_color_types=None):
+    output_filepaths = []
+    for palette_name in palette_names:
         filename = palette_name + '.' + export_file_format
 
         contains_valid_color_types = False
@@ -192,54 +456,52 @@ def save_palettes(palettes, image_name, output_path, export_file_format, export_
                                              for color_type in {'contains-light', 'contains-normal', 'contains-dark',
                                                                 'pastel-light', 'pastel-normal', 'pastel-dark'})
 
-        if make_output_path:
-            output_filepaths.append(os.path.join(os.path.join(output_path, image_name), filename))
+        if output_path != '':
+            output_filepaths.append(os.path.join(output_path, image_name, filename))
         elif palette_color_types is None or not contains_valid_color_types:
-            output_filepaths.append(os.path.join(os.path.join(DEFAULT_EXTRACTED_DIR, image_name), filename))
+            output_filepaths.append(os.path.join(DEFAULT_EXTRACTED_DIR, image_name, filename))
         elif ((palette_color_types[palette_name]['pastel-light'] and palette_color_types[palette_name]['contains-light']) or
               (palette_color_types[palette_name]['pastel-normal'] and palette_color_types[palette_name]['contains-normal']) or
               (palette_color_types[palette_name]['pastel-dark'] and palette_color_types[palette_name]['contains-dark'])):
-            make_default_pastel_path = True
-            output_filepaths.append(os.path.join(os.path.join(PASTEL_EXTRACTED_DIR, image_name), filename))
+            output_filepaths.append(os.path.join(PASTEL_EXTRACTED_DIR, image_name, filename))
         else:
-            make_default_primary_path = True
-            output_filepaths.append(os.path.join(os.path.join(DEFAULT_EXTRACTED_DIR, image_name), filename))
-
-    if make_output_path:
-        os.makedirs(os.path.join(output_path, image_name), exist_ok=True)
-    else:
-        if make_default_primary_path:
-            os.makedirs(os.path.join(DEFAULT_EXTRACTED_DIR, image_name), exist_ok=True)
-        if make_default_pastel_path:
-            os.makedirs(os.path.join(PASTEL_EXTRACTED_DIR, image_name), exist_ok=True)
-
-    overwrite_files = ""
-    for output_filepath in output_filepaths:
-        if os.path.exists(output_filepath) and os.path.isfile(output_filepath):
-            overwrite_files += "   - " + output_filepath + "\n"
-
-    if overwrite_files != "":
-        print("The following files already exist and will be overwritten if you proceed : ", sep='')
-        print(overwrite_files, end='')
-        print()  # Extra Spacing.
-        overwrite_message = "Would you like to overwrite these files? [y/n]: "
-        while True:
-            user_choice = input(overwrite_message)
-            user_choice = user_choice.lower()
-
-            if user_choice in ('y', 'yes'):
-                break
-            elif user_choice in ('n', 'no'):
-                return
+            output_filepaths.append(os.path.join(DEFAULT_EXTRACTED_DIR, image_name, filename))
 
-    for palette, output_filepath in zip(palettes.values(), output_filepaths):
-        with open(output_filepath, 'w') as output_file:
-            if export_file_format == 'json':
-                json.dump(palette, output_file, indent=4, sort_keys=False)
-            elif export_file_format == 'yaml' or export_file_format == 'yml':
-                if export_color_format == 'hsv' or export_color_format == 'rgb':
-                    yaml.dump(palette, output_file, indent=4, sort_keys=False, default_flow_style=None)
-                else:
-                    yaml.dump(palette, output_file, indent=4, sort_keys=False)
+    return output_filepaths
 
-        print("SAVED : ", output_filepath, sep='')
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Decides which files to write, based on the files that already exist and the overwrite policy.
+#   @details    The 'ask' policy asks the user once for all the existing files,
+#               'yes' overwrites them, and 'no' keeps them (only new files are written).
+#
+#   @param  output_filepaths    List of strings that represent the paths of the files to write.
+#   @param  overwrite_policy    A string that specifies what to do with files that already exist (see OVERWRITE_POLICIES).
+#
+#   @return List of strings that represent the paths of the files that should be written.
+def get_files_to_write(output_filepaths, overwrite_policy='ask'):
+    existing_filepaths = [output_filepath for output_filepath in output_filepaths
+                          if os.path.exists(output_filepath) and os.path.isfile(output_filepath)]
+    if not existing_filepaths or overwrite_policy == 'yes':
+        return output_filepaths
+
+    if overwrite_policy == 'no':
+        for existing_filepath in existing_filepaths:
+            print("ALREADY EXISTS : ", existing_filepath, sep='')
+        return [output_filepath for output_filepath in output_filepaths if output_filepath not in existing_filepaths]
+
+    print("The following files already exist and will be overwritten if you proceed : ", sep='')
+    for existing_filepath in existing_filepaths:
+        print("   - ", existing_filepath, sep='')
+    print()  # Extra Spacing.
+    overwrite_message = "Would you like to overwrite these files? [y/n]: "
+    while True:
+        user_choice = input(overwrite_message)
+        user_choice = user_choice.lower()
+
+        if user_choice in ('y', 'yes'):
+            return output_filepaths
+        elif user_choice in ('n', 'no'):
+            return []
@@ -7,30 +7,45 @@
 #   - Modified by Al Timofeyev on March 6, 2023.
 #   - Modified by Al Timofeyev on April 5, 2023.
 #   - Modified by Al Timofeyev on May 16, 2024.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 # ---- IMPORTS ----
+import io
 import numpy
+import threading
+import warnings
 import multiprocessing
 from PIL import Image
 from . import conversion_utils as convert
+from . import parallel_utils as parallel
+
+# ---- GLOBAL VARIABLES ----
+## Estimated number of bytes needed per decoded pixel (decoded image, RGB copy and numpy array).
+BYTES_PER_DECODED_PIXEL = 16
+## Number of bits per pixel for the raw modes that can be decoded in horizontal strips.
+RAW_MODE_BITS = {'1': 1, 'L': 8, 'P': 8, 'LA': 16, 'I;16': 16, 'I;16B': 16, 'RGB': 24, 'BGR': 24,
+                 'RGBA': 32, 'BGRA': 32, 'RGBX': 32, 'BGRX': 32, 'XBGR': 32, 'ABGR': 32, 'ARGB': 32, 'CMYK': 32}
+## Lock used while Pillow's decompression bomb guard is lifted.
+BOMB_GUARD_LOCK = threading.Lock()
+## Messages of the error codes that Pillow's decoders return (the same messages Pillow's ImageFile.load() uses).
+DECODER_ERRORS = {-1: "image buffer overrun error", -2: "decoding error", -3: "unknown error",
+                  -8: "bad configuration", -9: "out of memory error"}
 
 
 ##  Processes PIL Image object.
 #   @details    Multiprocessing example from: https://stackoverflow.com/a/45555516
 #
-#   @param  image   PIL Image object.
+#   @note   A numpy array that is already the size the image would be rescaled
+#           to is used as is, without being copied.
+#
+#   @param  image   PIL Image object or numpy array of [r,g,b] pixels shaped (H,W,3).
+#   @param  backend A string that represents the execution backend (see parallel_utils.BACKENDS).
 #
 #   @return 2D numpy array of [h,s,v] arrays (pixels) from image.
-def process_image(image):
-    # Make sure image is in [r,g,b] format.
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-
+def process_image(image, backend='process'):
     # Rescale image to reduce data sample.
-    new_size = rescale_image(image)
-    resized_img = image.resize(new_size, Image.LANCZOS)
-    img_matrix_3d = numpy.array(resized_img)
+    img_matrix_3d = rescale_pixels(image)
 
     # Flatten image matrix into 2D.
     rgb_img_matrix_2d = img_matrix_3d.reshape(-1, 3)
@@ -40,14 +55,7 @@ def process_image(image):
     split_rgb_img_arrays = [x for x in split_rgb_img_arrays if x.size > 0]
 
     # Multi-thread the conversion process from [r,g,b] to [h,s,v].
-    pool = multiprocessing.Pool(multiprocessing.cpu_count())
-    async_result = pool.map_async(process_helper, split_rgb_img_arrays)
-    pool.close()
-    pool.join()
-
-    converted_hsv_results = []
-    for value in async_result.get():
-        converted_hsv_results.append(value)
+    converted_hsv_results = parallel.map_tasks(process_helper, split_rgb_img_arrays, backend)
 
     # Combine and sort all the individual [h,s,v] arrays by 3rd(v), 2nd(s), and then 1st(h) column.
     hsv_matrix_2d = numpy.concatenate(converted_hsv_results)
@@ -56,6 +64,207 @@ def process_image(image):
     return hsv_matrix_2d
 
 
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Processes a chunk of an image (e.g. a scanline, strip or tile).
+#   @details    Unlike process_image(), the chunk is neither rescaled nor
+#               sorted, and it's converted in the current process so
+#               chunks can be streamed one after another.
+#
+#   @param  chunk   PIL Image object or numpy array of [r,g,b] pixels, shaped (H,W,3) or (N,3).
+#
+#   @return 2D numpy array of [h,s,v] arrays (pixels) from the chunk.
+def process_chunk(chunk):
+    if isinstance(chunk, Image.Image):
+        if chunk.mode != 'RGB':
+            chunk = chunk.convert('RGB')
+        chunk = numpy.asarray(chunk)
+
+    rgb_matrix_2d = numpy.asarray(chunk).reshape(-1, 3)
+    if len(rgb_matrix_2d) == 0:
+        return numpy.empty((0, 3))
+
+    return process_helper(rgb_matrix_2d)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Loads an image, decoding it in strips when a memory budget is given.
+#   @details    PIL Image objects that were opened but haven't been decoded
+#               yet are decoded in strips as well.
+#
+#   @param  image_source    An image source (see open_image()).
+#   @param  memory_budget   An integer that represents the maximum number of bytes to use for decoding (or None).
+#
+#   @return PIL Image object, or numpy array if the image source is a numpy array.
+def load_image(image_source, memory_budget=None):
+    # Only images that haven't been decoded yet (still have tiles to decode) can be decoded in bands.
+    if memory_budget is None or isinstance(image_source, numpy.ndarray) or \
+            (isinstance(image_source, Image.Image) and not image_source.tile):
+        return open_image(image_source)
+
+    return load_image_tiled(image_source, memory_budget)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Rescales an image and gets its [r,g,b] pixels.
+#   @details    This is the decoding step of process_image(), which can be run
+#               on its own (e.g. in a separate thread) so process_image() only
+#               has to convert the pixels.
+#
+#   @note   A numpy array that is already the size the image would be rescaled
+#           to is returned as is, without being copied.
+#
+#   @param  image   PIL Image object or numpy array of [r,g,b] pixels shaped (H,W,3).
+#
+#   @return 3D numpy array of [r,g,b] pixels shaped (H,W,3).
+def rescale_pixels(image):
+    img_matrix_3d = None
+    if isinstance(image, numpy.ndarray):
+        img_matrix_3d = image
+        image = Image.fromarray(image)  # Shares the array's memory when possible.
+
+    # Make sure image is in [r,g,b] format.
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    new_size = rescale_image(image)
+    if img_matrix_3d is None or new_size != image.size:
+        resized_img = image.resize(new_size, Image.LANCZOS)
+        img_matrix_3d = numpy.array(resized_img)
+
+    return img_matrix_3d
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Loads an image in horizontal strips, reducing each strip before decoding the next.
+#   @details    Peak memory stays close to the memory budget, no matter how
+#               large the image is, and Pillow's decompression bomb guard is
+#               replaced by the memory budget. The reduced image is still
+#               larger than the image process_image() rescales to, so the
+#               final rescale keeps its quality.
+#               - Images that fit into the memory budget are decoded as usual.
+#               - JPEG images are decoded at a reduced scale (1/2, 1/4 or 1/8)
+#                 by the JPEG decoder itself.
+#               - Uncompressed images (BMP, PPM, uncompressed TIFF, etc.) and
+#                 images made of several tiles or strips are decoded one
+#                 horizontal strip at a time, and each strip is reduced with a
+#                 box filter before the next one is decoded.
+#
+#   @note   Images stored as a single compressed stream (e.g. PNG or compressed TIFF)
+#           can only be decoded as a whole, so those images are decoded in full
+#           (with a warning that the memory budget is exceeded) and rescaled
+#           right away. The same goes for every image if Pillow's decoders
+#           can't be driven band by band (see decode_band()).
+#
+#   @param  image_path      A string that represents the path to an image (or a bytes-like or file object, or a PIL Image object that hasn't been decoded yet).
+#   @param  memory_budget   An integer that represents the maximum number of bytes to use for decoding.
+#
+#   @return PIL Image object of the (reduced) image.
+def load_image_tiled(image_path, memory_budget):
+    if isinstance(image_path, Image.Image):
+        image = image_path
+    else:
+        image = open_image_unguarded(image_path)
+    width, height = image.size
+    target_width, target_height = rescale_image(image)
+    reduce_factor = max(1, min(width // max(target_width, 1), height // max(target_height, 1)))
+
+    # Images that fit into the memory budget are decoded as usual.
+    if width * height * BYTES_PER_DECODED_PIXEL <= memory_budget:
+        return image
+
+    # JPEG images can be scaled down while decoding.
+    if image.format == 'JPEG' and reduce_factor > 1:
+        image.draft('RGB', (width // reduce_factor, height // reduce_factor))
+        if image.size[0] * image.size[1] * BYTES_PER_DECODED_PIXEL <= memory_budget:
+            return image
+
+    band_height = max(reduce_factor, memory_budget // (width * BYTES_PER_DECODED_PIXEL))
+    image_bands = get_image_bands(image, band_height)
+    if image_bands is None:
+        return load_image_whole(image, memory_budget)
+
+    # Decode and reduce each band, carrying over rows that don't fill a whole box of the box filter.
+    reduced_bands = []
+    carried_rows = numpy.empty((0, width, 3), dtype=numpy.uint8)
+    for top, bottom, band_tiles in image_bands:
+        band = decode_band(image, band_tiles, top, bottom)
+        if band is None:
+            return load_image_whole(image, memory_budget)
+        rgb_rows = numpy.concatenate([carried_rows, numpy.asarray(band.convert('RGB'))])
+        band.close()
+
+        usable_rows = (len(rgb_rows) // reduce_factor) * reduce_factor
+        if usable_rows > 0:
+            reduced_bands.append(reduce_rows(rgb_rows[:usable_rows], reduce_factor))
+        carried_rows = rgb_rows[usable_rows:].copy()
+
+    image.close()
+
+    return Image.fromarray(numpy.concatenate(reduced_bands))
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Decodes a whole image that can't be decoded in bands, and rescales it right away.
+#   @details    The image is decoded in full, so decoding it takes more memory
+#               than the memory budget (which is warned about), but only the
+#               rescaled image is kept.
+#
+#   @param  image           PIL Image object that hasn't been decoded yet (or has only been partly decoded in bands).
+#   @param  memory_budget   An integer that represents the maximum number of bytes to use for decoding.
+#
+#   @return PIL Image object of the rescaled image.
+def load_image_whole(image, memory_budget):
+    width, height = image.size
+    warnings.warn("Image size (" + str(width) + "x" + str(height) + ") can't be decoded in strips, so it's decoded "
+                  "whole, past the memory budget of " + str(memory_budget) + " bytes.", RuntimeWarning, stacklevel=3)
+
+    image.load()
+    rescaled_image = Image.fromarray(rescale_pixels(image))
+    image.close()
+
+    return rescaled_image
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Opens an image from any of the supported image sources.
+#   @details    Supported image sources are file paths, bytes-like objects
+#               (bytes, bytearray, memoryview), file objects, PIL Image
+#               objects and numpy arrays of [r,g,b] pixels shaped (H,W,3)
+#               with a uint8 data type.
+#
+#   @note   PIL Image objects and numpy arrays are returned as is, so they can
+#           be handed to process_image() without being copied.
+#
+#   @param  image_source    An image source.
+#
+#   @return PIL Image object, or numpy array if the image source is a numpy array.
+#
+#   @exception  ValueError  If a numpy array isn't shaped (H,W,3) with a uint8 data type.
+def open_image(image_source):
+    if isinstance(image_source, Image.Image):
+        return image_source
+
+    if isinstance(image_source, numpy.ndarray):
+        if image_source.ndim != 3 or image_source.shape[2] != 3 or image_source.dtype != numpy.uint8:
+            raise ValueError("Image arrays must be shaped (H,W,3) with a uint8 data type, not " +
+                             str(image_source.shape) + " with a " + str(image_source.dtype) + " data type.")
+        return image_source
+
+    return Image.open(get_image_file(image_source))
+
+
 # **************************************************************************
 # **************************************************************************
 
@@ -100,10 +309,195 @@ def rescale_image(image):
 # --------------------------------------------------------------------------
 
 ##  Helper function for multiprocessing conversion operations.
-#   @details    Helps convert from [r,g,b] to [h,s,v].
+#   @details    Helps convert from [r,g,b] to [h,s,v]. The conversion is
+#               vectorized, so it runs inside numpy (which releases the GIL)
+#               and can be split over threads as well as processes.
 #
 #   @param  rgb_matrix_2d   A 2D matrix of rgb values.
 #
 #   @return A numpy array/2D matrix of converted [h,s,v] values.
 def process_helper(rgb_matrix_2d):
-    return numpy.apply_along_axis(convert.rgb_to_hsv, 1, rgb_matrix_2d)
+    return convert.rgb_matrix_to_hsv(rgb_matrix_2d)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets something Pillow can open from an image path or bytes-like object.
+#   @details    Bytes-like objects (bytes, bytearray, memoryview) are wrapped
+#               in an in-memory file object, everything else (file paths and
+#               file objects) is returned as is.
+#
+#   @param  image_source    A string that represents the path to an image, or a bytes-like or file object.
+#
+#   @return A file path or file object.
+def get_image_file(image_source):
+    if isinstance(image_source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(image_source)
+
+    return image_source
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Opens an image without Pillow's decompression bomb guard.
+#   @details    Only the image header is read, the image data itself is
+#               decoded later (e.g. by load_image_tiled()).
+#
+#   @param  image_path  A string that represents the path to an image (or a bytes-like or file object).
+#
+#   @return PIL Image object that hasn't been decoded yet.
+def open_image_unguarded(image_path):
+    with BOMB_GUARD_LOCK:
+        max_image_pixels = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            image = Image.open(get_image_file(image_path))
+        finally:
+            Image.MAX_IMAGE_PIXELS = max_image_pixels
+
+    return image
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Splits the (not yet decoded) image data into horizontal bands.
+#   @details    A single uncompressed tile is split into bands of band_height
+#               rows. Images made of several tiles or strips are split along
+#               the tile rows, so each band holds whole tiles.
+#
+#   @param  image       PIL Image object that hasn't been decoded yet.
+#   @param  band_height An integer that represents the preferred number of rows per band.
+#
+#   @return List of [top, bottom, tiles] bands, or None if the image can't be decoded in bands.
+def get_image_bands(image, band_height):
+    width, height = image.size
+    image_bands = []
+
+    # A single uncompressed tile can be split at any row.
+    if len(image.tile) == 1 and image.tile[0][0] == 'raw':
+        codec, extents, offset, args = image.tile[0]
+        if isinstance(args, str):
+            args = (args,)
+        rawmode = args[0]
+        stride = args[1] if len(args) > 1 else 0
+        orientation = args[2] if len(args) > 2 else 1
+
+        if tuple(extents) != (0, 0, width, height):
+            return None
+        if stride == 0:
+            if rawmode not in RAW_MODE_BITS:
+                return None
+            stride = (width * RAW_MODE_BITS[rawmode] + 7) // 8
+
+        for top in range(0, height, band_height):
+            bottom = min(top + band_height, height)
+            # Bottom-up images (orientation -1) store the last row first.
+            first_row = top if orientation > 0 else height - bottom
+            band_tile = ('raw', (0, top, width, bottom), offset + first_row * abs(stride), (rawmode, stride, orientation))
+            image_bands.append([top, bottom, [band_tile]])
+
+        return image_bands
+
+    # Images made of several tiles or strips are split along tile rows.
+    if len(image.tile) < 2 or any(tile[0] == 'libtiff' for tile in image.tile):
+        return None
+
+    tile_rows = {}
+    for tile in image.tile:
+        tile_rows.setdefault((tile[1][1], tile[1][3]), []).append(tile)
+
+    band_top, band_bottom, band_tiles = None, None, []
+    for (row_top, row_bottom), row_tiles in sorted(tile_rows.items()):
+        if band_tiles and row_bottom - band_top > band_height:
+            image_bands.append([band_top, band_bottom, band_tiles])
+            band_tiles = []
+        if not band_tiles:
+            band_top = row_top
+        band_bottom = row_bottom
+        band_tiles.extend(row_tiles)
+
+    if band_tiles:
+        image_bands.append([band_top, band_bottom, band_tiles])
+
+    return image_bands
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Decodes one horizontal band of an image.
+#   @details    The decoding loop follows the one used by Pillow's
+#               ImageFile.load(), but the tiles are decoded into an image
+#               that is only as large as the band.
+#
+#   @note   Pillow's decoders are created with Image._getdecoder(), which is
+#           private, so None is returned if this version of Pillow doesn't
+#           have it (or it takes other arguments), and the image has to be
+#           decoded whole instead.
+#
+#   @param  image       PIL Image object that hasn't been decoded yet.
+#   @param  band_tiles  List of tiles [codec, extents, offset, args] that make up the band.
+#   @param  top         An integer that represents the first row of the band.
+#   @param  bottom      An integer that represents the row after the last row of the band.
+#
+#   @return PIL Image object of the decoded band, or None if Pillow's decoders can't be used.
+#
+#   @exception  OSError If the image data is truncated or can't be decoded.
+def decode_band(image, band_tiles, top, bottom):
+    band = Image.new(image.mode, (image.size[0], bottom - top))
+    if image.mode == 'P' and image.palette is not None:
+        band.putpalette(image.palette)
+
+    for codec, extents, offset, args in band_tiles:
+        try:
+            decoder = Image._getdecoder(image.mode, codec, args, getattr(image, 'decoderconfig', ()))
+        except (AttributeError, TypeError):
+            band.close()
+            return None
+        decoder.setimage(band.im, (extents[0], extents[1] - top, extents[2], extents[3] - top))
+        image.fp.seek(offset)
+
+        data = b''
+        try:
+            while True:
+                new_data = image.fp.read(image.decodermaxblock)
+                if not new_data:
+                    raise OSError("image file is truncated")
+                data += new_data
+                consumed, error_code = decoder.decode(data)
+                if consumed < 0:
+                    break
+                data = data[consumed:]
+        finally:
+            decoder.cleanup()
+
+        if error_code < 0:
+            raise OSError(DECODER_ERRORS.get(error_code, "decoder error " + str(error_code)) + " when reading image file")
+
+    return band
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Reduces rows of [r,g,b] pixels with a box filter.
+#   @details    Each block of reduce_factor x reduce_factor pixels is
+#               averaged into a single pixel. Columns that don't fill a
+#               whole block are dropped.
+#
+#   @param  rgb_rows        A 3D numpy array of [r,g,b] pixels whose number of rows is a multiple of reduce_factor.
+#   @param  reduce_factor   A positive integer that represents the box size.
+#
+#   @return A 3D numpy array of reduced [r,g,b] pixels.
+def reduce_rows(rgb_rows, reduce_factor):
+    if reduce_factor == 1:
+        return rgb_rows
+
+    rows, columns = rgb_rows.shape[0] // reduce_factor, rgb_rows.shape[1] // reduce_factor
+    blocks = rgb_rows[:rows * reduce_factor, :columns * reduce_factor].reshape(rows, reduce_factor, columns, reduce_factor, 3)
+    block_sums = blocks.sum(axis=(1, 3), dtype=numpy.uint32)
+
+    return ((block_sums + (reduce_factor * reduce_factor) // 2) // (reduce_factor * reduce_factor)).astype(numpy.uint8)
@@ -0,0 +1,159 @@
+##  @file   manifest_utils.py
+#   @brief  Utilities for recording the completed images of a batch, so it can be resumed.
+#   @details    A manifest is an append-only JSON Lines file with one record
+#               per completed image: its path, content hash, size, modification
+#               time and output paths. Each record is flushed as soon as the
+#               image is done, so a batch that dies part of the way through can
+#               be resumed by reading the manifest once, and skipping the images
+#               that were completed and haven't changed since.
+#
+#   @note   A record that was only partly written when the batch died is
+#           dropped when the manifest is resumed, so its image is extracted
+#           again.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import json
+import os
+import threading
+import time
+
+from . import file_utils as futils
+
+# ---- GLOBAL VARIABLES ----
+## The keys that every record of a manifest has.
+MANIFEST_KEYS = ('path', 'content-hash', 'size', 'mtime-ns', 'outputs', 'completed-at')
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  A manifest of the images that a batch has completed.
+class BatchManifest:
+
+    ##  BatchManifest Constructor.
+    #   @details    Starts a new manifest, or reads the completed images of an
+    #               existing one and keeps adding to it when resuming.
+    #
+    #   @param  self                The object pointer.
+    #   @param  manifest_filepath   A string that represents the path of the manifest file.
+    #   @param  resume              Flag to keep the records of an existing manifest, instead of starting over.
+    def __init__(self, manifest_filepath, resume=False):
+        self.manifest_filepath = manifest_filepath
+        self.lock = threading.Lock()
+        self.completed_images = {}
+        self.added_images = 0
+        self.skipped_images = 0
+
+        manifest_dir = os.path.dirname(manifest_filepath)
+        if manifest_dir != '':
+            os.makedirs(manifest_dir, exist_ok=True)
+
+        if resume and os.path.isfile(manifest_filepath):
+            self.completed_images = read_manifest(manifest_filepath)
+            self.manifest_file = open(manifest_filepath, 'a', encoding='utf-8')
+        else:
+            self.manifest_file = open(manifest_filepath, 'w', encoding='utf-8')
+
+    ##  Checks if an image was completed, and hasn't changed since.
+    #   @details    An image whose size and modification time are the same is
+    #               unchanged without reading it, otherwise its content hash
+    #               has to be the same. Its output files must still exist too.
+    #
+    #   @param  self        The object pointer.
+    #   @param  image_path  A string that represents the path to the image.
+    #
+    #   @return A (is completed, source state) tuple, where the source state is a dictionary of the image's 'content-hash',
+    #           'size' and 'mtime-ns' (or None if the image can't be read).
+    def check_source(self, image_path):
+        try:
+            image_stat = os.stat(image_path)
+        except OSError:
+            return False, None
+
+        record = self.completed_images.get(os.path.abspath(image_path))
+        if record is not None and (record['size'], record['mtime-ns']) == (image_stat.st_size, image_stat.st_mtime_ns):
+            source_state = {'content-hash': record['content-hash'], 'size': record['size'], 'mtime-ns': record['mtime-ns']}
+        else:
+            try:
+                source_state = {'content-hash': futils.hash_file(image_path), 'size': image_stat.st_size,
+                                'mtime-ns': image_stat.st_mtime_ns}
+            except OSError:
+                return False, None
+
+        is_completed = (record is not None and record['content-hash'] == source_state['content-hash'] and
+                        all(output_path == '-' or os.path.exists(output_path) for output_path in record['outputs']))
+        if is_completed:
+            with self.lock:
+                self.skipped_images += 1
+
+        return is_completed, source_state
+
+    ##  Adds a completed image to the manifest.
+    #   @details    Thread-safe, so several pipeline write workers can share the
+    #               manifest. The record is flushed right away, so it survives
+    #               the batch dying on the next image.
+    #
+    #   @param  self            The object pointer.
+    #   @param  image_path      A string that represents the path to the image.
+    #   @param  output_paths    List of strings that represent the paths of the image's output files.
+    #   @param  source_state    A dictionary of the image's 'content-hash', 'size' and 'mtime-ns' (see check_source()),
+    #                           which is read from the image if it isn't given.
+    def add(self, image_path, output_paths, source_state=None):
+        if source_state is None:
+            image_stat = os.stat(image_path)
+            source_state = {'content-hash': futils.hash_file(image_path), 'size': image_stat.st_size,
+                            'mtime-ns': image_stat.st_mtime_ns}
+
+        record = {'path': os.path.abspath(image_path), 'content-hash': source_state['content-hash'],
+                  'size': source_state['size'], 'mtime-ns': source_state['mtime-ns'],
+                  'outputs': [output_path if output_path == '-' else os.path.abspath(output_path) for output_path in output_paths],
+                  'completed-at': time.time()}
+
+        with self.lock:
+            self.manifest_file.write(json.dumps(record) + '\n')
+            self.manifest_file.flush()
+            self.completed_images[record['path']] = record
+            self.added_images += 1
+
+    ##  Closes the manifest.
+    #
+    #   @param  self    The object pointer.
+    def close(self):
+        with self.lock:
+            self.manifest_file.close()
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Reads the records of a manifest, and drops a partly written last record.
+#   @details    Later records of the same image replace the earlier ones, and
+#               lines that aren't valid records are ignored.
+#
+#   @param  manifest_filepath   A string that represents the path of the manifest file.
+#
+#   @return Dictionary of the absolute image paths and their records.
+def read_manifest(manifest_filepath):
+    completed_images = {}
+    manifest_size = 0
+    with open(manifest_filepath, 'r+b') as manifest_file:
+        for line in manifest_file:
+            if not line.endswith(b'\n'):   # Partly written when the batch died.
+                break
+            manifest_size += len(line)
+
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and all(key in record for key in MANIFEST_KEYS):
+                completed_images[record['path']] = record
+
+        manifest_file.truncate(manifest_size)
+
+    return completed_images
@@ -0,0 +1,132 @@
+##  @file   parallel_utils.py
+#   @brief  Utilities for running work in parallel.
+#
+#   @note   Potential point for contributors to add
+#           different parallel execution backends.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import collections
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+# ---- GLOBAL VARIABLES ----
+## Set of the supported execution backends.
+BACKENDS = {'serial', 'thread', 'process'}
+## Default number of pixels below which the 'auto' backend runs the work serially.
+PARALLEL_THRESHOLD = 50000
+## A pool of worker processes that the 'process' backend shares between calls (e.g. the daemon's warm pool),
+## or None to start a new pool for every call.
+SHARED_POOL = None
+
+
+##  Applies a function to every task, using the selected execution backend.
+#   @details    The 'process' backend runs the tasks on a pool of worker
+#               processes, the 'thread' backend runs them on a pool of threads,
+#               and the 'serial' backend runs them one after another in the
+#               current process. The thread and serial backends are needed
+#               wherever a new process pool can't be created, such as inside
+#               the worker processes of another pool or in hosts that don't
+#               allow subprocesses. Threads only run in parallel while the
+#               tasks are spent inside code that releases the GIL (e.g. numpy).
+#
+#   @note   The 'process' backend uses SHARED_POOL instead of starting a new
+#           pool, if there is one (in the process that created it).
+#
+#   @param  function    The function to apply to each task (must be picklable for the 'process' backend).
+#   @param  tasks       A list of tasks, where each task is passed to the function as its only argument.
+#   @param  backend     A string that represents the execution backend (e.g. 'serial', 'thread', 'process').
+#   @param  workers     An integer that represents the number of workers (defaults to the number of CPUs, ignored by SHARED_POOL).
+#
+#   @return List of the results, in the same order as the tasks.
+def map_tasks(function, tasks, backend='process', workers=None):
+    if backend == 'serial':
+        return [function(task) for task in tasks]
+
+    if backend == 'thread':
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(function, tasks))
+
+    # Worker processes forked from the process that owns the shared pool can't use it.
+    if SHARED_POOL is not None and multiprocessing.parent_process() is None:
+        return SHARED_POOL.map(function, tasks)
+
+    pool = multiprocessing.Pool(workers)
+    async_result = pool.map_async(function, tasks)
+    pool.close()
+    pool.join()
+
+    results = []
+    for value in async_result.get():
+        results.append(value)
+
+    return results
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Chooses the execution backend for a workload.
+#   @details    A simple cost model for the 'auto' backend: starting a pool of
+#               worker processes and sending the pixels to them costs more
+#               than it saves for small workloads, so workloads below the
+#               threshold (or machines with a single CPU) are run serially in
+#               the current process, and everything else in parallel.
+#               Any other backend is returned as is.
+#
+#   @param  backend     A string that represents the requested backend (e.g. 'auto', 'serial', 'process').
+#   @param  workload    An integer that represents the size of the workload (e.g. number of pixels).
+#   @param  threshold   An integer that represents the workload size from which to run in parallel (defaults to PARALLEL_THRESHOLD).
+#
+#   @return A string that represents the chosen backend.
+def choose_backend(backend, workload, threshold=None):
+    if backend != 'auto':
+        return backend
+
+    if threshold is None:
+        threshold = PARALLEL_THRESHOLD
+
+    if workload < threshold or multiprocessing.cpu_count() < 2:
+        return 'serial'
+
+    return 'process'
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Lazily applies a function to every task on a pool of threads, and yields the results in order.
+#   @details    Only a window of tasks is submitted ahead of the results that
+#               have been consumed, so the tasks can come from a generator
+#               of any length, and the work overlaps with whatever consumes
+#               the results. Meant for I/O-bound tasks (e.g. opening files).
+#
+#   @param  function    The function to apply to each task.
+#   @param  tasks       An iterable of tasks, where each task is passed to the function as its only argument.
+#   @param  workers     An integer that represents the number of threads (1 or less runs the tasks in the current thread).
+#   @param  window      An integer that represents the maximum number of tasks submitted ahead (defaults to twice the number of threads).
+#
+#   @return Generator of the results, in the same order as the tasks.
+def imap_threads(function, tasks, workers=1, window=None):
+    if workers <= 1:
+        for task in tasks:
+            yield function(task)
+        return
+
+    if window is None:
+        window = 2 * workers
+
+    pending_results = collections.deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for task in tasks:
+            pending_results.append(executor.submit(function, task))
+            if len(pending_results) >= window:
+                yield pending_results.popleft().result()
+
+        while pending_results:
+            yield pending_results.popleft().result()
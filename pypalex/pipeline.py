@@ -0,0 +1,389 @@
+##  @file   pipeline.py
+#   @brief  Staged pipeline for extracting color palettes from batches of images.
+#   @details    Each image goes through 3 stages that are connected by bounded
+#               queues, so every stage keeps working on the next image while
+#               the other stages are busy:
+#               - decode:   threads that open, decode and rescale the images
+#                           (Pillow releases the GIL while decoding and resizing).
+#               - compute:  worker processes (or threads) that convert the pixels
+#                           and extract the colors and palettes (CPU-bound).
+#               - write:    threads that hand the results over to be saved (I/O-bound).
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import multiprocessing
+import multiprocessing.pool
+import queue
+import signal
+import threading
+
+from .Extractor import Extractor
+from . import image_utils as imutils
+
+# ---- GLOBAL VARIABLES ----
+## Default options used to extract colors and generate palettes from them.
+DEFAULT_OPTIONS = {'pastel-light': False, 'pastel-normal': False, 'pastel-dark': False,
+                   'template-palettes': True, 'adaptive-palettes': False, 'mood-palettes': False,
+                   'palette-templates': {}, 'color-format': 'hex', 'memory-budget': None, 'parallel-threshold': None,
+                   'light-adaptive-name': 'goldilocks-light', 'dark-adaptive-name': 'goldilocks-dark',
+                   'light-mood-name': 'light-mood', 'dark-mood-name': 'dark-mood'}
+## Marks the end of the work in a queue.
+END_OF_WORK = None
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Extracts the colors and palettes from a single image.
+#
+#   @param  image_source    The image source (see Extractor.load()).
+#   @param  image_name      A string that represents the name of the image.
+#   @param  options         A dictionary of options (see DEFAULT_OPTIONS), missing options use their default values.
+#   @param  backend         A string that represents the execution backend (see parallel_utils.BACKENDS).
+#
+#   @return Dictionary of results (see generate_results()).
+def extract_palettes(image_source, image_name=None, options=None, backend='auto'):
+    options = get_options(options)
+
+    extractor = Extractor(backend=backend, parallel_threshold=options['parallel-threshold'])
+    extractor.load(image_source, image_name=image_name, memory_budget=options['memory-budget'])
+    extractor.run()
+    extractor.convert_to_pastel(pastel_light=options['pastel-light'], pastel_normal=options['pastel-normal'],
+                                pastel_dark=options['pastel-dark'])
+
+    return generate_results(extractor, options)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Runs a batch of images through the decode, compute and write stages.
+#   @details    The results are handed over to handle_result() as soon as they
+#               are ready, so they don't come in the same order as the work
+#               items, unless the order is kept. To keep the order, results
+#               that finish early wait in a reorder buffer, and the decode
+#               stage doesn't start on work items that are more than the
+#               reorder window ahead of the next result to hand over, which
+#               keeps the buffer bounded. Images that fail in any of the
+#               stages don't stop the rest of the batch and are returned as
+#               failures instead.
+#
+#   @note   handle_result() is called from the write threads, so it must be
+#           thread-safe when more than 1 write worker is used (keeping the
+#           order always uses a single write worker).
+#
+#           A pool of compute workers (see create_pool()) can be passed in, to
+#           keep it warm for the next batches. It's left open once the batch is
+#           done, and the caller has to close it.
+#
+#   @param  work_items      An iterable of work item dictionaries, each with at least a 'path' and an 'image-name'.
+#   @param  handle_result   A function that takes a work item and its results (e.g. to save them).
+#   @param  options         A dictionary of options (see DEFAULT_OPTIONS), missing options use their default values.
+#   @param  decode_workers  An integer that represents the number of decode threads.
+#   @param  compute_workers An integer that represents the number of compute processes (defaults to the number of CPUs).
+#   @param  compute_backend A string that represents the compute stage backend ('process', or 'thread' where subprocesses aren't allowed).
+#   @param  write_workers   An integer that represents the number of write threads.
+#   @param  queue_size      An integer that represents the maximum number of images waiting between 2 stages.
+#   @param  keep_order      Flag to hand the results over in the same order as the work items.
+#   @param  reorder_window  An integer that represents the maximum number of images in flight when keeping the order
+#                           (defaults to twice the sum of the compute workers and the queue size).
+#   @param  pool            A pool of compute_workers workers that is shared with other batches, or None to create one for this batch.
+#
+#   @return List of (work item, exception) tuples for the images that failed.
+def run_pipeline(work_items, handle_result, options=None, decode_workers=2, compute_workers=None,
+                 write_workers=1, queue_size=4, compute_backend='process', keep_order=False, reorder_window=None, pool=None):
+    options = get_options(options)
+    if compute_workers is None:
+        compute_workers = multiprocessing.cpu_count()
+
+    order_slots = None
+    if keep_order:
+        if reorder_window is None:
+            reorder_window = 2 * (compute_workers + queue_size)
+        order_slots = threading.BoundedSemaphore(max(1, reorder_window))
+        write_workers = 1
+
+    decoded_queue = queue.Queue(maxsize=queue_size)
+    results_queue = queue.Queue(maxsize=queue_size)
+    compute_slots = threading.BoundedSemaphore(compute_workers + queue_size)
+    work_lock = threading.Lock()
+    work_items = enumerate(work_items)  # Numbered in their input order.
+    failures = []
+
+    decoders = start_threads(decode_work_items, decode_workers,
+                             (work_items, work_lock, decoded_queue, results_queue, options['memory-budget'], order_slots))
+    writers = start_threads(write_results, write_workers, (results_queue, handle_result, failures, order_slots))
+
+    own_pool = pool is None
+    if own_pool:
+        pool = create_pool(compute_workers, compute_backend)
+    try:
+        finished_decoders = 0
+        while finished_decoders < decode_workers:
+            decoded_work = decoded_queue.get()
+            if decoded_work is END_OF_WORK:
+                finished_decoders += 1
+                continue
+
+            index, work_item, pixels = decoded_work
+            compute_slots.acquire()     # Keep the compute stage from running ahead of the write stage.
+            submit_work_item(pool, index, work_item, pixels, options, results_queue, compute_slots)
+
+        if own_pool:
+            pool.close()
+            pool.join()
+        else:   # Wait for the images that are still in the shared pool, by taking back all of the compute slots.
+            for _ in range(compute_workers + queue_size):
+                compute_slots.acquire()
+    except BaseException:
+        if own_pool:
+            pool.terminate()
+        raise
+
+    for thread in decoders:
+        thread.join()
+    for _ in writers:
+        results_queue.put(END_OF_WORK)
+    for thread in writers:
+        thread.join()
+
+    return failures
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Creates a pool of compute workers for the pipeline.
+#
+#   @param  compute_workers     An integer that represents the number of workers (defaults to the number of CPUs).
+#   @param  compute_backend     A string that represents the compute stage backend ('process', or 'thread' where subprocesses aren't allowed).
+#   @param  ignore_interrupts   Flag for worker processes that ignore Ctrl+C, and are left for the caller to terminate
+#                               (e.g. for a pool that's stopped with Ctrl+C).
+#
+#   @return A multiprocessing pool (or a pool of threads).
+def create_pool(compute_workers=None, compute_backend='process', ignore_interrupts=False):
+    if compute_workers is None:
+        compute_workers = multiprocessing.cpu_count()
+
+    if compute_backend == 'thread':
+        return multiprocessing.pool.ThreadPool(compute_workers)
+    return multiprocessing.Pool(compute_workers, initializer=ignore_interrupt_signal if ignore_interrupts else None)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Makes the current (worker) process ignore Ctrl+C.
+def ignore_interrupt_signal():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the full set of options.
+#
+#   @param  options A dictionary of options (see DEFAULT_OPTIONS), or None.
+#
+#   @return Dictionary of options, where missing options use their default values.
+def get_options(options=None):
+    full_options = dict(DEFAULT_OPTIONS)
+    if options is not None:
+        full_options.update(options)
+
+    return full_options
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Generates the palettes and collects the results of an Extractor.
+#   @details    The palettes are generated first, while the extracted colors
+#               are still in HSV format, and then every color (palettes and
+#               raw colors) is converted into the selected color format.
+#
+#   @param  extractor   An Extractor object that has already been run.
+#   @param  options     A dictionary of options (see DEFAULT_OPTIONS).
+#
+#   @return Dictionary with the 'image-name', 'color-format', 'palettes', 'raw-colors', 'ratios' and 'backends' (used for each processing step).
+def generate_results(extractor, options):
+    palettes = {}
+    if options['adaptive-palettes']:
+        palettes.update(extractor.generate_adaptive_palettes(light_palette_name=options['light-adaptive-name'],
+                                                             dark_palette_name=options['dark-adaptive-name']))
+    if options['mood-palettes']:
+        palettes.update(extractor.generate_mood_palettes(light_palette_name=options['light-mood-name'],
+                                                         dark_palette_name=options['dark-mood-name']))
+    if options['template-palettes']:
+        palettes.update(extractor.generate_palettes(options['palette-templates']))
+
+    for palette in palettes.values():
+        extractor.set_color_format(options['color-format'], colors_dict=palette)
+    extractor.set_color_format(options['color-format'])    # Raw colors need to always be converted LAST!
+
+    return {'image-name': extractor.image_name, 'color-format': extractor.color_format, 'palettes': palettes,
+            'raw-colors': extractor.extracted_colors_dict, 'ratios': dict(extractor.ratio_dict),
+            'backends': dict(extractor.backends_used)}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Starts a number of daemon threads that run the same function.
+#
+#   @param  function    The function each thread runs.
+#   @param  count       An integer that represents the number of threads.
+#   @param  args        A tuple of arguments passed to the function.
+#
+#   @return List of the started threads.
+def start_threads(function, count, args):
+    threads = []
+    for _ in range(count):
+        thread = threading.Thread(target=function, args=args, daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    return threads
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Decode stage: decodes and rescales images until there are no work items left.
+#
+#   @param  work_items      An iterator of (index, work item dictionary) tuples (shared by all decode threads).
+#   @param  work_lock       A lock that guards the shared iterator.
+#   @param  decoded_queue   A queue where the (index, work item, pixels) tuples are put.
+#   @param  results_queue   A queue where the images that fail to decode are put.
+#   @param  memory_budget   An integer that represents the maximum number of bytes to use for decoding (or None).
+#   @param  order_slots     A semaphore of the reorder window, acquired for each work item (None when the order isn't kept).
+def decode_work_items(work_items, work_lock, decoded_queue, results_queue, memory_budget, order_slots=None):
+    while True:
+        if order_slots is not None:
+            order_slots.acquire()   # Released by the write stage once the image is handed over.
+        with work_lock:
+            indexed_work_item = next(work_items, END_OF_WORK)
+        if indexed_work_item is END_OF_WORK:
+            if order_slots is not None:
+                order_slots.release()
+            decoded_queue.put(END_OF_WORK)
+            return
+
+        index, work_item = indexed_work_item
+
+        # Reuse the image opened while checking the sources, and drop it from the work item once it's decoded.
+        image_source = work_item.pop('image', work_item['path'])
+        try:
+            pixels = decode_image(image_source, memory_budget=memory_budget)
+        except Exception as error:
+            results_queue.put((index, work_item, None, error))
+            continue
+
+        decoded_queue.put((index, work_item, pixels))
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Decodes and rescales an image.
+#
+#   @param  image_source    The image source (see Extractor.load()).
+#   @param  memory_budget   An integer that represents the maximum number of bytes to use for decoding (or None).
+#
+#   @return 3D numpy array of the image's [r,g,b] pixels.
+def decode_image(image_source, memory_budget=None):
+    image = imutils.load_image(image_source, memory_budget=memory_budget)
+
+    return imutils.rescale_pixels(image)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Compute stage: hands a decoded image over to the pool of worker processes.
+#
+#   @param  pool            A multiprocessing pool.
+#   @param  index           An integer that represents the position of the work item in the input order.
+#   @param  work_item       A work item dictionary.
+#   @param  pixels          A 3D numpy array of the image's [r,g,b] pixels.
+#   @param  options         A dictionary of options (see DEFAULT_OPTIONS).
+#   @param  results_queue   A queue where the (index, work item, results, exception) tuples are put.
+#   @param  compute_slots   A semaphore that is released once the image is done.
+def submit_work_item(pool, index, work_item, pixels, options, results_queue, compute_slots):
+    def finish(results=None, error=None):
+        results_queue.put((index, work_item, results, error))
+        compute_slots.release()
+
+    pool.apply_async(compute_results, (pixels, work_item['image-name'], options),
+                     callback=finish, error_callback=lambda error: finish(error=error))
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Write stage: hands the results over until the end of the work is reached.
+#   @details    When the order is kept, results that finish before the ones
+#               ahead of them wait in a reorder buffer, which the reorder
+#               window keeps from growing past its size.
+#
+#   @param  results_queue   A queue of (index, work item, results, exception) tuples.
+#   @param  handle_result   A function that takes a work item and its results.
+#   @param  failures        A list where the (work item, exception) tuples of failed images are added.
+#   @param  order_slots     A semaphore of the reorder window, released for each result handed over (None to hand them over as they come).
+def write_results(results_queue, handle_result, failures, order_slots=None):
+    reorder_buffer = {}
+    next_index = 0
+    while True:
+        finished_work = results_queue.get()
+        if finished_work is END_OF_WORK:
+            return
+
+        if order_slots is None:
+            hand_over_results(finished_work, handle_result, failures)
+            continue
+
+        reorder_buffer[finished_work[0]] = finished_work
+        while next_index in reorder_buffer:
+            hand_over_results(reorder_buffer.pop(next_index), handle_result, failures)
+            order_slots.release()
+            next_index += 1
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Hands the results of a single image over, or adds it to the failures.
+#
+#   @param  finished_work   An (index, work item, results, exception) tuple.
+#   @param  handle_result   A function that takes a work item and its results.
+#   @param  failures        A list where the (work item, exception) tuples of failed images are added.
+def hand_over_results(finished_work, handle_result, failures):
+    _, work_item, results, error = finished_work
+    if error is None:
+        try:
+            handle_result(work_item, results)
+        except Exception as handle_error:
+            error = handle_error
+
+    if error is not None:
+        failures.append((work_item, error))
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Extracts the colors and palettes from the pixels of a decoded image.
+#   @details    Runs inside the compute workers, which can't start process
+#               pools of their own, so the serial backend is used.
+#
+#   @param  pixels      A 3D numpy array of the image's [r,g,b] pixels.
+#   @param  image_name  A string that represents the name of the image.
+#   @param  options     A dictionary of options (see DEFAULT_OPTIONS).
+#
+#   @return Dictionary of results (see generate_results()).
+def compute_results(pixels, image_name, options):
+    return extract_palettes(pixels, image_name=image_name, options=options, backend='serial')
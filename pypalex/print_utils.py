@@ -9,10 +9,11 @@
 #   - Created by Al Timofeyev on April 5, 2023.
 #   - Modified by Al Timofeyev on July 8, 2024.
 #   - Modified by Al Timofeyev on October 12, 2024.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 # ---- IMPORTS ----
-import os
+import shutil
 from . import conversion_utils as convert
 
 
@@ -25,8 +26,7 @@ def print_raw_colors(extracted_colors_dict, color_format, pair_colors=False):
     rgb_colors_dict = get_rgb_colors(extracted_colors_dict, color_format)
     ansi_color_codes = extracted_colors_dict if color_format == 'ansi' else get_ansi_color_codes(rgb_colors_dict)
 
-    columns, rows = os.get_terminal_size()
-    # columns = os.get_terminal_size().columns
+    columns, rows = shutil.get_terminal_size()     # Falls back to $COLUMNS when not printing to a terminal.
 
     reset_color = '\033[0m'  # Reset ANSI color escape code.
 
@@ -333,8 +333,7 @@ def print_template_palette_preview(extracted_colors_dict, palette_templates, col
 #   @param  rgb_color       The extracted color in RGB color format.
 #   @param  ansi_color      The extracted color in ANSI color format.
 def print_raw_color(color_name, extracted_color, rgb_color, ansi_color):
-    columns, rows = os.get_terminal_size()
-    # columns = os.get_terminal_size().columns
+    columns, rows = shutil.get_terminal_size()     # Falls back to $COLUMNS when not printing to a terminal.
 
     reset_color = '\033[0m'  # Reset ANSI color escape code.
 
@@ -0,0 +1,224 @@
+##  @file   search_utils.py
+#   @brief  Utilities for searching the extracted palettes of whole image collections.
+#   @details    A palette index keeps the 46 extracted colors of every image
+#               as one packed array of HSV colors, so a query compares itself
+#               to every image at once with numpy (a vectorized brute force
+#               search), using the same circular-hue distance as the color
+#               extraction (see extraction_utils.calculate_dist_between_2_colors()).
+#
+#               Indexes are read from a palette store or a palette catalog, e.g.:
+#                   palette_index = read_store_index('palettes.npy')
+#                   palette_index.nearest_colors('#3b4252', count=10)
+#                   palette_index.similar_palettes(0, count=10)
+#
+#   @note   Queries over 100,000 images take a few milliseconds for colors,
+#           and tens of milliseconds for whole palettes (see
+#           benchmarks/bench_search.py).
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import json
+import os
+import sqlite3
+
+import numpy
+
+from . import catalog_utils as catalog
+from . import conversion_utils as convert
+from . import extraction_utils as exutil
+from . import store_utils as store
+
+# ---- GLOBAL VARIABLES ----
+## Default number of images that a query returns.
+DEFAULT_RESULTS = 10
+## The positions of the 12 base hue colors in the 'colors' field of a record, in the order of store_utils.HUE_NAMES.
+HUE_COLOR_INDICES = [store.COLOR_INDEX[hue_name] for hue_name in store.HUE_NAMES]
+## The number of colors that palettes are compared by: the backgrounds, foregrounds, black, white and the 12 base hues,
+## which are the first colors of store_utils.COLOR_NAMES (their light and dark versions are left out).
+PALETTE_COLORS = store.COLOR_INDEX['white'] + 1
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  An index of the palettes extracted from images, that can be searched by color or by palette.
+class PaletteIndex:
+
+    ##  PaletteIndex Constructor.
+    #   @details    Converts the colors of all the images to HSV once, so
+    #               queries only have to compute the distances.
+    #
+    #   @param  self    The object pointer.
+    #   @param  records A structured array of the records of the images (see store_utils.STORE_DTYPE), e.g. a memory-mapped store.
+    #   @param  names   A list of the {'image-name', 'source'} dictionaries of the records.
+    def __init__(self, records, names):
+        self.names = names
+        self.hsv_colors = numpy.zeros((len(records), len(store.COLOR_NAMES), 3), dtype=numpy.float32)
+        if len(records) > 0:
+            rgb_colors = numpy.asarray(records['colors']).reshape(-1, 3)
+            self.hsv_colors[:] = convert.rgb_matrix_to_hsv(rgb_colors).reshape(self.hsv_colors.shape)
+
+        # The dominant color of an image is the color of the hue with the largest ratio.
+        hue_ratios = numpy.asarray(records['ratios'])[:, :len(store.HUE_NAMES)]
+        dominant_indices = numpy.take(HUE_COLOR_INDICES, numpy.argmax(hue_ratios, axis=1))
+        self.dominant_colors = self.hsv_colors[numpy.arange(len(records)), dominant_indices]
+        self.palette_colors = numpy.ascontiguousarray(self.hsv_colors[:, :PALETTE_COLORS])
+
+    ##  Gets the number of images in the index.
+    #
+    #   @param  self    The object pointer.
+    #
+    #   @return The number of images.
+    def __len__(self):
+        return len(self.names)
+
+    ##  Finds the images whose color is closest to a color.
+    #
+    #   @param  self        The object pointer.
+    #   @param  color       A HEX string (e.g. '#3b4252') or an RGB array [r,g,b] of the color to search for.
+    #   @param  count       An integer that represents the maximum number of images to return.
+    #   @param  color_name  The name of the extracted color to compare (see store_utils.COLOR_NAMES, e.g. 'dark background'),
+    #                       or None to compare the dominant color of each image.
+    #
+    #   @return List of result dictionaries (see create_search_results()), from the closest image to the farthest.
+    #
+    #   @exception  ValueError  If the color or the color name isn't valid.
+    def nearest_colors(self, color, count=DEFAULT_RESULTS, color_name=None):
+        hsv_color = numpy.asarray(convert.rgb_to_hsv(parse_color(color)), dtype=numpy.float32)
+        if color_name is None:
+            image_colors = self.dominant_colors
+        elif color_name in store.COLOR_INDEX:
+            image_colors = self.hsv_colors[:, store.COLOR_INDEX[color_name]]
+        else:
+            raise ValueError("Unknown color name : " + str(color_name))
+
+        distances = exutil.calculate_dists_between_colors(image_colors, hsv_color)
+
+        return create_search_results(distances, self.names, count)
+
+    ##  Finds the images whose palettes are most similar to a palette.
+    #   @details    The distance between 2 palettes is the mean distance
+    #               between their colors of the same name (see PALETTE_COLORS).
+    #
+    #   @param  self    The object pointer.
+    #   @param  query   The position of an image in the index (which is left out of the results),
+    #                   or a dictionary of results (see pipeline.generate_results()) in any color format.
+    #   @param  count   An integer that represents the maximum number of images to return.
+    #
+    #   @return List of result dictionaries (see create_search_results()), from the most similar image to the least.
+    def similar_palettes(self, query, count=DEFAULT_RESULTS):
+        if isinstance(query, dict):
+            rgb_colors = store.create_record(query)['colors'][0]
+            query_colors = convert.rgb_matrix_to_hsv(rgb_colors[:PALETTE_COLORS]).astype(numpy.float32)
+        else:
+            query_colors = self.palette_colors[query]
+
+        distances = exutil.calculate_dists_between_colors(self.palette_colors, query_colors).mean(axis=1)
+        if not isinstance(query, dict):     # An image is always the most similar to itself.
+            distances[query] = numpy.inf
+            count = min(count, len(distances) - 1)
+
+        return create_search_results(distances, self.names, count)
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Reads a palette index from a palette store.
+#   @details    The records of the store are memory-mapped, so only the
+#               colors and ratios are read, and they're read once.
+#
+#   @param  store_filepath  A string that represents the path of the .npy file of the store.
+#
+#   @return A PaletteIndex of the images in the store.
+#
+#   @exception  ValueError  If the file isn't a palette store.
+def read_store_index(store_filepath):
+    records, names = store.read_store(store_filepath)
+
+    return PaletteIndex(records, names)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Reads a palette index from a palette catalog.
+#
+#   @param  catalog_filepath    A string that represents the path of the database file of the catalog.
+#
+#   @return A PaletteIndex of the images in the catalog.
+#
+#   @exception  ValueError  If the file doesn't exist or isn't a palette catalog.
+def read_catalog_index(catalog_filepath):
+    if not os.path.isfile(catalog_filepath):    # Opening a catalog that doesn't exist would create it.
+        raise ValueError("No palette catalog : " + catalog_filepath)
+
+    connection = catalog.open_catalog(catalog_filepath)
+    try:
+        rows = connection.execute("SELECT path, image_name, color_format, raw_colors, ratios FROM images").fetchall()
+    except sqlite3.DatabaseError as error:
+        raise ValueError("Not a palette catalog (" + str(error) + ") : " + catalog_filepath) from error
+    finally:
+        connection.close()
+
+    records = numpy.zeros(len(rows), dtype=store.STORE_DTYPE)
+    names = []
+    for index, (path, image_name, color_format, raw_colors, ratios) in enumerate(rows):
+        results = {'color-format': color_format, 'raw-colors': json.loads(raw_colors), 'ratios': json.loads(ratios)}
+        records[index] = store.create_record(results)[0]
+        names.append({'image-name': image_name, 'source': path})
+
+    return PaletteIndex(records, names)
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Parses a color to search for.
+#
+#   @param  color   A HEX string (e.g. '#3b4252' or '3b4252') or an RGB array [r,g,b].
+#
+#   @return RGB array [r,g,b].
+#
+#   @exception  ValueError  If the color isn't a valid HEX string or RGB array.
+def parse_color(color):
+    if isinstance(color, str):
+        hex_str = color if color.startswith('#') else '#' + color
+        try:
+            rgb_array = convert.hex_to_rgb(hex_str) if len(hex_str) == 7 else []
+        except ValueError:
+            rgb_array = []
+    else:
+        rgb_array = list(color)
+
+    if len(rgb_array) != 3 or not all(0 <= value <= 255 for value in rgb_array):
+        raise ValueError("Not a HEX string or RGB array of a color : " + str(color))
+
+    return rgb_array
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates the results of a search from the distances of all the images.
+#   @details    Only the closest images are sorted, so the search stays fast
+#               however large the index is.
+#
+#   @param  distances   A numpy array of the distance of each image to the query.
+#   @param  names       A list of the {'image-name', 'source'} dictionaries of the images.
+#   @param  count       An integer that represents the maximum number of images to return.
+#
+#   @return List of dictionaries of the 'image-name', 'source' and 'distance' of the closest images, from the closest to the farthest.
+def create_search_results(distances, names, count):
+    count = max(0, min(count, len(distances)))
+    if count == 0:
+        return []
+
+    closest_indices = numpy.argpartition(distances, count - 1)[:count]
+    closest_indices = closest_indices[numpy.argsort(distances[closest_indices], kind='stable')]
+
+    return [dict(names[index], distance=float(distances[index])) for index in closest_indices]
@@ -0,0 +1,506 @@
+##  @file   server.py
+#   @brief  Local HTTP server for extracting color palettes.
+#   @details    Started with "python -m pypalex serve". The server keeps a
+#               warm pool of worker processes and a cache of results, so
+#               each request only pays for the extraction itself and not for
+#               starting Python, importing numpy/Pillow and spawning a pool.
+#
+#               Endpoints:
+#               - GET  /health  : Status of the server, queue and cache.
+#               - POST /extract : Extracts colors and palettes from an image.
+#                 The body is either the encoded image itself (any content
+#                 type except JSON), or a JSON object with a local "path" to
+#                 an image and optional "image-name" and "options" (see
+#                 pipeline.DEFAULT_OPTIONS). Options can also be given as
+#                 query parameters (e.g. /extract?adaptive-palettes=true).
+#
+#               Requests wait in a bounded queue, and the server answers
+#               "503 Service Unavailable" when the queue is full.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import numpy
+from urllib.parse import urlsplit, parse_qsl
+
+from . import async_utils
+from . import pipeline
+
+# ---- GLOBAL VARIABLES ----
+## Default host the server listens on (local connections only).
+DEFAULT_HOST = '127.0.0.1'
+## Default port the server listens on.
+DEFAULT_PORT = 8765
+## Maximum size of a request body (encoded image) in bytes.
+MAX_BODY_SIZE = 64 * 1024 * 1024
+## Options that can be set through the query parameters, and their types.
+QUERY_OPTIONS = {'pastel-light': bool, 'pastel-normal': bool, 'pastel-dark': bool,
+                 'template-palettes': bool, 'adaptive-palettes': bool, 'mood-palettes': bool,
+                 'color-format': str}
+## Reason phrases of the HTTP status codes used by the server.
+STATUS_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Main function of the "serve" mode.
+#
+#   @param  argv    List of command line arguments that come after "serve".
+def main(argv):
+    args = vars(setup_argument_parser().parse_args(argv))
+
+    server = ExtractionServer(workers=args['workers'], queue_size=args['queue_size'], cache_size=args['cache_size'])
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(server.start(args['host'], args['port']))
+        try:
+            loop.add_signal_handler(signal.SIGTERM, loop.stop)     # Stop cleanly when terminated (e.g. by a service manager).
+        except (NotImplementedError, AttributeError):   # Not available on Windows.
+            pass
+        print("Serving PyPalEx on http://", args['host'], ":", args['port'], " (press CTRL+C to stop)", sep='')
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.stop())
+        loop.close()
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Sets up the argument parser for the "serve" mode.
+#
+#   @return A command line argument parsing object.
+def setup_argument_parser():
+    desc = "Runs a local HTTP server that extracts color palettes from images and returns them as JSON."
+
+    argument_parser = argparse.ArgumentParser(description=desc, usage="palex serve [options]")
+
+    argument_parser.add_argument("--host", metavar="HOST", type=str, default=DEFAULT_HOST,
+                                 help="Host to listen on (default: " + DEFAULT_HOST + ").")
+    argument_parser.add_argument("--port", metavar="PORT", type=int, default=DEFAULT_PORT,
+                                 help="Port to listen on (default: " + str(DEFAULT_PORT) + ").")
+    argument_parser.add_argument("--workers", metavar="N", type=int, default=None,
+                                 help="Number of worker processes that extract colors (default: number of CPUs).")
+    argument_parser.add_argument("--queue-size", metavar="N", type=int, default=16,
+                                 help="Maximum number of requests waiting for a worker, before answering 503 (default: 16).")
+    argument_parser.add_argument("--cache-size", metavar="N", type=int, default=128,
+                                 help="Maximum number of results kept in the cache (default: 128, 0 disables the cache).")
+
+    return argument_parser
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Error that is answered with an HTTP error status.
+class RequestError(Exception):
+
+    ##  RequestError Constructor.
+    #
+    #   @param  self    The object pointer.
+    #   @param  status  An integer that represents the HTTP status code.
+    #   @param  message A string that describes the error.
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  HTTP server that extracts colors with a warm pool of worker processes.
+class ExtractionServer:
+
+    ##  ExtractionServer Constructor.
+    #
+    #   @param  self        The object pointer.
+    #   @param  workers     An integer that represents the number of worker processes (defaults to the number of CPUs).
+    #   @param  queue_size  An integer that represents the maximum number of requests waiting for a worker.
+    #   @param  cache_size  An integer that represents the maximum number of cached results.
+    def __init__(self, workers=None, queue_size=16, cache_size=128):
+        self.workers = max(1, workers if workers is not None else multiprocessing.cpu_count())
+        self.queue_size = max(1, queue_size)
+        self.cache_size = max(0, cache_size)
+        self.executor = None
+        self.server = None
+        self.job_queue = None
+        self.job_tasks = []
+        self.cache = collections.OrderedDict()
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Starts the worker pool and the HTTP server.
+    #
+    #   @param  self    The object pointer.
+    #   @param  host    A string that represents the host to listen on.
+    #   @param  port    An integer that represents the port to listen on.
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        loop = asyncio.get_running_loop()
+
+        # Spawn and warm up every worker process before taking requests.
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        warm_ups = [loop.run_in_executor(self.executor, warm_up) for _ in range(self.workers)]
+        await asyncio.gather(*warm_ups)
+
+        self.job_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.job_tasks = [loop.create_task(self.process_jobs()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Stops the HTTP server and the worker pool.
+    #
+    #   @param  self    The object pointer.
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        for task in self.job_tasks:
+            task.cancel()
+        await asyncio.gather(*self.job_tasks, return_exceptions=True)
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Handles a single HTTP connection (one request per connection).
+    #
+    #   @param  self    The object pointer.
+    #   @param  reader  An asyncio.StreamReader of the connection.
+    #   @param  writer  An asyncio.StreamWriter of the connection.
+    async def handle_connection(self, reader, writer):
+        try:
+            request = await read_request(reader, writer)
+            status, payload = 200, await self.handle_request(request, reader)
+        except RequestError as error:
+            status, payload = error.status, {'error': error.message}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as error:
+            status, payload = 500, {'error': str(error)}
+
+        try:
+            writer.write(create_response(status, payload))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Routes an HTTP request.
+    #
+    #   @param  self    The object pointer.
+    #   @param  request A dictionary of the request (see read_request()).
+    #   @param  reader  An asyncio.StreamReader of the connection, to notice the client going away.
+    #
+    #   @return Dictionary that is sent back as JSON.
+    async def handle_request(self, request, reader):
+        if request['path'] == '/health':
+            if request['method'] != 'GET':
+                raise RequestError(405, "Use GET for /health.")
+            return {'status': 'ok', 'workers': self.workers, 'queued': self.job_queue.qsize(),
+                    'queue-size': self.queue_size, 'cached': len(self.cache)}
+
+        if request['path'] == '/extract':
+            if request['method'] != 'POST':
+                raise RequestError(405, "Use POST for /extract.")
+            return await self.handle_extract(request, reader)
+
+        raise RequestError(404, "Unknown path: " + request['path'])
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Extracts the colors and palettes of the image in a request.
+    #   @details    Results are served from the cache when possible, and new
+    #               requests are queued for the workers, unless the queue is full.
+    #               A queued job is cancelled if the client goes away before it
+    #               starts, so the workers only extract images someone waits for.
+    #
+    #   @param  self    The object pointer.
+    #   @param  request A dictionary of the request (see read_request()).
+    #   @param  reader  An asyncio.StreamReader of the connection, to notice the client going away.
+    #
+    #   @return Dictionary of results (see pipeline.generate_results()).
+    #
+    #   @exception  ConnectionResetError    If the client went away before the colors were extracted.
+    async def handle_extract(self, request, reader):
+        image_source, image_name, options = parse_extract_request(request)
+        cache_key = get_cache_key(image_source, options)
+
+        results = self.cache.get(cache_key)
+        if results is not None:
+            self.cache.move_to_end(cache_key)
+        else:
+            job = (image_source, options, asyncio.get_running_loop().create_future())
+            try:
+                self.job_queue.put_nowait(job)
+            except asyncio.QueueFull:
+                raise RequestError(503, "The server is busy, please try again later.")
+
+            disconnect = asyncio.ensure_future(wait_for_disconnect(reader))
+            try:
+                await asyncio.wait([job[2], disconnect], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                disconnect.cancel()
+
+            if not job[2].done():   # The client has gone away.
+                job[2].cancel()
+                raise ConnectionResetError("The client went away before the colors were extracted.")
+
+            results = job[2].result()
+            self.cache_results(cache_key, results)
+
+        results = dict(results)
+        results['image-name'] = image_name
+
+        return results
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Takes jobs from the queue and extracts them in the worker pool.
+    #
+    #   @param  self    The object pointer.
+    async def process_jobs(self):
+        while True:
+            image_source, options, future = await self.job_queue.get()
+            if future.cancelled():  # The client went away while the job was queued.
+                continue
+
+            try:
+                results = await async_utils.extract_async(image_source, options=options, executor=self.executor)
+            except Exception as error:
+                if not future.cancelled():
+                    future.set_exception(RequestError(400, "Could not extract colors: " + str(error)))
+                continue
+
+            if not future.cancelled():  # The client may have gone away during the extraction.
+                future.set_result(results)
+
+    # --------------------------------------------------------------------------
+    # --------------------------------------------------------------------------
+
+    ##  Adds results to the cache, removing the least recently used results when it's full.
+    #
+    #   @param  self        The object pointer.
+    #   @param  cache_key   A hashable key of the image and options.
+    #   @param  results     A dictionary of results.
+    def cache_results(self, cache_key, results):
+        if self.cache_size == 0 or cache_key is None:
+            return
+
+        self.cache[cache_key] = results
+        self.cache.move_to_end(cache_key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Reads an HTTP request from a connection.
+#
+#   @param  reader  An asyncio.StreamReader of the connection.
+#   @param  writer  An asyncio.StreamWriter of the connection.
+#
+#   @return Dictionary with the 'method', 'path', 'query', 'headers' and 'body' of the request.
+#
+#   @exception  RequestError    If the request is malformed or too large.
+async def read_request(reader, writer):
+    request_line = (await reader.readline()).decode('latin-1').strip()
+    parts = request_line.split()
+    if len(parts) != 3:
+        raise RequestError(400, "Malformed request line.")
+    method, target, _ = parts
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if line == '':
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        content_length = int(headers.get('content-length', '0'))
+    except ValueError:
+        raise RequestError(400, "Malformed Content-Length header.")
+    if content_length > MAX_BODY_SIZE:
+        raise RequestError(413, "The request body is larger than " + str(MAX_BODY_SIZE) + " bytes.")
+
+    # Clients like curl wait for the go-ahead before sending larger bodies.
+    if content_length > 0 and headers.get('expect', '').lower() == '100-continue':
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        await writer.drain()
+
+    body = await reader.readexactly(content_length) if content_length > 0 else b''
+    url = urlsplit(target)
+
+    return {'method': method.upper(), 'path': url.path, 'query': dict(parse_qsl(url.query)),
+            'headers': headers, 'body': body}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Waits until the client of a connection goes away.
+#   @details    A request is read whole before it's handled, so the client
+#               only sends more data (which is ignored, one request per
+#               connection) or closes the connection while it waits.
+#
+#   @param  reader  An asyncio.StreamReader of the connection.
+async def wait_for_disconnect(reader):
+    try:
+        while await reader.read(65536):
+            pass
+    except ConnectionError:
+        pass
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the image source, image name and options from an extraction request.
+#
+#   @param  request A dictionary of the request (see read_request()).
+#
+#   @return Tuple of the image source (bytes or a file path), image name and options dictionary.
+#
+#   @exception  RequestError    If the request doesn't contain an image.
+def parse_extract_request(request):
+    options = {}
+    for key, value in request['query'].items():
+        if key not in QUERY_OPTIONS:
+            continue
+        if QUERY_OPTIONS[key] is bool:
+            options[key] = value.lower() in ('1', 'true', 'yes', 'y')
+        else:
+            options[key] = value.lower()
+    image_name = request['query'].get('image-name')
+
+    if request['headers'].get('content-type', '').split(';')[0].strip() != 'application/json':
+        if not request['body']:
+            raise RequestError(400, "The request body must contain an image, or be JSON with a \"path\".")
+        return request['body'], image_name, pipeline.get_options(options)
+
+    try:
+        body = json.loads(request['body'].decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        raise RequestError(400, "The request body is not valid JSON.")
+    if not isinstance(body, dict) or not isinstance(body.get('path'), str):
+        raise RequestError(400, "The JSON body must contain a \"path\" to an image.")
+    if not os.path.isfile(body['path']):
+        raise RequestError(400, "The image does not exist: " + body['path'])
+
+    if isinstance(body.get('options'), dict):
+        for key, value in body['options'].items():
+            if key in QUERY_OPTIONS and isinstance(value, QUERY_OPTIONS[key]):
+                options[key] = value
+    if body.get('image-name') is not None:
+        image_name = str(body['image-name'])
+    elif image_name is None:
+        image_name = os.path.splitext(os.path.basename(body['path']))[0]
+
+    return body['path'], image_name, pipeline.get_options(options)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the cache key of an image and its options.
+#   @details    Uploaded images are identified by a hash of their bytes, and
+#               local images by their path, size and modification time.
+#
+#   @param  image_source    The image source (bytes or a file path).
+#   @param  options         A dictionary of options.
+#
+#   @return A hashable cache key, or None if the image can't be identified.
+def get_cache_key(image_source, options):
+    options_key = json.dumps(options, sort_keys=True)
+
+    if isinstance(image_source, bytes):
+        return 'sha256:' + hashlib.sha256(image_source).hexdigest(), options_key
+
+    try:
+        file_stats = os.stat(image_source)
+    except OSError:
+        return None
+
+    return 'path:' + os.path.abspath(image_source), file_stats.st_size, file_stats.st_mtime_ns, options_key
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates an HTTP response with a JSON body.
+#
+#   @param  status  An integer that represents the HTTP status code.
+#   @param  payload A dictionary that is sent as JSON.
+#
+#   @return The bytes of the HTTP response.
+def create_response(status, payload):
+    body = json.dumps(payload, default=convert_json_value).encode('utf-8')
+
+    headers = ["HTTP/1.1 " + str(status) + " " + STATUS_REASONS.get(status, ''),
+               "Content-Type: application/json",
+               "Content-Length: " + str(len(body)),
+               "Connection: close"]
+    if status == 503:
+        headers.append("Retry-After: 1")
+
+    return ("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + body
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Converts values that the json module can't serialize (e.g. numpy values).
+#
+#   @param  value   A value to convert.
+#
+#   @return A value that can be serialized to JSON.
+def convert_json_value(value):
+    if isinstance(value, (numpy.ndarray, numpy.generic)):
+        return value.tolist()
+
+    raise TypeError("Object of type " + type(value).__name__ + " is not JSON serializable")
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Warms up a worker process by running a tiny extraction.
+#   @details    Makes sure every worker process has been spawned and has
+#               imported everything it needs before the first request.
+def warm_up():
+    pixels = numpy.zeros((8, 8, 3), dtype=numpy.uint8)
+    pipeline.compute_results(pixels, 'warm-up', pipeline.get_options())
@@ -19,6 +19,7 @@
 #   - Modified by Al Timofeyev on July 8, 2024.
 #   - Modified by Al Timofeyev on October 12, 2024.
 #   - Modified by Al Tiomfeyev on August 3, 2025.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 import os
 import platform
@@ -41,4 +42,8 @@ PASTEL_EXTRACTED_DIR = os.path.join(CONF_DIR, "pastel")
 RAW_EXTRACTED_DIR = os.path.join(CONF_DIR, "raw")
 MODULE_DIR = os.path.dirname(__file__)
 
+# The Unix socket of the PyPalEx daemon (palex --daemon).
+RUNTIME_DIR = os.getenv("XDG_RUNTIME_DIR", CACHE_DIR)
+DAEMON_SOCKET = os.getenv("PYPALEX_DAEMON_SOCKET", os.path.join(RUNTIME_DIR, "palex.sock"))
+
 OS = platform.uname()[0]
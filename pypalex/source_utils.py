@@ -0,0 +1,270 @@
+##  @file   source_utils.py
+#   @brief  Utilities for finding and checking image sources.
+#   @details    Image sources are found and checked lazily, one file at a
+#               time, so the extraction of the first images can start while
+#               the rest of a large directory is still being scanned.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import fnmatch
+import os
+
+import filetype
+from PIL import Image
+
+from . import image_utils as imutils
+from . import parallel_utils as parallel
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Finds the images in the sources and yields a work item for each one, as soon as it's found.
+#   @details    The file paths are used if any are given, otherwise the
+#               directory is scanned. Files that don't exist or aren't
+#               images are skipped. Each file is opened once to check it,
+#               and the opened (not yet decoded) image is kept in its work
+#               item, so it isn't opened again to be extracted.
+#
+#               Checking files is bound by I/O latency (especially on network
+#               filesystems), so the files are checked on a pool of threads,
+#               a few files ahead of the work items that have been consumed.
+#               When the file extensions are trusted, files aren't opened at
+#               all: they're accepted by their extension alone, and any file
+#               that isn't a valid image fails once it's decoded instead.
+#
+#   @param  filepaths           List (or iterator) of file paths (relative to the path, if it's provided), or None to scan the path.
+#   @param  path                A path to the images, if it is provided.
+#   @param  recursive           Flag to also scan the subdirectories of the path.
+#   @param  include_patterns    List of glob patterns, where files must match at least one of them (None includes all files).
+#   @param  exclude_patterns    List of glob patterns of files and directories to skip (or None).
+#   @param  allow_large_images  Flag to keep images that are too large for Pillow's decompression bomb guard.
+#   @param  workers             An integer that represents the number of threads that check files.
+#   @param  invalid_sources     A list where the paths of the files that aren't valid images are added (optional).
+#   @param  trust_extensions    Flag to accept files by their extension alone, without opening them.
+#   @param  sources             List of (image path, relative path) tuples of files that were already found (e.g. by a
+#                               rescan of a watched directory), which are used instead of the file paths and the path.
+#
+#   @return Generator of work item dictionaries (see create_work_item()), in the order the files were found.
+def find_image_sources(filepaths=None, path=None, recursive=False, include_patterns=None, exclude_patterns=None,
+                       allow_large_images=False, workers=1, invalid_sources=None, trust_extensions=False, sources=None):
+    # Scanned directory entries are already known to be files, but files found earlier may be gone by now.
+    check_files = bool(filepaths) or sources is not None
+    if sources is None and filepaths:
+        sources = filter_file_arguments(filepaths, path, include_patterns, exclude_patterns)
+    elif sources is None:
+        sources = scan_directory(path, recursive, include_patterns, exclude_patterns)
+
+    if trust_extensions:
+        image_extensions = get_image_extensions()
+        for image_path, relative_path in sources:
+            if os.path.splitext(image_path)[1].lower() in image_extensions:
+                yield create_work_item(image_path, relative_path)
+            elif invalid_sources is not None:
+                invalid_sources.append(image_path)
+        return
+
+    def check_source(source):
+        image_path = source[0]
+        if check_files and not os.path.isfile(image_path):
+            return source, None
+        return source, probe_image(image_path, allow_large_images=allow_large_images)
+
+    for (image_path, relative_path), image in parallel.imap_threads(check_source, sources, workers=workers):
+        if image is not None:
+            yield create_work_item(image_path, relative_path, image=image)
+        elif invalid_sources is not None:
+            invalid_sources.append(image_path)
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Reads file paths from a stream (e.g. the standard input) and yields each one as soon as it's read.
+#   @details    The stream is read in chunks of whatever is available, so a
+#               program that writes the paths one at a time doesn't have to
+#               finish (or fill a buffer) before the first paths are used.
+#               Paths are read as bytes and decoded like the file system does,
+#               so any file name that can be listed can also be passed on.
+#
+#   @param  stream          A readable binary file object (e.g. sys.stdin.buffer).
+#   @param  null_separated  Flag for paths separated by NUL characters (e.g. "find -print0") instead of newlines.
+#   @param  chunk_size      An integer that represents the maximum number of bytes to read at a time.
+#
+#   @return Generator of strings that represent the file paths (empty paths are skipped).
+def read_filepaths(stream, null_separated=False, chunk_size=65536):
+    separator = b'\0' if null_separated else b'\n'
+    read_chunk = getattr(stream, 'read1', stream.read)
+    remainder = b''
+    while True:
+        chunk = read_chunk(chunk_size)
+        if not chunk:
+            break
+
+        *filepaths, remainder = (remainder + chunk).split(separator)
+        for filepath in filepaths:
+            if not null_separated:
+                filepath = filepath.rstrip(b'\r')
+            if filepath:
+                yield os.fsdecode(filepath)
+
+    if not null_separated:
+        remainder = remainder.rstrip(b'\r')
+    if remainder:
+        yield os.fsdecode(remainder)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Yields the file paths given as arguments that match the glob patterns.
+#
+#   @param  filepaths           List (or iterator) of file paths (relative to the path, if it's provided).
+#   @param  path                A path to the images, if it is provided.
+#   @param  include_patterns    List of glob patterns, where files must match at least one of them (or None).
+#   @param  exclude_patterns    List of glob patterns of files to skip (or None).
+#
+#   @return Generator of (image path, image filename) tuples.
+def filter_file_arguments(filepaths, path, include_patterns, exclude_patterns):
+    for filepath in filepaths:
+        if not matches_patterns(filepath, include_patterns, exclude_patterns):
+            continue
+
+        image_path = filepath
+        if path is not None:
+            image_path = os.path.join(path, filepath)
+        yield image_path, os.path.basename(filepath)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Scans a directory with os.scandir() and yields its files as they are found.
+#   @details    Subdirectories are scanned after the files of their parent
+#               directory, and symbolic links to directories aren't followed
+#               (so links can't make the scan loop). Directories that match
+#               an exclude pattern aren't scanned at all, and directories that
+#               can't be read are skipped.
+#
+#   @param  path                A path to a directory.
+#   @param  recursive           Flag to also scan the subdirectories.
+#   @param  include_patterns    List of glob patterns, where files must match at least one of them (or None).
+#   @param  exclude_patterns    List of glob patterns of files and directories to skip (or None).
+#
+#   @return Generator of (file path, path relative to the scanned directory) tuples.
+def scan_directory(path, recursive=False, include_patterns=None, exclude_patterns=None):
+    directories = [(path, '')]
+    while directories:
+        directory, relative_directory = directories.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+
+        subdirectories = []
+        with entries:
+            for entry in entries:
+                relative_path = os.path.join(relative_directory, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and matches_patterns(relative_path, None, exclude_patterns):
+                            subdirectories.append((entry.path, relative_path))
+                    elif entry.is_file() and matches_patterns(relative_path, include_patterns, exclude_patterns):
+                        yield entry.path, relative_path
+                except OSError:
+                    continue
+
+        directories.extend(reversed(subdirectories))    # Scan the subdirectories in the order they were found.
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Checks if a file path matches the include and exclude glob patterns.
+#   @details    A pattern matches either the whole (relative) path, using
+#               '/' as the separator on every platform, or just its name
+#               (e.g. '*.png' and 'drafts/*' both work).
+#
+#   @param  filepath            A string that represents a (relative) file path.
+#   @param  include_patterns    List of glob patterns, where the path must match at least one of them (None or an empty list includes everything).
+#   @param  exclude_patterns    List of glob patterns, where the path must match none of them (or None).
+#
+#   @return True if the path is included and not excluded, False otherwise.
+def matches_patterns(filepath, include_patterns=None, exclude_patterns=None):
+    filepath = filepath.replace(os.sep, '/')
+    filename = filepath.rsplit('/', 1)[-1]
+
+    def matches_any(patterns):
+        return any(fnmatch.fnmatch(filepath, pattern) or fnmatch.fnmatch(filename, pattern) for pattern in patterns)
+
+    if include_patterns and not matches_any(include_patterns):
+        return False
+
+    return not (exclude_patterns and matches_any(exclude_patterns))
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Gets the file extensions of the image formats that Pillow can open.
+#
+#   @return Set of lowercase file extensions, with their leading dot (e.g. '.png').
+def get_image_extensions():
+    return {extension for extension, image_format in Image.registered_extensions().items()
+            if image_format in Image.OPEN}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Opens an image file once, and checks its header to make sure it's an image that Pillow can open.
+#   @details    Pillow only reads the header of the file when it's opened,
+#               and the file type is sniffed from the same open file, so
+#               each file is only opened once.
+#
+#   @param  image_path          Path to file with filename and file extension.
+#   @param  allow_large_images  Flag to keep images that are too large for Pillow's decompression bomb guard.
+#
+#   @return PIL Image object that hasn't been decoded yet, or None if the file isn't a valid image.
+def probe_image(image_path, allow_large_images=False):
+    try:
+        if allow_large_images:
+            image = imutils.open_image_unguarded(image_path)
+        else:
+            image = Image.open(image_path)
+    except Exception:   # Corrupt headers raise all sorts of errors, and images that are too large raise DecompressionBombError.
+        return None
+
+    try:
+        is_image = image.fp is not None and filetype.is_image(image.fp)  # Restores the file position.
+    except OSError:
+        is_image = False
+
+    if not is_image:
+        image.close()
+        return None
+
+    return image
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates the work item of an image.
+#
+#   @param  image_path      A string that represents the path to the image.
+#   @param  relative_path   A string that represents the path shown to the user and used to name the image's outputs.
+#   @param  image           PIL Image object of the opened image that hasn't been decoded yet (optional).
+#
+#   @return Dictionary with the image's 'path', 'filename' and 'image-name' (the relative path without its file extension),
+#           and the opened 'image' with its 'format' and 'size' if an image is given.
+def create_work_item(image_path, relative_path, image=None):
+    work_item = {'path': image_path, 'filename': relative_path, 'image-name': os.path.splitext(relative_path)[0]}
+    if image is not None:
+        work_item.update({'image': image, 'format': image.format, 'size': image.size})
+
+    return work_item
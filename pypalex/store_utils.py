@@ -0,0 +1,322 @@
+##  @file   store_utils.py
+#   @brief  Utilities for storing the extracted colors of whole image collections as arrays.
+#   @details    A palette store keeps the 46 extracted colors (as RGB) and the
+#               hue ratios of every image as records of a NumPy structured
+#               array, in a .npy file that grows as images are appended. The
+#               names of the images are kept in a sidecar JSON Lines index,
+#               where line N belongs to record N. Each image is stored once:
+#               images whose source path is already in the index are skipped.
+#
+#               The store can be read without loading it into memory, e.g.:
+#                   records = numpy.load('palettes.npy', mmap_mode='r')
+#                   reds = records['colors'][:, COLOR_INDEX['red']]
+#
+#   @note   Records are appended in batches. The record count in the .npy
+#           header is updated last, so a store that was interrupted while
+#           appending still opens with the records it had before, and the
+#           partly written records are dropped the next time it's opened.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import json
+import os
+import struct
+import threading
+
+import numpy
+
+from . import conversion_utils as convert
+
+# ---- GLOBAL VARIABLES ----
+## Names of the extracted colors, in the order they're stored (the keys of Extractor.organize_extracted_dictionary()).
+COLOR_NAMES = ['light background', 'light foreground', 'dark background', 'dark foreground',
+               'black', 'red', 'orange', 'yellow', 'chartreuse', 'green', 'spring',
+               'cyan', 'azure', 'blue', 'violet', 'magenta', 'rose', 'white',
+               'light black', 'light red', 'light orange', 'light yellow', 'light chartreuse', 'light green', 'light spring',
+               'light cyan', 'light azure', 'light blue', 'light violet', 'light magenta', 'light rose', 'light white',
+               'dark black', 'dark red', 'dark orange', 'dark yellow', 'dark chartreuse', 'dark green', 'dark spring',
+               'dark cyan', 'dark azure', 'dark blue', 'dark violet', 'dark magenta', 'dark rose', 'dark white']
+## Dictionary of the position of each color in the 'colors' field of a record.
+COLOR_INDEX = {color_name: index for index, color_name in enumerate(COLOR_NAMES)}
+## Names of the 12 base hues, in the order of the hue wheel.
+HUE_NAMES = ['red', 'orange', 'yellow', 'chartreuse', 'green', 'spring',
+             'cyan', 'azure', 'blue', 'violet', 'magenta', 'rose']
+## Names of the ratios, in the order they're stored: the ratio of each hue, then the ratios of its 'norm', 'light' and 'dark' color types.
+RATIO_NAMES = HUE_NAMES + [color_type + ' ' + hue_name for hue_name in HUE_NAMES for color_type in ('norm', 'light', 'dark')]
+## Dictionary of the position of each ratio in the 'ratios' field of a record.
+RATIO_INDEX = {ratio_name: index for index, ratio_name in enumerate(RATIO_NAMES)}
+## The layout of a record: the RGB values of each color and the ratios (percentages in the set [0.0, 100.0]).
+STORE_DTYPE = numpy.dtype([('colors', numpy.uint8, (len(COLOR_NAMES), 3)), ('ratios', numpy.float32, (len(RATIO_NAMES),))])
+## The size of the .npy header, in bytes, which is fixed so the record count can be updated in place.
+STORE_HEADER_SIZE = 256
+## The number of records that are buffered before they're appended to the store.
+STORE_BATCH_SIZE = 64
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  A palette store that records are appended to.
+class PaletteStore:
+
+    ##  PaletteStore Constructor.
+    #   @details    Opens the store, or creates it if it doesn't exist yet, and
+    #               reads the source paths of the images that are already stored.
+    #
+    #   @param  self            The object pointer.
+    #   @param  store_filepath  A string that represents the path of the .npy file of the store.
+    #   @param  batch_size      An integer that represents the number of records that are buffered before they're appended.
+    #
+    #   @exception  ValueError  If the file isn't a palette store, or its index is missing names.
+    def __init__(self, store_filepath, batch_size=STORE_BATCH_SIZE):
+        self.store_filepath = store_filepath
+        self.index_filepath = get_index_filepath(store_filepath)
+        self.batch_size = max(1, batch_size)
+        self.lock = threading.Lock()
+        self.pending_records = []
+        self.pending_names = []
+        self.skipped_images = 0
+
+        self.size = open_store(store_filepath, self.index_filepath)
+        with open(self.index_filepath, 'r', encoding='utf-8') as index_file:
+            self.sources = {json.loads(line)['source'] for line in index_file} - {None}
+        self.store_file = open(store_filepath, 'r+b')
+        self.index_file = open(self.index_filepath, 'a', encoding='utf-8')
+
+    ##  Gets the number of records in the store, including the buffered ones.
+    #
+    #   @param  self    The object pointer.
+    #
+    #   @return The number of records.
+    def __len__(self):
+        return self.size + len(self.pending_records)
+
+    ##  Checks if an image is already in the store.
+    #   @details    Images are found by their source path, so an image that was
+    #               modified since it was stored is still in the store.
+    #
+    #   @param  self        The object pointer.
+    #   @param  image_path  A string that represents the path to the image.
+    #
+    #   @return True if the image is already in the store, False otherwise.
+    def check_source(self, image_path):
+        with self.lock:
+            is_stored = os.path.abspath(image_path) in self.sources
+            if is_stored:
+                self.skipped_images += 1
+
+        return is_stored
+
+    ##  Appends the results of an image to the store, unless the image is already in it.
+    #   @details    Thread-safe, so several pipeline write workers can share the store.
+    #
+    #   @param  self        The object pointer.
+    #   @param  results     A dictionary of results (see pipeline.generate_results()).
+    #   @param  source_path A string that represents the path to the image (optional, images without one are always appended).
+    #
+    #   @return True if the results were appended, False if the image is already in the store.
+    def append(self, results, source_path=None):
+        if source_path is not None:
+            source_path = os.path.abspath(source_path)
+        record = create_record(results)
+        index_line = json.dumps({'image-name': results['image-name'], 'source': source_path}) + '\n'
+
+        with self.lock:
+            if source_path in self.sources:
+                self.skipped_images += 1
+                return False
+            if source_path is not None:
+                self.sources.add(source_path)
+            self.pending_records.append(record)
+            self.pending_names.append(index_line)
+            if len(self.pending_records) >= self.batch_size:
+                self.write_pending_records()
+
+        return True
+
+    ##  Appends the buffered records to the store.
+    #
+    #   @param  self    The object pointer.
+    def flush(self):
+        with self.lock:
+            self.write_pending_records()
+
+    ##  Appends the buffered records and closes the store.
+    #
+    #   @param  self    The object pointer.
+    def close(self):
+        with self.lock:
+            try:
+                self.write_pending_records()
+            finally:
+                self.store_file.close()
+                self.index_file.close()
+
+    ##  Appends the buffered records to the files of the store, updating the record count last.
+    #
+    #   @note   The lock must be held by the caller.
+    #
+    #   @param  self    The object pointer.
+    def write_pending_records(self):
+        if not self.pending_records:
+            return
+
+        self.store_file.seek(STORE_HEADER_SIZE + self.size * STORE_DTYPE.itemsize)
+        self.store_file.write(numpy.concatenate(self.pending_records).tobytes())
+        self.store_file.flush()
+        self.index_file.write(''.join(self.pending_names))
+        self.index_file.flush()
+
+        self.size += len(self.pending_records)
+        self.store_file.seek(0)
+        self.store_file.write(create_header(self.size))
+        self.store_file.flush()
+
+        self.pending_records = []
+        self.pending_names = []
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Reads a palette store, without loading its records into memory.
+#
+#   @param  store_filepath  A string that represents the path of the .npy file of the store.
+#   @param  mode            A string that represents the memory map mode (e.g. 'r' for read-only, 'c' for copy-on-write).
+#
+#   @return A (records, names) tuple, where records is a memory-mapped structured array (see STORE_DTYPE),
+#           and names is a list of the {'image-name', 'source'} dictionaries of the records.
+#
+#   @exception  ValueError  If the file isn't a palette store.
+def read_store(store_filepath, mode='r'):
+    with open(store_filepath, 'rb') as store_file:
+        size = read_header(store_file)
+
+    if size == 0:   # Empty files can't be memory-mapped.
+        records = numpy.zeros(0, dtype=STORE_DTYPE)
+    else:
+        records = numpy.load(store_filepath, mmap_mode=mode)
+
+    with open(get_index_filepath(store_filepath), 'r', encoding='utf-8') as index_file:
+        names = [json.loads(line) for _, line in zip(range(size), index_file)]
+
+    return records, names
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the path of the index file of a palette store.
+#
+#   @param  store_filepath  A string that represents the path of the .npy file of the store (e.g. 'palettes.npy').
+#
+#   @return A string that represents the path of the index file (e.g. 'palettes.names.jsonl').
+def get_index_filepath(store_filepath):
+    return os.path.splitext(store_filepath)[0] + '.names.jsonl'
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Opens the files of a palette store, creating them if they don't exist yet.
+#   @details    Records and names that were written after the last record
+#               count update (i.e. by an interrupted append) are dropped.
+#
+#   @param  store_filepath  A string that represents the path of the .npy file of the store.
+#   @param  index_filepath  A string that represents the path of the index file of the store.
+#
+#   @return The number of records in the store.
+#
+#   @exception  ValueError  If the file isn't a palette store, or its index is missing names.
+def open_store(store_filepath, index_filepath):
+    store_dir = os.path.dirname(store_filepath)
+    if store_dir != '':
+        os.makedirs(store_dir, exist_ok=True)
+
+    if not os.path.isfile(store_filepath) or os.path.getsize(store_filepath) == 0:
+        with open(store_filepath, 'wb') as store_file:
+            store_file.write(create_header(0))
+        open(index_filepath, 'w').close()
+        return 0
+
+    with open(store_filepath, 'r+b') as store_file:
+        size = read_header(store_file)
+        store_file.truncate(STORE_HEADER_SIZE + size * STORE_DTYPE.itemsize)
+
+    with open(index_filepath, 'a+b') as index_file:
+        index_file.seek(0)
+        index_size = 0
+        for _ in range(size):
+            if not index_file.readline().endswith(b'\n'):
+                raise ValueError("The palette store index is missing names : " + index_filepath)
+            index_size = index_file.tell()
+        index_file.truncate(index_size)
+
+    return size
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Creates the .npy header of a palette store.
+#   @details    The header is padded to STORE_HEADER_SIZE, so it always has
+#               the same size, whatever the number of records.
+#
+#   @param  size    An integer that represents the number of records.
+#
+#   @return The header bytes.
+def create_header(size):
+    header = "{'descr': " + repr(numpy.lib.format.dtype_to_descr(STORE_DTYPE)) + \
+             ", 'fortran_order': False, 'shape': (" + str(size) + ",), }"
+    prefix_size = len(numpy.lib.format.magic(1, 0)) + 2     # The magic string and the header length.
+    header = header.ljust(STORE_HEADER_SIZE - prefix_size - 1) + '\n'
+
+    return numpy.lib.format.magic(1, 0) + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Reads the .npy header of a palette store, and checks its layout.
+#
+#   @param  store_file  A readable binary file object of the store, at its start.
+#
+#   @return The number of records in the store.
+#
+#   @exception  ValueError  If the file isn't a palette store with the current layout.
+def read_header(store_file):
+    try:
+        version = numpy.lib.format.read_magic(store_file)
+        shape, fortran_order, dtype = numpy.lib.format.read_array_header_1_0(store_file) if version == (1, 0) else (None, None, None)
+    except ValueError:
+        shape, fortran_order, dtype = None, None, None
+
+    if dtype != STORE_DTYPE or fortran_order or len(shape) != 1 or store_file.tell() != STORE_HEADER_SIZE:
+        raise ValueError("Not a palette store (or it was made by another PyPalEx version) : " + store_file.name)
+
+    return shape[0]
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Creates the record of an image from its results.
+#
+#   @param  results A dictionary of results (see pipeline.generate_results()), in any color format.
+#
+#   @return A structured array of a single record (see STORE_DTYPE).
+def create_record(results):
+    to_rgb = {'rgb': list, 'hex': convert.hex_to_rgb, 'hsv': convert.hsv_to_rgb, 'ansi': convert.ansi_to_rgb}
+    color_to_rgb = to_rgb[results['color-format']]
+    raw_colors = results['raw-colors']
+    ratios = results['ratios']
+
+    record = numpy.zeros(1, dtype=STORE_DTYPE)
+    record['colors'][0] = [color_to_rgb(raw_colors[color_name]) for color_name in COLOR_NAMES]
+    record['ratios'][0] = [ratios.get(ratio_name, 0.0) for ratio_name in RATIO_NAMES]
+
+    return record
@@ -0,0 +1,127 @@
+##  @file   watch_utils.py
+#   @brief  Utilities for watching a directory of images and finding the ones that changed.
+#   @details    A watched directory is rescanned periodically with os.scandir()
+#               (no file system notification libraries are needed), and each
+#               rescan is compared to a persistent index of the (size,
+#               modification time) of every image that was already extracted,
+#               so only new and modified images are extracted again.
+#
+#               The index is kept in the cache directory, one file per watched
+#               directory and set of settings, so extracting the same directory
+#               with other options starts from scratch.
+#
+#   @note   A new or modified file is only picked up once it has the same size
+#           and modification time in 2 rescans in a row, so files that are
+#           still being copied into the directory aren't extracted half-written.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import hashlib
+import json
+import os
+
+from . import file_utils as futils
+from . import source_utils as srcutils
+from .settings import CACHE_DIR
+
+# ---- GLOBAL VARIABLES ----
+## The directory where the indexes of the watched directories are kept.
+WATCH_INDEX_DIR = os.path.join(CACHE_DIR, "watch")
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Scans a watched directory and gets the state of each file.
+#
+#   @param  watch_dir           A path to the watched directory.
+#   @param  recursive           Flag to also scan the subdirectories.
+#   @param  include_patterns    List of glob patterns, where files must match at least one of them (or None).
+#   @param  exclude_patterns    List of glob patterns of files and directories to skip (or None).
+#
+#   @return Dictionary of file paths and their [relative path, size, modification time in nanoseconds] states.
+def scan_sources(watch_dir, recursive=False, include_patterns=None, exclude_patterns=None):
+    sources = {}
+    for filepath, relative_path in srcutils.scan_directory(watch_dir, recursive, include_patterns, exclude_patterns):
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:     # Removed while scanning.
+            continue
+        sources[filepath] = [relative_path, file_stat.st_size, file_stat.st_mtime_ns]
+
+    return sources
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Compares a rescan of a watched directory to the index of the files that were already extracted.
+#
+#   @param  known_sources       Dictionary of the files in the index (see scan_sources()).
+#   @param  current_sources     Dictionary of the files found by the rescan (see scan_sources()).
+#   @param  previous_sources    Dictionary of the files found by the previous rescan, or None to pick up every
+#                               new and modified file right away (e.g. on the first rescan).
+#
+#   @return A (changed sources, removed paths) tuple, where changed sources is a list of the (file path, relative path)
+#           tuples of the new and modified files that are ready, and removed paths is a list of the paths that are gone.
+def diff_sources(known_sources, current_sources, previous_sources=None):
+    changed_sources = []
+    for filepath, source_state in current_sources.items():
+        if known_sources.get(filepath) == source_state:
+            continue
+        if previous_sources is not None and previous_sources.get(filepath) != source_state:
+            continue    # Still being written, or just appeared.
+        changed_sources.append((filepath, source_state[0]))
+
+    removed_paths = [filepath for filepath in known_sources if filepath not in current_sources]
+
+    return changed_sources, removed_paths
+
+
+# **************************************************************************
+# **************************************************************************
+
+##  Gets the path of the index file of a watched directory.
+#
+#   @param  watch_dir   A path to the watched directory.
+#   @param  settings    A dictionary of the settings that change the outputs (e.g. the extraction options and the output path).
+#
+#   @return A string that represents the path of the index file in the cache directory.
+def get_index_filepath(watch_dir, settings):
+    index_key = json.dumps([os.path.abspath(watch_dir), settings], sort_keys=True, default=str)
+    index_name = hashlib.blake2b(index_key.encode('utf-8'), digest_size=16).hexdigest()
+
+    return os.path.join(WATCH_INDEX_DIR, index_name + ".json")
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Reads the index of a watched directory.
+#
+#   @param  index_filepath  A string that represents the path of the index file.
+#
+#   @return Dictionary of the files in the index (see scan_sources()), which is empty if there's no valid index yet.
+def read_index(index_filepath):
+    try:
+        with open(index_filepath, 'r', encoding='utf-8') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return {}
+
+    return index if isinstance(index, dict) else {}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Writes the index of a watched directory.
+#
+#   @param  index_filepath  A string that represents the path of the index file.
+#   @param  index           Dictionary of the files in the index (see scan_sources()).
+def write_index(index_filepath, index):
+    futils.write_file_atomically(index_filepath, json.dumps(index, separators=(',', ':')))
@@ -9,6 +9,7 @@
 #   - Modified by Al Timofeyev on April 7, 2023.
 #   - Modified by Al Timofeyev on June 10, 2024.
 #   - Modified by Al Timofeyev on July 8, 2024.
+#   - Modified by Al Timofeyev on October 19, 2026.
 
 
 import sys
@@ -17,7 +18,7 @@ import setuptools
 try:
     import pypalex
 except ImportError:
-    print("error: pypalex requires Python 3.6 or greater.")
+    print("error: pypalex requires Python 3.7 or greater.")
     sys.exit(1)
 
 LONG_DESC = open('README.md').read()
@@ -56,13 +57,12 @@ setuptools.setup(
         "Operating System :: POSIX :: Linux",
         "Operating System :: Microsoft :: Windows",
         "Operating System :: OS Independent",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
     ],
     packages=["pypalex"],
     entry_points={"console_scripts": ["palex=pypalex.__main__:main"]},
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     include_package_data=True,
     zip_safe=False)
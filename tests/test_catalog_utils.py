@@ -0,0 +1,118 @@
+##  @file   test_catalog_utils.py
+#   @brief  Tests how the palette catalog detects unchanged images.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import os
+
+import pytest
+
+from pypalex import catalog_utils as catalog
+
+# ---- GLOBAL VARIABLES ----
+## The extraction options that the images are added with.
+OPTIONS = {'pastel-light': False, 'memory-budget': None}
+## The results that are added for every image (only the fields the catalog keeps).
+RESULTS = {'image-name': 'image', 'color-format': 'hex', 'raw-colors': {'red': '#ff0000'},
+           'ratios': {'red': 100.0}, 'palettes': {}}
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Creates an image file and a catalog that it was added to.
+#
+#   @param  tmp_path    The pytest tmp_path fixture.
+#
+#   @return An (image path, catalog path) tuple.
+@pytest.fixture
+def cataloged_image(tmp_path):
+    image_path = str(tmp_path / 'image.png')
+    with open(image_path, 'wb') as image_file:
+        image_file.write(b'image data')
+    catalog_filepath = str(tmp_path / 'palettes.db')
+
+    palette_catalog = catalog.PaletteCatalog(catalog_filepath, options=OPTIONS)
+    is_unchanged, source_state = palette_catalog.check_source(image_path)
+    assert not is_unchanged
+    palette_catalog.add(RESULTS, image_path, source_state=source_state)
+    palette_catalog.close()
+
+    return image_path, catalog_filepath
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Checks if an image is unchanged in a catalog.
+#
+#   @param  catalog_filepath    A string that represents the path of the catalog.
+#   @param  image_path          A string that represents the path to the image.
+#   @param  options             A dictionary of the extraction options.
+#
+#   @return True if the image is unchanged, False otherwise.
+def is_unchanged(catalog_filepath, image_path, options=OPTIONS):
+    palette_catalog = catalog.PaletteCatalog(catalog_filepath, options=options)
+    try:
+        return palette_catalog.check_source(image_path)[0]
+    finally:
+        palette_catalog.close()
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_same_image_is_unchanged(cataloged_image):
+    image_path, catalog_filepath = cataloged_image
+    assert is_unchanged(catalog_filepath, image_path)
+    assert is_unchanged(catalog_filepath, os.path.relpath(image_path))
+
+
+def test_touched_image_is_unchanged_and_its_new_mtime_is_kept(cataloged_image, monkeypatch):
+    image_path, catalog_filepath = cataloged_image
+    image_stat = os.stat(image_path)
+    os.utime(image_path, ns=(image_stat.st_atime_ns, image_stat.st_mtime_ns + 10 ** 9))
+    assert is_unchanged(catalog_filepath, image_path)
+
+    # The new modification time was recorded, so the image isn't hashed again.
+    monkeypatch.setattr(catalog.futils, 'hash_file', lambda filepath: pytest.fail("The image was hashed again."))
+    assert is_unchanged(catalog_filepath, image_path)
+
+
+def test_modified_image_is_changed(cataloged_image):
+    image_path, catalog_filepath = cataloged_image
+    with open(image_path, 'wb') as image_file:
+        image_file.write(b'other data')
+    assert not is_unchanged(catalog_filepath, image_path)
+
+
+def test_image_with_other_options_is_changed(cataloged_image):
+    image_path, catalog_filepath = cataloged_image
+    assert not is_unchanged(catalog_filepath, image_path, dict(OPTIONS, **{'pastel-light': True}))
+
+
+def test_execution_options_dont_change_images(cataloged_image):
+    image_path, catalog_filepath = cataloged_image
+    assert is_unchanged(catalog_filepath, image_path, dict(OPTIONS, **{'memory-budget': 1024}))
+
+
+def test_new_and_missing_images_are_changed(cataloged_image, tmp_path):
+    image_path, catalog_filepath = cataloged_image
+    assert not is_unchanged(catalog_filepath, str(tmp_path / 'missing.png'))
+
+    other_image_path = str(tmp_path / 'other.png')
+    with open(other_image_path, 'wb') as image_file:
+        image_file.write(b'image data')
+    assert not is_unchanged(catalog_filepath, other_image_path)
+
+
+def test_other_database_is_rejected(tmp_path):
+    database_filepath = tmp_path / 'other.db'
+    database_filepath.write_bytes(b'not a database' * 100)
+
+    with pytest.raises(ValueError):
+        catalog.PaletteCatalog(str(database_filepath))
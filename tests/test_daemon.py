@@ -0,0 +1,100 @@
+##  @file   test_daemon.py
+#   @brief  Tests which forwarded calls the daemon refuses to run.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from pypalex import __main__ as palex
+from pypalex import daemon
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Starts a daemon that listens on a socket of its own.
+#
+#   @param  tmp_path    The pytest tmp_path fixture.
+#   @param  monkeypatch The pytest monkeypatch fixture.
+#
+#   @return The daemon process, which is stopped after the test.
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    if not hasattr(daemon.socket, 'AF_UNIX'):
+        pytest.skip("The daemon needs Unix sockets.")
+
+    socket_path = str(tmp_path / 'palex.sock')
+    monkeypatch.setattr(daemon, 'DAEMON_SOCKET', socket_path)
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ, PYPALEX_DAEMON_SOCKET=socket_path,
+                       PYTHONPATH=os.pathsep.join(filter(None, [project_dir, os.environ.get('PYTHONPATH')])))
+    daemon_process = subprocess.Popen([sys.executable, '-m', 'pypalex', '--daemon'], env=environment,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+    deadline = time.monotonic() + 30
+    while not daemon.forward_is_possible():
+        if daemon_process.poll() is not None or time.monotonic() > deadline:
+            os.killpg(daemon_process.pid, signal.SIGKILL)
+            pytest.fail("The daemon didn't start.")
+        time.sleep(0.1)
+
+    yield daemon_process
+
+    daemon_process.terminate()
+    try:
+        daemon_process.wait(timeout=30)
+    except subprocess.TimeoutExpired:     # Also stops its worker processes.
+        os.killpg(daemon_process.pid, signal.SIGKILL)
+        daemon_process.wait()
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Forwards the command line arguments to the daemon, without waiting forever.
+#
+#   @param  argv    List of command line arguments (without the program name).
+#
+#   @return The exit code of the forwarded command, or None if the daemon refused it.
+def forward_in_time(argv):
+    results = []
+    forward_thread = threading.Thread(target=lambda: results.append(daemon.forward(argv)), daemon=True)
+    forward_thread.start()
+    forward_thread.join(timeout=30)
+    if forward_thread.is_alive():
+        pytest.fail("The daemon didn't answer " + repr(argv) + ".")
+
+    return results[0]
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_watch_is_refused_and_daemon_stays_responsive(running_daemon, tmp_path, capsys):
+    for argv in (['--watch=' + str(tmp_path)], ['--watch', str(tmp_path)]):
+        assert forward_in_time(argv) is None
+
+    assert forward_in_time(['--version']) == 0
+    assert capsys.readouterr().out.startswith("pypalex ")
+
+
+@pytest.mark.parametrize('argv', [['--stdin'], ['--std'], ['-0', '--stdin'], ['--no-daemon', '--stdi', '-y']])
+def test_stdin_is_found_in_any_form(argv):
+    assert daemon.parse_forwarded_args(palex, argv)['stdin']
+
+
+def test_invalid_and_help_arguments_are_left_to_the_command(capsys):
+    assert daemon.parse_forwarded_args(palex, ['--bogus']) == {}
+    assert daemon.parse_forwarded_args(palex, ['--help']) == {}
+    assert capsys.readouterr() == ('', '')
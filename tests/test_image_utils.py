@@ -0,0 +1,70 @@
+##  @file   test_image_utils.py
+#   @brief  Tests the bounded-memory decoding of large images.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import numpy
+import pytest
+from PIL import Image
+
+from pypalex import image_utils as imutils
+
+# ---- GLOBAL VARIABLES ----
+## A memory budget that's too small to decode the test images whole.
+SMALL_BUDGET = 64 * 1024
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Saves an image of random pixels.
+#
+#   @param  image_path  A path to save the image to (its extension selects the format).
+#   @param  size        A (width, height) tuple of the image size.
+#
+#   @return The path of the saved image.
+def save_random_image(image_path, size=(3000, 2000)):
+    pixels = numpy.random.default_rng(0).integers(0, 256, size=(size[1], size[0], 3), dtype=numpy.uint8)
+    Image.fromarray(pixels).save(image_path)
+
+    return image_path
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_uncompressed_image_is_decoded_in_strips(tmp_path):
+    image_path = save_random_image(tmp_path / 'image.bmp')
+
+    image = imutils.load_image(str(image_path), memory_budget=SMALL_BUDGET)
+    assert image.size == (750, 500)     # Reduced 4 times, which is still larger than the rescaled (720, 480).
+
+
+def test_single_stream_png_is_decoded_whole_with_a_warning(tmp_path):
+    image_path = save_random_image(tmp_path / 'image.png')
+
+    with pytest.warns(RuntimeWarning, match="decoded whole"):
+        image = imutils.load_image(str(image_path), memory_budget=SMALL_BUDGET)
+    assert image.size == imutils.rescale_image(Image.open(image_path))
+
+
+def test_truncated_image_raises_os_error(tmp_path):
+    image_path = save_random_image(tmp_path / 'image.bmp')
+    image_data = image_path.read_bytes()
+    image_path.write_bytes(image_data[:len(image_data) // 2])
+
+    with pytest.raises(OSError):
+        imutils.load_image(str(image_path), memory_budget=SMALL_BUDGET)
+
+
+def test_unusable_decoders_fall_back_to_whole_decoding(tmp_path, monkeypatch):
+    image_path = save_random_image(tmp_path / 'image.bmp')
+    monkeypatch.setattr(imutils, 'decode_band', lambda image, band_tiles, top, bottom: None)
+
+    with pytest.warns(RuntimeWarning, match="decoded whole"):
+        image = imutils.load_image(str(image_path), memory_budget=SMALL_BUDGET)
+    assert image.size == imutils.rescale_image(Image.open(image_path))
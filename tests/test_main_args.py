@@ -0,0 +1,80 @@
+##  @file   test_main_args.py
+#   @brief  Tests the validation of the command line arguments of PyPalEx.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import sys
+
+import pytest
+
+from pypalex import __main__ as palex
+from pypalex import arg_messages as argmsg
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Runs handle_args() with the arguments, and gets the exit it ends with.
+#
+#   @param  monkeypatch The pytest monkeypatch fixture.
+#   @param  arguments   List of the command line arguments (without the program name).
+#
+#   @return The SystemExit exception that handle_args() raised.
+def run_handle_args(monkeypatch, arguments):
+    monkeypatch.setattr(sys, 'argv', ['palex', '--no-daemon'] + arguments)
+    with pytest.raises(SystemExit) as exit_info:
+        palex.handle_args()
+
+    return exit_info.value
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_watch_missing_directory_exits_with_bad_path(monkeypatch, tmp_path):
+    exit_error = run_handle_args(monkeypatch, ['--watch', str(tmp_path / 'does-not-exist')])
+    assert exit_error.code == argmsg.bad_path_message()
+
+
+def test_watch_file_exits_with_bad_path(monkeypatch, tmp_path):
+    image_file = tmp_path / 'image.png'
+    image_file.write_bytes(b'')
+
+    exit_error = run_handle_args(monkeypatch, ['--watch', str(image_file)])
+    assert exit_error.code == argmsg.bad_path_message()
+
+
+@pytest.mark.parametrize('arguments', [['-p', '.'], ['-f', 'image.png'], ['--stdin'],
+                                       ['--ndjson', 'palettes.ndjson'], ['--manifest', 'manifest.jsonl']])
+def test_watch_rejects_conflicting_options(monkeypatch, tmp_path, capsys, arguments):
+    exit_error = run_handle_args(monkeypatch, ['--watch', str(tmp_path)] + arguments)
+    assert exit_error.code == 2
+    assert "--watch can't" in capsys.readouterr().err
+
+
+def test_resume_needs_manifest(monkeypatch, tmp_path, capsys):
+    exit_error = run_handle_args(monkeypatch, ['-p', str(tmp_path), '--resume'])
+    assert exit_error.code == 2
+    assert "--resume needs the --manifest" in capsys.readouterr().err
+
+
+def test_resume_needs_manifest_when_watching(monkeypatch, tmp_path, capsys):
+    exit_error = run_handle_args(monkeypatch, ['--watch', str(tmp_path), '--resume'])
+    assert exit_error.code == 2
+    assert "--resume needs the --manifest" in capsys.readouterr().err
+
+
+def test_failed_images_only_exit_with_fail_on_error(monkeypatch, capsys):
+    source_stats = {'images-found': 2, 'invalid-sources': [], 'failed-images': ['broken.png']}
+
+    palex.report_sources(source_stats)
+    assert "Failed to extract 1 of 2 image(s)." in capsys.readouterr().err
+
+    monkeypatch.setattr(palex, 'FAIL_ON_ERROR', True)
+    with pytest.raises(SystemExit) as exit_info:
+        palex.report_sources(source_stats)
+    assert exit_info.value.code == "Failed to extract 1 of 2 image(s)."
@@ -0,0 +1,113 @@
+##  @file   test_manifest_utils.py
+#   @brief  Tests recording the completed images of a batch, and resuming it.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import json
+import os
+
+from pypalex import manifest_utils as manifest
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Creates a file.
+#
+#   @param  filepath    A path of the file to create.
+#   @param  data        The bytes to write to it.
+#
+#   @return A string that represents the path of the file.
+def create_file(filepath, data=b'image data'):
+    with open(filepath, 'wb') as new_file:
+        new_file.write(data)
+
+    return str(filepath)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Starts a manifest where some images were completed.
+#
+#   @param  tmp_path    The pytest tmp_path fixture.
+#   @param  images      An integer that represents the number of completed images.
+#
+#   @return A (manifest path, image paths, output paths) tuple.
+def create_manifest(tmp_path, images=2):
+    manifest_filepath = str(tmp_path / 'batch.jsonl')
+    image_paths = [create_file(tmp_path / ('image' + str(index) + '.png')) for index in range(images)]
+    output_paths = [create_file(tmp_path / ('image' + str(index) + '.json'), b'{}') for index in range(images)]
+
+    batch_manifest = manifest.BatchManifest(manifest_filepath)
+    for image_path, output_path in zip(image_paths, output_paths):
+        batch_manifest.add(image_path, [output_path])
+    batch_manifest.close()
+
+    return manifest_filepath, image_paths, output_paths
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_completed_images_are_skipped_when_resuming(tmp_path):
+    manifest_filepath, image_paths, _ = create_manifest(tmp_path)
+
+    batch_manifest = manifest.BatchManifest(manifest_filepath, resume=True)
+    assert all(batch_manifest.check_source(image_path)[0] for image_path in image_paths)
+    assert not batch_manifest.check_source(create_file(tmp_path / 'new.png'))[0]
+    assert batch_manifest.skipped_images == 2
+    batch_manifest.close()
+
+
+def test_starting_over_forgets_completed_images(tmp_path):
+    manifest_filepath, image_paths, _ = create_manifest(tmp_path)
+
+    batch_manifest = manifest.BatchManifest(manifest_filepath)
+    assert not batch_manifest.check_source(image_paths[0])[0]
+    batch_manifest.close()
+    assert os.path.getsize(manifest_filepath) == 0
+
+
+def test_partly_written_record_is_dropped(tmp_path):
+    manifest_filepath, image_paths, _ = create_manifest(tmp_path)
+    with open(manifest_filepath, 'rb') as manifest_file:
+        complete_size = len(manifest_file.readline())
+    with open(manifest_filepath, 'r+b') as manifest_file:
+        manifest_file.truncate(complete_size + 10)     # The batch died while writing the second record.
+
+    completed_images = manifest.read_manifest(manifest_filepath)
+    assert list(completed_images) == [os.path.abspath(image_paths[0])]
+    assert os.path.getsize(manifest_filepath) == complete_size
+
+    # Records added after resuming start on a line of their own.
+    batch_manifest = manifest.BatchManifest(manifest_filepath, resume=True)
+    assert not batch_manifest.check_source(image_paths[1])[0]
+    batch_manifest.add(image_paths[1], [])
+    batch_manifest.close()
+    assert list(manifest.read_manifest(manifest_filepath)) == [os.path.abspath(image_path) for image_path in image_paths]
+
+
+def test_invalid_lines_are_ignored(tmp_path):
+    manifest_filepath, image_paths, _ = create_manifest(tmp_path, images=1)
+    with open(manifest_filepath, 'a', encoding='utf-8') as manifest_file:
+        manifest_file.write('not json\n' + json.dumps({'path': 'missing keys'}) + '\n[1, 2]\n')
+
+    assert list(manifest.read_manifest(manifest_filepath)) == [os.path.abspath(image_paths[0])]
+
+
+def test_modified_images_and_deleted_outputs_are_extracted_again(tmp_path):
+    manifest_filepath, image_paths, output_paths = create_manifest(tmp_path)
+    create_file(image_paths[0], b'modified image data')
+    os.remove(output_paths[1])
+
+    batch_manifest = manifest.BatchManifest(manifest_filepath, resume=True)
+    is_completed, source_state = batch_manifest.check_source(image_paths[0])
+    assert not is_completed
+    assert source_state['size'] == len(b'modified image data')
+    assert not batch_manifest.check_source(image_paths[1])[0]
+    batch_manifest.close()
@@ -0,0 +1,53 @@
+##  @file   test_parallel_utils.py
+#   @brief  Tests running work with the execution backends.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import pytest
+
+from pypalex import parallel_utils as parallel
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  A pool that runs the tasks in the current process, and records the calls.
+class RecordingPool:
+
+    ##  RecordingPool Constructor.
+    #
+    #   @param  self    The object pointer.
+    def __init__(self):
+        self.calls = 0
+
+    ##  Applies a function to every task.
+    #
+    #   @param  self        The object pointer.
+    #   @param  function    The function to apply to each task.
+    #   @param  tasks       A list of tasks.
+    #
+    #   @return List of the results, in the same order as the tasks.
+    def map(self, function, tasks):
+        self.calls += 1
+        return [function(task) for task in tasks]
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+@pytest.mark.parametrize('backend', ['serial', 'thread', 'process'])
+def test_map_tasks_keeps_the_order_of_the_tasks(backend):
+    assert parallel.map_tasks(abs, [-3, 1, -2], backend, workers=2) == [3, 1, 2]
+
+
+def test_process_backend_uses_the_shared_pool(monkeypatch):
+    shared_pool = RecordingPool()
+    monkeypatch.setattr(parallel, 'SHARED_POOL', shared_pool)
+
+    assert parallel.map_tasks(abs, [-3, 1, -2], 'process') == [3, 1, 2]
+    assert parallel.map_tasks(abs, [-1], 'serial') == [1]
+    assert shared_pool.calls == 1
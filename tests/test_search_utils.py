@@ -0,0 +1,106 @@
+##  @file   test_search_utils.py
+#   @brief  Tests parsing the colors to search for, and the nearest-color and similar-palette searches.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import numpy
+import pytest
+
+from pypalex import search_utils as search
+from pypalex import store_utils as store
+
+# ---- GLOBAL VARIABLES ----
+## The images of the index: their name, the RGB array of all their colors, their dominant hue,
+## and the RGB array of their dark background.
+IMAGES = [('red', [255, 0, 0], 'red', [0, 0, 0]),
+          ('dark-red', [150, 0, 0], 'red', [40, 40, 40]),
+          ('dark-blue', [0, 0, 150], 'blue', [90, 90, 90])]
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Creates a palette index of the images (see IMAGES).
+#
+#   @param  images  A list of (name, color, dominant hue, dark background) tuples.
+#
+#   @return A PaletteIndex of the images.
+def create_index(images=IMAGES):
+    records = numpy.zeros(len(images), dtype=store.STORE_DTYPE)
+    names = []
+    for index, (image_name, color, hue_name, dark_background) in enumerate(images):
+        records['colors'][index] = color
+        records['colors'][index, store.COLOR_INDEX['dark background']] = dark_background
+        records['ratios'][index, store.RATIO_INDEX[hue_name]] = 100.0
+        names.append({'image-name': image_name, 'source': '/images/' + image_name + '.png'})
+
+    return search.PaletteIndex(records, names)
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  Gets the image names of search results.
+#
+#   @param  results A list of result dictionaries (see search_utils.create_search_results()).
+#
+#   @return List of the image names, in the order of the results.
+def get_names(results):
+    return [result['image-name'] for result in results]
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+@pytest.mark.parametrize('color, rgb_array', [('#3b4252', [59, 66, 82]), ('3b4252', [59, 66, 82]),
+                                               ([1, 2, 3], [1, 2, 3]), ((0, 255, 0), [0, 255, 0])])
+def test_valid_colors_are_parsed(color, rgb_array):
+    assert search.parse_color(color) == rgb_array
+
+
+@pytest.mark.parametrize('color', ['#zzzzzz', '#zzz', '#12345', '1234567', '', [256, 0, 0], [-1, 0, 0], [1, 2]])
+def test_invalid_colors_are_rejected(color):
+    with pytest.raises(ValueError):
+        search.parse_color(color)
+
+
+def test_nearest_colors_compare_the_dominant_color():
+    results = create_index().nearest_colors('#ff0000')
+    assert get_names(results) == ['red', 'dark-red', 'dark-blue']
+    assert results[0]['distance'] == 0.0
+    assert results[0]['source'] == '/images/red.png'
+
+    assert get_names(create_index().nearest_colors([0, 0, 150], count=1)) == ['dark-blue']
+
+
+def test_nearest_colors_compare_the_named_color():
+    palette_index = create_index()
+    assert get_names(palette_index.nearest_colors('#282828', color_name='dark background')) == ['dark-red', 'red', 'dark-blue']
+
+    with pytest.raises(ValueError):
+        palette_index.nearest_colors('#282828', color_name='not a color')
+
+
+def test_similar_palettes_leave_out_the_query_image():
+    palette_index = create_index()
+    assert get_names(palette_index.similar_palettes(0)) == ['dark-red', 'dark-blue']
+    assert get_names(palette_index.similar_palettes(2, count=1)) == ['dark-red']
+
+
+def test_similar_palettes_of_results():
+    query = {'color-format': 'hex', 'raw-colors': {color_name: '#000096' for color_name in store.COLOR_NAMES},
+             'ratios': {'blue': 100.0}}
+    assert get_names(create_index().similar_palettes(query)) == ['dark-blue', 'dark-red', 'red']
+
+
+def test_empty_index_finds_nothing():
+    palette_index = create_index(images=[])
+    assert len(palette_index) == 0
+    assert palette_index.nearest_colors('#ff0000') == []
+    assert palette_index.nearest_colors('#ff0000', color_name='dark background') == []
+    assert palette_index.similar_palettes({'color-format': 'rgb', 'ratios': {},
+                                           'raw-colors': {color_name: [0, 0, 0] for color_name in store.COLOR_NAMES}}) == []
@@ -0,0 +1,75 @@
+##  @file   test_server.py
+#   @brief  Tests how the local HTTP server handles clients that go away.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import asyncio
+import json
+
+from pypalex import server
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Opens a connection to the server and sends an extraction request.
+#
+#   @param  port        An integer that represents the port the server listens on.
+#   @param  image_data  The bytes of the request body.
+#
+#   @return A (reader, writer) tuple of the connection.
+async def send_extract_request(port, image_data):
+    reader, writer = await asyncio.open_connection(server.DEFAULT_HOST, port)
+    writer.write(b"POST /extract HTTP/1.1\r\nContent-Type: image/png\r\nContent-Length: " +
+                 str(len(image_data)).encode('ascii') + b"\r\n\r\n" + image_data)
+    await writer.drain()
+
+    return reader, writer
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_queued_job_of_a_gone_client_is_skipped(monkeypatch):
+    extracted_images = []
+    release_extraction = None
+
+    async def fake_extract_async(image_source, options=None, executor=None):
+        extracted_images.append(image_source)
+        await release_extraction.wait()
+        return {'image-name': None, 'palettes': {}}
+
+    async def run_clients():
+        nonlocal release_extraction
+        release_extraction = asyncio.Event()
+        extraction_server = server.ExtractionServer(workers=1, queue_size=4, cache_size=0)
+        await extraction_server.start(port=0)
+        port = extraction_server.server.sockets[0].getsockname()[1]
+        try:
+            waiting_reader, waiting_writer = await send_extract_request(port, b'first')
+            await asyncio.sleep(0.1)    # The first job keeps the only job task busy.
+
+            _, gone_writer = await send_extract_request(port, b'second')
+            await asyncio.sleep(0.1)
+            gone_writer.close()
+            await asyncio.sleep(0.1)
+
+            release_extraction.set()
+            response = await waiting_reader.read()
+            waiting_writer.close()
+            await asyncio.sleep(0.1)
+        finally:
+            await extraction_server.stop()
+
+        return response
+
+    monkeypatch.setattr(server.async_utils, 'extract_async', fake_extract_async)
+    response = asyncio.run(run_clients())
+
+    assert response.startswith(b"HTTP/1.1 200")
+    assert json.loads(response.split(b"\r\n\r\n", 1)[1])['image-name'] is None
+    assert extracted_images == [b'first']
@@ -0,0 +1,99 @@
+##  @file   test_source_utils.py
+#   @brief  Tests finding and filtering the image sources.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import os
+
+import pytest
+
+from pypalex import source_utils as srcutils
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+@pytest.mark.parametrize('filepath, include_patterns, exclude_patterns, is_matched', [
+    ('photo.png', None, None, True),
+    ('photo.png', [], [], True),
+    ('photo.png', ['*.png'], None, True),
+    ('photo.jpg', ['*.png'], None, False),
+    ('photo.jpg', ['*.png', '*.jpg'], None, True),
+    ('sub/dir/photo.png', ['*.png'], None, True),            # Patterns match the file name...
+    ('drafts/photo.png', None, ['drafts/*'], False),         # ...or the whole relative path.
+    ('final/photo.png', None, ['drafts/*'], True),
+    ('drafts/photo.png', ['*.png'], ['drafts/*'], False),    # Excluding wins over including.
+    ('photo.png', ['*.png'], ['photo.*'], False),
+    ('photo.PNG', ['*.png'], None, os.path.normcase('A') == 'a'),
+])
+def test_matches_patterns(filepath, include_patterns, exclude_patterns, is_matched):
+    assert srcutils.matches_patterns(filepath, include_patterns, exclude_patterns) == is_matched
+
+
+def test_matches_patterns_uses_forward_slashes():
+    filepath = os.path.join('drafts', 'photo.png')
+    assert not srcutils.matches_patterns(filepath, exclude_patterns=['drafts/*'])
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+##  A stream that returns the given chunks one read at a time, like a pipe written to in pieces.
+class ChunkedStream:
+
+    ##  ChunkedStream Constructor.
+    #
+    #   @param  self    The object pointer.
+    #   @param  chunks  List of the bytes chunks to return, in order.
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.reads = 0
+
+    ##  Returns the next chunk (or an empty bytes object once the stream has ended).
+    #
+    #   @param  self    The object pointer.
+    #   @param  size    An integer that represents the maximum number of bytes to read (ignored).
+    #
+    #   @return The next chunk.
+    def read1(self, size=-1):
+        self.reads += 1
+        return self.chunks.pop(0) if self.chunks else b''
+
+    ## Plain reads return the next chunk too.
+    read = read1
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_read_filepaths_joins_paths_split_across_chunks():
+    stream = ChunkedStream([b'first.p', b'ng\nsecond', b'.png\n\nthi', b'rd.png'])
+    assert list(srcutils.read_filepaths(stream)) == ['first.png', 'second.png', 'third.png']
+
+
+def test_read_filepaths_strips_carriage_returns():
+    stream = ChunkedStream([b'first.png\r', b'\nsecond.png\r\n'])
+    assert list(srcutils.read_filepaths(stream)) == ['first.png', 'second.png']
+
+
+def test_read_filepaths_null_separated():
+    stream = ChunkedStream([b'new\nline.png\0with\r.png', b'\0\0last', b'.png\0'])
+    assert list(srcutils.read_filepaths(stream, null_separated=True)) == ['new\nline.png', 'with\r.png', 'last.png']
+
+
+def test_read_filepaths_decodes_like_the_file_system():
+    stream = ChunkedStream([b'caf\xc3\xa9.png\nbad\xff.png\n'])
+    assert list(srcutils.read_filepaths(stream)) == ['café.png', os.fsdecode(b'bad\xff.png')]
+
+
+def test_read_filepaths_yields_each_path_as_soon_as_it_is_read():
+    stream = ChunkedStream([b'first.png\nsec', b'ond.png\n'])
+    filepaths = srcutils.read_filepaths(stream)
+
+    assert next(filepaths) == 'first.png'
+    assert stream.reads == 1
+    assert list(filepaths) == ['second.png']
@@ -0,0 +1,146 @@
+##  @file   test_store_utils.py
+#   @brief  Tests the palette store: its header, recovery from interrupted appends, skipping stored images, and the stored colors.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import io
+import os
+
+import numpy
+import pytest
+from PIL import Image
+
+from pypalex import __main__ as palex
+from pypalex import pipeline
+from pypalex import store_utils as store
+from pypalex.Extractor import Extractor
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+##  Creates the results of an image, with every color and ratio set from a seed.
+#
+#   @param  image_name  A string that represents the name of the image.
+#   @param  seed        An integer that the colors and ratios are generated from.
+#
+#   @return A dictionary of results in the 'rgb' color format (see pipeline.generate_results()).
+def create_results(image_name, seed):
+    return {'image-name': image_name, 'color-format': 'rgb',
+            'raw-colors': {color_name: [seed % 256, index, 255 - index] for index, color_name in enumerate(store.COLOR_NAMES)},
+            'ratios': {ratio_name: float(seed + index) for index, ratio_name in enumerate(store.RATIO_NAMES)}}
+
+
+# --------------------------------------------------------------------------
+# --------------------------------------------------------------------------
+
+def test_header_round_trip():
+    for size in (0, 1, 12345, 10 ** 12):
+        header = store.create_header(size)
+        assert len(header) == store.STORE_HEADER_SIZE
+
+        header_file = io.BytesIO(header)
+        header_file.name = 'palettes.npy'
+        assert store.read_header(header_file) == size
+
+
+def test_header_of_another_file_is_rejected(tmp_path):
+    array_filepath = tmp_path / 'array.npy'
+    numpy.save(array_filepath, numpy.zeros(3))
+
+    with open(array_filepath, 'rb') as array_file, pytest.raises(ValueError):
+        store.read_header(array_file)
+
+
+def test_store_is_readable_by_numpy(tmp_path):
+    store_filepath = str(tmp_path / 'palettes.npy')
+    palette_store = store.PaletteStore(store_filepath, batch_size=2)
+    for index in range(5):
+        palette_store.append(create_results('image' + str(index), index), source_path=str(tmp_path / (str(index) + '.png')))
+    palette_store.close()
+
+    records = numpy.load(store_filepath)
+    assert len(records) == 5
+    assert records['ratios'][3][0] == 3.0
+    assert list(records['colors'][4][store.COLOR_INDEX['red']]) == [4, store.COLOR_INDEX['red'], 255 - store.COLOR_INDEX['red']]
+
+    records, names = store.read_store(store_filepath)
+    assert [name['image-name'] for name in names] == ['image' + str(index) for index in range(5)]
+    assert names[0]['source'] == os.path.abspath(str(tmp_path / '0.png'))
+
+
+def test_interrupted_append_is_dropped_on_open(tmp_path):
+    store_filepath = str(tmp_path / 'palettes.npy')
+    palette_store = store.PaletteStore(store_filepath)
+    palette_store.append(create_results('image0', 0), source_path='0.png')
+    palette_store.append(create_results('image1', 1), source_path='1.png')
+    palette_store.close()
+    store_size = os.path.getsize(store_filepath)
+    index_size = os.path.getsize(store.get_index_filepath(store_filepath))
+
+    # An append that died before the record count was updated: a whole record, a torn record and a torn name.
+    with open(store_filepath, 'ab') as store_file:
+        store_file.write(store.create_record(create_results('image2', 2)).tobytes())
+        store_file.write(b'\x01' * 10)
+    with open(store.get_index_filepath(store_filepath), 'a', encoding='utf-8') as index_file:
+        index_file.write('{"image-name": "image2", "source": "2.png"}\n{"image-na')
+
+    palette_store = store.PaletteStore(store_filepath)
+    assert len(palette_store) == 2
+    assert os.path.getsize(store_filepath) == store_size
+    assert os.path.getsize(store.get_index_filepath(store_filepath)) == index_size
+
+    palette_store.append(create_results('image2', 2), source_path='2.png')
+    palette_store.close()
+    records, names = store.read_store(store_filepath)
+    assert len(records) == 3
+    assert [name['image-name'] for name in names] == ['image0', 'image1', 'image2']
+
+
+def test_index_missing_names_is_rejected(tmp_path):
+    store_filepath = str(tmp_path / 'palettes.npy')
+    palette_store = store.PaletteStore(store_filepath)
+    palette_store.append(create_results('image0', 0))
+    palette_store.close()
+    open(store.get_index_filepath(store_filepath), 'w').close()
+
+    with pytest.raises(ValueError):
+        store.PaletteStore(store_filepath)
+
+
+def test_stored_images_are_skipped(tmp_path):
+    store_filepath = str(tmp_path / 'palettes.npy')
+    image_path = str(tmp_path / 'image.png')
+    palette_store = store.PaletteStore(store_filepath)
+    assert not palette_store.check_source(image_path)
+    assert palette_store.append(create_results('image', 0), source_path=image_path)
+    assert not palette_store.append(create_results('image', 0), source_path=image_path)
+    palette_store.close()
+
+    palette_store = store.PaletteStore(store_filepath)
+    assert palette_store.check_source(os.path.relpath(image_path))
+    assert not palette_store.append(create_results('image', 0), source_path=image_path)
+    palette_store.close()
+
+    assert len(store.read_store(store_filepath)[0]) == 1
+
+
+def test_stored_colors_dont_depend_on_export_color_format(tmp_path, monkeypatch):
+    image_path = str(tmp_path / 'gradient.png')
+    Image.fromarray(numpy.arange(64 * 64 * 3, dtype=numpy.uint8).reshape(64, 64, 3)).save(image_path)
+    monkeypatch.setattr(palex, 'STORE_PATH', str(tmp_path / 'palettes.npy'))
+
+    stored_colors = []
+    for color_format in ('rgb', 'hex', 'hsv', 'ansi'):
+        monkeypatch.setattr(palex, 'EXPORT_COLOR_FORMAT', color_format)
+        extractor = Extractor()
+        extractor.load(image_path)
+        extractor.run()
+        results = pipeline.generate_results(extractor, palex.get_extraction_options())
+        stored_colors.append(store.create_record(results)['colors'][0])
+
+    assert all(numpy.array_equal(colors, stored_colors[0]) for colors in stored_colors)
@@ -0,0 +1,68 @@
+##  @file   test_watch_utils.py
+#   @brief  Tests finding the images of a watched directory that changed.
+#
+#   @section authors Author(s)
+#   - Created by Al Timofeyev on October 19, 2026.
+
+
+# ---- IMPORTS ----
+import os
+
+from pypalex import watch_utils as watch
+
+# ---- GLOBAL VARIABLES ----
+## The index of a watched directory whose images were all extracted.
+KNOWN_SOURCES = {'/images/a.png': ['a.png', 100, 1], '/images/b.png': ['b.png', 200, 2]}
+
+
+# **************************************************************************
+# ****** CODE ORGANIZED HIGH-LEVEL to LOW-LEVEL WITH SECTION DIVIDERS ******
+# **************************************************************************
+
+def test_unchanged_sources_are_skipped():
+    assert watch.diff_sources(KNOWN_SOURCES, dict(KNOWN_SOURCES)) == ([], [])
+
+
+def test_new_modified_and_removed_sources():
+    current_sources = {'/images/a.png': ['a.png', 100, 5],     # Modified.
+                       '/images/c.png': ['c.png', 300, 3]}     # New, and b.png was removed.
+
+    changed_sources, removed_paths = watch.diff_sources(KNOWN_SOURCES, current_sources)
+    assert sorted(changed_sources) == [('/images/a.png', 'a.png'), ('/images/c.png', 'c.png')]
+    assert removed_paths == ['/images/b.png']
+
+
+def test_sources_still_being_written_wait_for_a_stable_rescan():
+    previous_sources = dict(KNOWN_SOURCES, **{'/images/c.png': ['c.png', 100, 3]})
+    current_sources = dict(KNOWN_SOURCES, **{'/images/c.png': ['c.png', 300, 4],    # Still growing.
+                                             '/images/d.png': ['d.png', 400, 4]})   # Just appeared.
+    assert watch.diff_sources(KNOWN_SOURCES, current_sources, previous_sources) == ([], [])
+
+    # Once a rescan finds them the same, they're ready.
+    changed_sources, _ = watch.diff_sources(KNOWN_SOURCES, dict(current_sources), current_sources)
+    assert sorted(changed_sources) == [('/images/c.png', 'c.png'), ('/images/d.png', 'd.png')]
+
+
+def test_index_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch, 'WATCH_INDEX_DIR', str(tmp_path / 'watch'))
+    index_filepath = watch.get_index_filepath(str(tmp_path), {'pastel': False})
+    assert index_filepath != watch.get_index_filepath(str(tmp_path), {'pastel': True})
+    assert watch.read_index(index_filepath) == {}
+
+    watch.write_index(index_filepath, KNOWN_SOURCES)
+    assert watch.read_index(index_filepath) == KNOWN_SOURCES
+
+    with open(index_filepath, 'w') as index_file:
+        index_file.write('{"torn')
+    assert watch.read_index(index_filepath) == {}
+
+
+def test_scan_sources_finds_the_state_of_each_file(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.png').write_bytes(b'a' * 10)
+    (tmp_path / 'sub' / 'b.png').write_bytes(b'b' * 20)
+    (tmp_path / 'notes.txt').write_bytes(b'c')
+
+    sources = watch.scan_sources(str(tmp_path), recursive=True, include_patterns=['*.png'])
+    assert {source_state[0].replace(os.sep, '/'): source_state[1] for source_state in sources.values()} == \
+        {'a.png': 10, 'sub/b.png': 20}